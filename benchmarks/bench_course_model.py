@@ -0,0 +1,81 @@
+"""Memory and (de)serialization cost of a catalog snapshot: course dicts vs Course records.
+
+'dict+pickle' is the old snapshot (a list of per-course dicts pickled into
+the cache); 'Course+pickle' pickles Course records; 'Course+marshal' is the
+binary format CatalogStore now stores. Titles and links are unique per
+course and every string is its own object, as after a real scrape. Memory
+is what the loaded catalog keeps allocated, as a cache hit leaves it in a
+worker, measured with tracemalloc.
+
+    python benchmarks/bench_course_model.py --courses 100000
+"""
+import argparse
+import gc
+import pickle
+import sys
+import time
+import tracemalloc
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+from bench_serve import synthetic_catalog
+from course import Course, decode_courses, encode_courses
+
+
+def scraped_catalog(size: int) -> list:
+    """Course dicts as a scrape builds them: every string a separate object, titles and links unique"""
+    courses = []
+    for i, course in enumerate(synthetic_catalog(size)):
+        course = {key: ''.join(value) if isinstance(value, str) else value for key, value in course.items()}
+        course.update(title=f"{course['title']} {i}", link=f"{course['link']}-{i}")
+        courses.append(course)
+    return courses
+
+
+def best_of(function, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained(load) -> int:
+    gc.collect()
+    tracemalloc.start()
+    value = load()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del value
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--courses', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    dicts = scraped_catalog(args.courses)
+    courses = [Course.from_dict(course) for course in dicts]
+    assert [course.to_dict() for course in decode_courses(encode_courses(courses))] == dicts
+
+    formats = {
+        'dict+pickle': (lambda: pickle.dumps(dicts, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        'Course+pickle': (lambda: pickle.dumps(courses, pickle.HIGHEST_PROTOCOL), pickle.loads),
+        'Course+marshal': (lambda: encode_courses(courses), decode_courses),
+    }
+    print(f"courses={args.courses}")
+    for name, (dump, load) in formats.items():
+        data = dump()
+        dump_time = best_of(dump, args.repeat)
+        load_time = best_of(lambda: load(data), args.repeat)
+        memory = retained(lambda: load(data))
+        print(f"{name:<15} size={len(data) / 2 ** 20:6.1f}MiB dump={dump_time * 1000:7.1f}ms "
+              f"load={load_time * 1000:7.1f}ms memory={memory / 2 ** 20:6.1f}MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""Deduplication speed and accuracy: MinHash/LSH candidates vs comparing every pair.
+
+Generates a catalog over several providers and re-lists a share of its
+courses as duplicates: the same link with tracking parameters, a trailing
+slash or a listing id appended, or a reworded title (case, punctuation, one
+dropped letter) on another provider. Reports how many planted duplicates
+each method misses, how many distinct courses it wrongly merges, and its
+run time. The pairwise baseline is O(n^2) and only runs up to --pairwise-max.
+
+    python benchmarks/bench_dedup.py --courses 5000 100000
+"""
+import argparse
+import random
+import string
+import sys
+import time
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+from bench_search import COMMON_WORDS
+from course import Course
+from dedup import TITLE_THRESHOLD, dedup_link, dedupe_courses, jaccard, title_numbers, title_shingles
+
+PROVIDERS = ('coursera', 'harvard', 'udemy', 'life', 'who')
+
+
+def vocabulary(size: int, rng: random.Random) -> list:
+    """Common subject words followed by random words, with letter trigrams as varied as real titles"""
+    words = list(COMMON_WORDS)
+    while len(words) < size:
+        words.append(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10))))
+    return words
+
+
+def reword(title: str, rng: random.Random) -> str:
+    change = rng.randrange(3)
+    if change == 0:
+        return title.upper()
+    if change == 1:
+        return title.replace(' ', ' - ', 1) + '!'
+    words = title.split()
+    longest = max(range(len(words)), key=lambda i: len(words[i]))
+    position = rng.randrange(1, len(words[longest]))
+    words[longest] = words[longest][:position] + words[longest][position + 1:]
+    return ' '.join(words)
+
+
+def relink(link: str, rng: random.Random) -> str:
+    return rng.choice((link + '/', link + '?utm_source=newsletter', f'{link}-{rng.randint(10000, 99999)}'))
+
+
+def planted_catalog(size: int, duplicate_rate: float, seed: int = 3) -> tuple:
+    """Provider parts with duplicates planted in, and the number planted"""
+    rng = random.Random(seed)
+    words = vocabulary(20000, rng)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    parts = {provider: [] for provider in PROVIDERS}
+    originals = []
+    for i in range(int(size * (1 - duplicate_rate))):
+        provider = rng.choice(PROVIDERS)
+        title = ' '.join(rng.choices(words, weights, k=rng.randint(4, 8)))
+        course = Course(id=f'{i}', title=title, provider=provider, detail='N/A',
+                        link=f'https://{provider}.example.org/course/c{i}', image='N/A')
+        parts[provider].append(course)
+        originals.append(course)
+    planted = size - len(originals)
+    for i in range(planted):
+        original = rng.choice(originals)
+        if rng.random() < 0.5:
+            duplicate = Course(id=f'dup-{i}:{original.id}', title=original.title, provider=original.provider, detail='N/A',
+                               link=relink(original.link, rng), image='N/A')
+            parts[original.provider].append(duplicate)
+        else:
+            provider = rng.choice(PROVIDERS)
+            duplicate = Course(id=f'dup-{i}:{original.id}', title=reword(original.title, rng), provider=provider, detail='N/A',
+                               link=f'https://{provider}.example.org/course/d{i}', image='N/A')
+            parts[provider].append(duplicate)
+    return parts, planted
+
+
+def pairwise_dedupe(parts: dict, threshold: float = TITLE_THRESHOLD) -> list:
+    """Every course compared with every kept one"""
+    kept, links = [], set()
+    for course in (course for courses in parts.values() for course in courses):
+        link = dedup_link(course.link)
+        shingles, numbers = title_shingles(course.title), title_numbers(course.title)
+        if link in links or any(numbers == other_numbers and jaccard(shingles, other) >= threshold
+                                for other, other_numbers, _ in kept):
+            continue
+        links.add(link)
+        kept.append((shingles, numbers, course))
+    return [course for _, _, course in kept]
+
+
+def report(name: str, parts: dict, planted: int, dedupe) -> None:
+    total = sum(len(courses) for courses in parts.values())
+    start = time.perf_counter()
+    kept = dedupe(parts)
+    elapsed = time.perf_counter() - start
+    # Every original course and its planted copies form one group, which should keep exactly one course
+    groups = {}
+    for course in kept:
+        group = course.id.split(':')[-1]
+        groups[group] = groups.get(group, 0) + 1
+    missed = sum(count - 1 for count in groups.values())
+    lost = total - planted - len(groups)
+    print(f"  {name:<9} removed={total - len(kept):<6} duplicates missed={missed:<5} "
+          f"distinct courses merged away={lost:<5} time={elapsed:7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--courses', type=int, nargs='+', default=[5000, 100000])
+    parser.add_argument('--duplicate-rate', type=float, default=0.1)
+    parser.add_argument('--pairwise-max', type=int, default=5000)
+    args = parser.parse_args()
+
+    for size in args.courses:
+        parts, planted = planted_catalog(size, args.duplicate_rate)
+        print(f"courses={size} planted duplicates={planted}")
+        report('lsh', parts, planted, dedupe_courses)
+        if size <= args.pairwise_max:
+            report('pairwise', parts, planted, pairwise_dedupe)
+
+
+if __name__ == '__main__':
+    main()
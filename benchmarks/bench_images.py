@@ -0,0 +1,85 @@
+"""Course image latency and size: loading from the upstream host vs /api/images thumbnails.
+
+A local stand-in host serves a full-size photo after --upstream-delay
+seconds, like a slow third-party image host. 'upstream' is what clients did
+before, loading the original from it; 'proxy miss' is the first
+/api/images request (fetch, resize, store); 'proxy hit' every request after
+it, served from the disk cache.
+
+    python benchmarks/bench_images.py --upstream-delay 0.5 --requests 50
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+import requests
+from PIL import Image, ImageDraw
+from flask import Flask, send_file
+
+from image_cache import THUMBNAIL_SIZES, ImageCache
+from stand_in_server import StandInServer
+
+
+def photo(width: int = 1920, height: int = 1080) -> bytes:
+    """A detailed JPEG, so it compresses like a photo rather than a flat color"""
+    image = Image.new('RGB', (width, height))
+    draw = ImageDraw.Draw(image)
+    for i in range(0, width, 8):
+        draw.line([(i, 0), (width - i, height)], fill=(i % 256, (i * 7) % 256, (i * 13) % 256), width=3)
+    buffer = io.BytesIO()
+    image.save(buffer, 'JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def make_app(cache: ImageCache, url: str) -> Flask:
+    app = Flask('images')
+
+    @app.route('/api/images/<size>')
+    def image(size):
+        cached = cache.get(url, size)
+        return send_file(cached.path, mimetype=cached.mimetype, etag=cached.etag, max_age=86400)
+
+    return app
+
+
+def timed(get, count: int) -> tuple:
+    """Median latency and body size of count requests"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        size = len(get())
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--upstream-delay', type=float, default=0.5)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    body = photo()
+    with StandInServer(body=body, content_type='image/jpeg', response_delay=args.upstream_delay) as server:
+        url = f"{server.url}/photo.jpg"
+        session = requests.Session()
+        latency, size = timed(lambda: session.get(url).content, min(args.requests, 5))
+        print(f"upstream          median={latency * 1000:7.1f}ms bytes={size}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            client = make_app(ImageCache(os.path.join(directory, 'images'), allow_private=True), url).test_client()
+            for size_name in THUMBNAIL_SIZES:
+                miss, _ = timed(lambda: client.get(f'/api/images/{size_name}').data, 1)
+                hit, size = timed(lambda: client.get(f'/api/images/{size_name}').data, args.requests)
+                print(f"proxy {size_name:<7} miss={miss * 1000:7.1f}ms hit median={hit * 1000:5.1f}ms bytes={size}")
+        print(f"upstream fetches: {server.statuses.get(200, 0)}")
+
+
+if __name__ == '__main__':
+    main()
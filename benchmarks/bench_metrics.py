@@ -0,0 +1,74 @@
+"""Cost of the fetch and refresh instrumentation, and the phase breakdown it reports.
+
+Fetches the same pages from a local stand-in server through a plain pooled
+session and through Scraper's instrumented fetch, then prints what
+/metrics reports per phase. --connect-delay and --response-delay show up
+as ttfb, since the stand-in sleeps after accepting a connection.
+
+    python benchmarks/bench_metrics.py --requests 2000 --response-delay 0.005
+"""
+import argparse
+import sys
+import time
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import metrics
+from course_scaper import Scraper
+from http_session import build_session
+from stand_in_server import StandInServer
+
+
+def plain_session() -> requests.Session:
+    session = requests.Session()
+    session.mount('http://', HTTPAdapter(pool_maxsize=8, pool_block=True))
+    return session
+
+
+def timed(fetch, url: str, count: int) -> float:
+    """Mean seconds per fetch"""
+    start = time.perf_counter()
+    for i in range(count):
+        fetch(f"{url}/page-{i}")
+    return (time.perf_counter() - start) / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--body-size', type=int, default=200000)
+    parser.add_argument('--connect-delay', type=float, default=0.0)
+    parser.add_argument('--response-delay', type=float, default=0.0)
+    args = parser.parse_args()
+
+    histogram = metrics.Histogram('bench_observe_seconds', 'observe() benchmark', ('host', 'phase'))
+    start = time.perf_counter()
+    for i in range(100000):
+        histogram.observe(i * 1e-5, host='example.com', phase='ttfb')
+    print(f"Histogram.observe: {(time.perf_counter() - start) * 10:.2f}us")
+
+    body = b'<html>' + b'x' * args.body_size + b'</html>'
+    with StandInServer(body=body, connect_delay=args.connect_delay, response_delay=args.response_delay) as server:
+        session = plain_session()
+        plain = timed(lambda url: session.get(url, timeout=10).content, server.url, args.requests)
+
+        scraper = Scraper(session=build_session(), response_cache=False, page_store=False)
+        headers = scraper._get_random_headers()
+        instrumented = timed(lambda url: scraper._get(url, 10, headers), server.url, args.requests)
+
+    print(f"plain fetch:        {plain * 1000:.3f}ms")
+    print(f"instrumented fetch: {instrumented * 1000:.3f}ms ({(instrumented - plain) * 1e6:+.1f}us)")
+    for line in metrics.render().splitlines():
+        if line.startswith('scraper_fetch_phase_seconds_sum'):
+            phase = line.split('phase="')[1].split('"')[0]
+            count = next(l for l in metrics.render().splitlines()
+                         if l.startswith('scraper_fetch_phase_seconds_count') and f'phase="{phase}"' in l)
+            print(f"  {phase:<9} mean={float(line.split()[-1]) / float(count.split()[-1]) * 1000:.3f}ms")
+
+
+if __name__ == '__main__':
+    main()
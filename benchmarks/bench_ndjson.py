@@ -0,0 +1,74 @@
+"""Per-request memory and time to first byte: jsonify vs streamed NDJSON chunks.
+
+'jsonify' is the old request path (load the course list, encode it whole);
+'ndjson' streams the chunks CatalogStore stored at publish time, fetching
+one chunk per write. Peak memory is measured with tracemalloc while the
+response is consumed, over Flask-Caching's SimpleCache.
+
+    python benchmarks/bench_ndjson.py --courses 5000 20000 50000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+from flask import Flask, jsonify, stream_with_context
+from flask_caching import Cache
+
+from bench_serve import synthetic_catalog
+from catalog_store import CatalogStore
+
+
+def make_app(courses: list) -> Flask:
+    app = Flask('ndjson')
+    app.config.update(CACHE_TYPE='SimpleCache', CACHE_THRESHOLD=1000)
+    cache = Cache(app)
+    store = CatalogStore(cache)
+    version = store.publish(courses)
+    cache.set('courses_data', courses)
+
+    @app.route('/jsonify')
+    def full():
+        return jsonify(cache.get('courses_data'))
+
+    @app.route('/ndjson')
+    def stream():
+        count = store.ndjson_chunk_count(version)
+        return app.response_class(stream_with_context(store.iter_ndjson(version, count)),
+                                  mimetype='application/x-ndjson')
+
+    return app
+
+
+def measure(client, path: str) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    response = client.get(path, buffered=False)
+    body = iter(response.response)
+    first = next(body)
+    first_byte = time.perf_counter() - start
+    size = len(first) + sum(len(chunk) for chunk in body)
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, first_byte, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--courses', type=int, nargs='+', default=[5000, 20000, 50000])
+    args = parser.parse_args()
+
+    for size in args.courses:
+        client = make_app(synthetic_catalog(size)).test_client()
+        for path in ('/jsonify', '/ndjson'):
+            peak, first_byte, body = measure(client, path)
+            print(f"courses={size:<6} {path[1:]:<8} peak={peak / 2 ** 20:7.1f}MiB "
+                  f"first_byte={first_byte * 1000:7.1f}ms body={body / 2 ** 20:6.1f}MiB")
+
+
+if __name__ == '__main__':
+    main()
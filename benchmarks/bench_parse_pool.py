@@ -0,0 +1,58 @@
+"""Refresh parse wall-clock against the number of parse worker processes.
+
+Parses a refresh worth of synthetic provider pages with ParsePool at
+several worker counts (0 = in-process) and prints the wall-clock time and
+speed-up for each, alongside the machine's core count.
+
+    python benchmarks/bench_parse_pool.py --coursera-pages 32 --repeat 3
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+from fixtures import provider_pages
+from parse_pool import ParsePool
+
+
+def refresh(pool: ParsePool, pages: dict) -> int:
+    total = 0
+    for provider, contents in pages.items():
+        total += len(pool.parse_many(provider, contents))
+    return total
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--coursera-pages', type=int, default=32)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, nargs='*',
+                        default=sorted({0, 1, 2, 4, cores}))
+    args = parser.parse_args()
+
+    pages = provider_pages(coursera_pages=args.coursera_pages)
+    page_count = sum(len(contents) for contents in pages.values())
+    print(f"cores={cores} pages={page_count}")
+
+    baseline = None
+    for workers in args.workers:
+        pool = ParsePool(workers=workers)
+        # Warm up so process start-up is not counted against the refresh
+        refresh(pool, pages)
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            courses = refresh(pool, pages)
+        wall = (time.perf_counter() - start) / args.repeat
+        pool.shutdown()
+
+        baseline = baseline or wall
+        label = 'in-process' if workers == 0 else f"{workers} workers"
+        print(f"{label:<12} wall={wall * 1000:8.1f}ms speedup={baseline / wall:4.2f}x courses={courses}")
+
+
+if __name__ == '__main__':
+    main()
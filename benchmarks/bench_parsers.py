@@ -0,0 +1,57 @@
+"""Time each parser backend over a refresh worth of provider pages.
+
+Every provider extractor is run over the synthetic fixture pages with each
+installed parser backend, and the parse time per provider and backend is
+reported. That the backends extract the same courses is checked by
+tests/test_parser_backends.py.
+
+    python benchmarks/bench_parsers.py --repeat 5
+"""
+import argparse
+import sys
+import time
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+from fixtures import provider_pages
+from parser_backends import BACKENDS, get_backend
+from providers import get_provider
+
+
+def available_backends() -> list:
+    names = []
+    for name in BACKENDS:
+        try:
+            get_backend(name)
+        except ImportError as e:
+            print(f"skipping {name}: {e}")
+            continue
+        names.append(name)
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--coursera-pages', type=int, default=8)
+    args = parser.parse_args()
+
+    pages = provider_pages(coursera_pages=args.coursera_pages)
+    backends = available_backends()
+
+    print(f"{'provider':<10}" + ''.join(f"{name:>14}" for name in backends))
+    for provider, contents in pages.items():
+        extract = get_provider(provider).extract
+        row = f"{provider:<10}"
+        for name in backends:
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                for page in contents:
+                    extract(page, name)
+            row += f"{(time.perf_counter() - start) / args.repeat * 1000:12.2f}ms"
+        print(row)
+
+
+if __name__ == '__main__':
+    main()
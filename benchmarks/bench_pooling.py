@@ -0,0 +1,66 @@
+"""Compare page fetch latency with and without pooled keep-alive sessions.
+
+Runs the same concurrent page fetch pattern as ``Scraper`` against
+a local stand-in server, once through the bare ``requests`` module (a new
+connection per request) and once through the pooled session.
+
+    python benchmarks/bench_pooling.py --requests 200 --workers 8 --connect-delay 0.02
+"""
+import argparse
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+import requests
+
+from http_session import build_session
+from stand_in_server import StandInServer
+
+
+def run(client, url: str, total: int, workers: int):
+    latencies = []
+
+    def fetch(_):
+        start = time.perf_counter()
+        response = client.get(url, timeout=10)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, range(total)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def report(name: str, wall: float, latencies, connections: int):
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{name:<10} wall={wall:.3f}s p50={p50:.2f}ms p99={p99:.2f}ms connections={connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--connect-delay', type=float, default=0.02,
+                        help='Seconds added per new connection to model TCP+TLS handshake')
+    parser.add_argument('--body-size', type=int, default=200_000)
+    args = parser.parse_args()
+
+    body = b'<html>' + b'x' * args.body_size + b'</html>'
+    with StandInServer(connect_delay=args.connect_delay, body=body) as server:
+        wall, latencies = run(requests, server.url, args.requests, args.workers)
+        report('unpooled', wall, latencies, server.connections)
+
+        server.connections = 0
+        session = build_session(pool_maxsize=args.workers)
+        wall, latencies = run(session, server.url, args.requests, args.workers)
+        report('pooled', wall, latencies, server.connections)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Fetch success and speed against a throttling, flaky host, with and without rate limiting.
+
+Runs Scraper._make_request (thread pool) and AsyncScraper._make_request over
+many pages of a local stand-in server. The server allows --server-rate
+requests per second, answering 429 with Retry-After beyond that, and fails
+--error-rate of requests with 503. Scenarios:
+
+  no limiter     unlimited rate, no retries (the old behaviour)
+  retry only     unlimited rate, retries with backoff and Retry-After
+  limiter+retry  per-host token bucket and adaptive concurrency as well
+
+    python benchmarks/bench_rate_limit.py --pages 200 --server-rate 40 --error-rate 0.05
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('SCRAPER_HTTP_CACHE', '0')
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+import aiohttp
+
+from async_scraper import AsyncScraper
+from course_scaper import Scraper
+from http_session import build_session
+from rate_limit import RateLimiter, RetryPolicy
+from stand_in_server import StandInServer
+
+
+def run_threads(urls: list, rate_limiter, retry_policy, workers: int) -> int:
+    scraper = Scraper(session=build_session(pool_maxsize=workers), rate_limiter=rate_limiter, retry_policy=retry_policy)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return sum(response is not None for response in executor.map(scraper._make_request, urls))
+
+
+async def run_async(urls: list, rate_limiter, retry_policy, workers: int) -> int:
+    scraper = AsyncScraper(max_concurrency=workers, limit_per_host=workers, rate_limiter=rate_limiter,
+                           retry_policy=retry_policy)
+    scraper._semaphore = asyncio.Semaphore(workers)
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit_per_host=workers)) as session:
+        scraper.session = session
+        responses = await asyncio.gather(*(scraper._make_request(url) for url in urls))
+    return sum(response is not None for response in responses)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--server-rate', type=float, default=40, help='Requests per second the host tolerates')
+    parser.add_argument('--error-rate', type=float, default=0.05, help='Share of requests failed with 503')
+    parser.add_argument('--client-rate', type=float, default=80, help='Token bucket rate of the limiter')
+    args = parser.parse_args()
+
+    scenarios = {
+        'no limiter': lambda: (RateLimiter(rate=0, max_concurrency=args.workers), RetryPolicy(max_attempts=1)),
+        'retry only': lambda: (RateLimiter(rate=0, max_concurrency=args.workers), RetryPolicy(base_delay=0.1)),
+        'limiter+retry': lambda: (RateLimiter(rate=args.client_rate, burst=args.client_rate / 4, max_concurrency=args.workers),
+                                  RetryPolicy(base_delay=0.1)),
+    }
+    engines = {
+        'threads': run_threads,
+        'async': lambda *a: asyncio.run(run_async(*a)),
+    }
+    print(f"pages={args.pages} server_rate={args.server_rate}/s error_rate={args.error_rate}")
+    for engine, run in engines.items():
+        for name, make in scenarios.items():
+            with StandInServer(rate_limit=args.server_rate, error_rate=args.error_rate, seed=1) as server:
+                urls = [f"{server.url}/page/{i}" for i in range(args.pages)]
+                rate_limiter, retry_policy = make()
+                start = time.perf_counter()
+                fetched = run(urls, rate_limiter, retry_policy, args.workers)
+                wall = time.perf_counter() - start
+                print(f"{engine:<8} {name:<14} fetched={fetched}/{args.pages} wall={wall:.2f}s "
+                      f"429s={server.statuses.get(429, 0)} 503s={server.statuses.get(503, 0)}")
+
+
+if __name__ == '__main__':
+    main()
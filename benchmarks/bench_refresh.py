@@ -0,0 +1,158 @@
+"""End-to-end catalog refresh, fully offline, against replayed provider pages.
+
+Each iteration is a full refresh as the app runs it: scrape every recorded
+provider with the chosen engine, deduplicate, and publish the catalog to a
+CatalogStore (Flask-Caching SimpleCache). Pages come from a recording made
+with replay.py, served by local stand-ins with optional latency and error
+injection; without --recording the synthetic fixture pages are used.
+
+Reports refresh wall time (p50/p99 over iterations), page fetch latency
+(p50/p99), throughput and the process's peak RSS. Peak RSS covers the whole
+process, so compare runs of one engine per process. --json appends the
+results with the current commit to a file, to track them across commits.
+
+    python benchmarks/bench_refresh.py --iterations 10 --response-delay 0.05 --error-rate 0.02
+    python benchmarks/bench_refresh.py --recording benchmarks/recordings/live --engine async --json refresh.jsonl
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+from flask import Flask
+from flask_caching import Cache
+
+import providers
+from async_scraper import AsyncScraper
+from catalog_store import CatalogStore
+from course_scaper import Scraper
+from dedup import dedupe_courses
+from rate_limit import HOST_RATE, RateLimiter, RetryPolicy
+from replay import DEFAULT_RECORDING_DIR, INDEX_FILE, load, replaying, synthetic
+
+
+class TimedScraper(Scraper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+
+    def _fetch_page(self, provider, url: str):
+        start = time.perf_counter()
+        try:
+            return super()._fetch_page(provider, url)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+class TimedAsyncScraper(AsyncScraper):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies = []
+
+    async def _fetch_page(self, provider, url: str):
+        start = time.perf_counter()
+        try:
+            return await super()._fetch_page(provider, url)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+def percentile(values: list, share: float) -> float:
+    """Nearest-rank percentile, share between 0 and 1"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(share * len(ordered)) - 1))] if ordered else 0.0
+
+
+def refresh(engine: str, names: list, store: CatalogStore, host_rate: float) -> tuple:
+    """Scrape, deduplicate and publish once; returns (scrape seconds, total seconds, courses, fetch latencies)"""
+    options = dict(response_cache=False, page_store=False, rate_limiter=RateLimiter(rate=host_rate),
+                   retry_policy=RetryPolicy())
+    scraper = TimedAsyncScraper(**options) if engine == 'async' else TimedScraper(**options)
+    start = time.perf_counter()
+    results = scraper.run(names)
+    scraped = time.perf_counter() - start
+    courses = dedupe_courses({name: courses or [] for name, courses in results.items()})
+    store.publish(courses)
+    return scraped, time.perf_counter() - start, len(courses), scraper.latencies
+
+
+def current_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--recording', help=f'Recording directory, default {DEFAULT_RECORDING_DIR} if it exists')
+    parser.add_argument('--engine', choices=('threads', 'async'), default='threads')
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--response-delay', type=float, default=0.0, help='Seconds every replayed page takes')
+    parser.add_argument('--connect-delay', type=float, default=0.0, help='Seconds every new connection takes')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failed with 503')
+    parser.add_argument('--host-rate', type=float, default=HOST_RATE, help='Requests per second per host, 0 for none')
+    parser.add_argument('--json', help='Append the results as a JSON line to this file')
+    args = parser.parse_args()
+
+    directory = args.recording
+    if directory is None and os.path.exists(os.path.join(DEFAULT_RECORDING_DIR, INDEX_FILE)):
+        directory = DEFAULT_RECORDING_DIR
+    if directory is None:
+        directory = tempfile.mkdtemp(prefix='replay-')
+        synthetic(directory)
+    recording = load(directory)
+    recorded = {page['provider'] for page in recording['pages']}
+    names = [name for name in providers.provider_names() if name in recorded]
+
+    app = Flask('bench_refresh')
+    app.config.update(CACHE_TYPE='SimpleCache', CACHE_THRESHOLD=100000)
+    store = CatalogStore(Cache(app))
+
+    scrapes, totals, latencies = [], [], []
+    with replaying(recording, response_delay=args.response_delay, connect_delay=args.connect_delay,
+                   error_rate=args.error_rate, seed=1) as servers:
+        for _ in range(args.iterations):
+            scraped, total, courses, page_latencies = refresh(args.engine, names, store, args.host_rate)
+            scrapes.append(scraped)
+            totals.append(total)
+            latencies.extend(page_latencies)
+        served = sum(server.statuses.get(200, 0) for server in servers.values())
+        failed = sum(count for server in servers.values() for status, count in server.statuses.items() if status != 200)
+
+    results = {
+        'commit': current_commit(),
+        'recording': recording['source'],
+        'engine': args.engine,
+        'iterations': args.iterations,
+        'courses': courses,
+        'pages_per_second': served / sum(scrapes),
+        'courses_per_second': courses * args.iterations / sum(totals),
+        'refresh_p50': percentile(totals, 0.5),
+        'refresh_p99': percentile(totals, 0.99),
+        'fetch_p50': percentile(latencies, 0.5),
+        'fetch_p99': percentile(latencies, 0.99),
+        'peak_rss_mib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+    print(f"{recording['source']} recording, {len(names)} providers, engine={args.engine}, "
+          f"{served} pages served, {failed} errors injected or unmatched")
+    print(f"refresh  p50={results['refresh_p50'] * 1000:8.1f}ms p99={results['refresh_p99'] * 1000:8.1f}ms "
+          f"courses={courses} ({results['courses_per_second']:.0f}/s)")
+    print(f"fetch    p50={results['fetch_p50'] * 1000:8.1f}ms p99={results['fetch_p99'] * 1000:8.1f}ms "
+          f"({results['pages_per_second']:.1f} pages/s)")
+    print(f"peak RSS {results['peak_rss_mib']:.1f}MiB")
+    if args.json:
+        with open(args.json, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(results) + '\n')
+
+
+if __name__ == '__main__':
+    main()
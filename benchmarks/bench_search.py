@@ -0,0 +1,108 @@
+"""Search index build, incremental update and query latency at catalog scale.
+
+Generates a synthetic catalog, builds the SearchIndex, applies a refresh
+where a small share of courses changed, and reports p50/p99 latency for a
+mix of exact, multi-word and prefix queries: first for the queries arriving
+right after the refresh, then for each kind of query on its own.
+
+    python benchmarks/bench_search.py --courses 30000 --queries 2000
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+
+sys.path.append('src')
+
+from search_index import SearchIndex
+
+COMMON_WORDS = (
+    'python data science machine learning health care introduction advanced web development '
+    'design business finance marketing public emergency response nutrition statistics writing '
+    'leadership management cloud computing security network biology chemistry physics history '
+    'philosophy music art drawing spanish french english mathematics calculus algebra economics '
+    'psychology sociology law ethics climate energy engineering robotics javascript react sql'
+).split()
+SYLLABLES = ('ka', 'lo', 'mi', 'ren', 'tor', 'vix', 'an', 'bel', 'cor', 'dus', 'ef', 'gam', 'hel', 'ist')
+PROVIDERS = ('coursera / University of Michigan', 'Harvard', 'Udemy', 'Life HP', 'Health Emergencies Programme')
+
+
+def vocabulary(size: int, rng: random.Random) -> list:
+    """Common subject words followed by generated rarer words"""
+    words = list(COMMON_WORDS)
+    while len(words) < size:
+        words.append(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return words
+
+
+def synthetic_catalog(size: int, vocabulary_size: int = 20000, seed: int = 7) -> tuple:
+    """Catalog whose word frequencies follow a Zipf distribution, like real course text"""
+    rng = random.Random(seed)
+    words = vocabulary(vocabulary_size, rng)
+    weights = [1 / rank for rank in range(1, len(words) + 1)]
+    courses = []
+    for i in range(size):
+        courses.append({
+            'id': f'course-{i}',
+            'title': ' '.join(rng.choices(words, weights, k=rng.randint(3, 7))) + f' {i}',
+            'detail': ' '.join(rng.choices(words, weights, k=rng.randint(10, 30))),
+            'category': rng.choice(COMMON_WORDS),
+            'provider': rng.choice(PROVIDERS),
+        })
+    return courses, words
+
+
+def percentile(values: list, fraction: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--courses', type=int, default=30000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--changed', type=float, default=0.02, help='Share of courses changed by the refresh')
+    args = parser.parse_args()
+
+    courses, words = synthetic_catalog(args.courses)
+    index = SearchIndex()
+    start = time.perf_counter()
+    index.update(courses)
+    print(f"courses={args.courses} terms={len(index.postings)} build={(time.perf_counter() - start) * 1000:.1f}ms")
+
+    rng = random.Random(11)
+    refreshed = list(courses)
+    for position in rng.sample(range(len(refreshed)), int(len(refreshed) * args.changed)):
+        refreshed[position] = dict(refreshed[position], title=refreshed[position]['title'] + ' updated')
+    start = time.perf_counter()
+    stats = index.update(refreshed)
+    print(f"incremental update and ranking: {stats} in {(time.perf_counter() - start) * 1000:.1f}ms")
+
+    # Queries are drawn from the words people search for most
+    query_words = words[:2000]
+    query_kinds = {
+        'single word': lambda: rng.choice(query_words),
+        'two words': lambda: f'{rng.choice(query_words)} {rng.choice(query_words)}',
+        'prefix': lambda: rng.choice(query_words)[:3],
+        'word + prefix': lambda: f'{rng.choice(query_words)} {rng.choice(query_words)[:4]}',
+    }
+    def measure(make_query) -> str:
+        latencies = []
+        for _ in range(args.queries):
+            query = make_query()
+            start = time.perf_counter()
+            index.search(query, limit=20)
+            latencies.append((time.perf_counter() - start) * 1000)
+        latencies.sort()
+        return f"p50={statistics.median(latencies):.3f}ms p99={percentile(latencies, 0.99):.3f}ms"
+
+    # Nothing is warmed up: these are the first queries the refreshed index answers
+    kinds = list(query_kinds.values())
+    print(f"{'after refresh':<14} {measure(lambda: rng.choice(kinds)())}")
+
+    for name, make_query in query_kinds.items():
+        print(f"{name:<14} {measure(make_query)}")
+
+
+if __name__ == '__main__':
+    main()
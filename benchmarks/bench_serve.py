@@ -0,0 +1,107 @@
+"""Requests per second for /api/courses: per-request jsonify vs stored blobs.
+
+Builds two minimal Flask apps over the same cache backend. 'jsonify' is the
+old request path (unpickle the course list, re-encode it on every request);
+'blob' serves the bytes CatalogStore serialized and compressed at publish
+time. Uses Flask-Caching's SimpleCache unless --redis-url is given.
+
+    python benchmarks/bench_serve.py --courses 5000 --seconds 3
+"""
+import argparse
+import sys
+import time
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+from flask import Flask, jsonify, request
+from flask_caching import Cache
+
+from catalog_store import CatalogStore, ENCODINGS
+from fixtures import provider_pages
+from providers import get_provider
+
+
+def synthetic_catalog(size: int) -> list:
+    base = []
+    for provider, pages in provider_pages().items():
+        for page in pages:
+            base.extend(get_provider(provider).extract(page))
+    return [dict(base[i % len(base)], id=f"{i:08d}") for i in range(size)]
+
+
+def make_cache(app: Flask, redis_url: str) -> Cache:
+    if redis_url:
+        app.config.update(CACHE_TYPE='RedisCache', CACHE_REDIS_URL=redis_url)
+    else:
+        app.config.update(CACHE_TYPE='SimpleCache', CACHE_THRESHOLD=100)
+    return Cache(app)
+
+
+def jsonify_app(courses: list, redis_url: str) -> Flask:
+    app = Flask('jsonify')
+    cache = make_cache(app, redis_url)
+    cache.set('courses_data', courses)
+
+    @app.route('/api/courses')
+    def get_courses():
+        return jsonify(cache.get('courses_data'))
+
+    return app
+
+
+def blob_app(courses: list, redis_url: str) -> Flask:
+    app = Flask('blob')
+    store = CatalogStore(make_cache(app, redis_url))
+    store.publish(courses)
+
+    @app.route('/api/courses')
+    def get_courses():
+        version = store.current_version()
+        encoding = next(enc for enc in ENCODINGS if enc == 'identity' or request.accept_encodings[enc] > 0)
+        response = app.response_class(store.get_blob(version, encoding), mimetype='application/json')
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+        return response
+
+    return app
+
+
+def measure(app: Flask, seconds: float, headers: dict) -> tuple:
+    client = app.test_client()
+    client.get('/api/courses', headers=headers)
+    count = 0
+    size = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        size = len(client.get('/api/courses', headers=headers).data)
+        count += 1
+    return count / (time.perf_counter() - start), size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--courses', type=int, default=5000)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--redis-url', default=None)
+    args = parser.parse_args()
+
+    courses = synthetic_catalog(args.courses)
+    scenarios = [
+        ('jsonify', jsonify_app, {}),
+        ('blob', blob_app, {}),
+        ('blob+gzip', blob_app, {'Accept-Encoding': 'gzip'}),
+    ]
+    if 'br' in ENCODINGS:
+        scenarios.append(('blob+br', blob_app, {'Accept-Encoding': 'br'}))
+
+    print(f"courses={args.courses} backend={'redis' if args.redis_url else 'simple'}")
+    baseline = None
+    for name, factory, headers in scenarios:
+        rps, size = measure(factory(courses, args.redis_url), args.seconds, headers)
+        baseline = baseline or rps
+        print(f"{name:<10} {rps:9.1f} req/s  {rps / baseline:6.1f}x  body={size / 1024:8.1f}KiB")
+
+
+if __name__ == '__main__':
+    main()
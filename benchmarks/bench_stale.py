@@ -0,0 +1,81 @@
+"""/api/courses latency across a catalog expiry: hard TTL vs stale-while-revalidate.
+
+Serves the catalog from CatalogStore while a client requests it in a loop.
+Halfway through, the catalog expires. With a hard expiry, the next request
+runs the (simulated) scrape and publish inline. With a soft expiry, the
+stale catalog keeps being served while the refresh runs in the background.
+Uses Flask-Caching's SimpleCache.
+
+    python benchmarks/bench_stale.py --scrape-seconds 3 --requests 400
+"""
+import argparse
+import statistics
+import sys
+import time
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+from flask import Flask
+from flask_caching import Cache
+
+from bench_serve import synthetic_catalog
+from catalog_store import CatalogStore
+
+
+def make_app(courses: list, scrape_seconds: float) -> tuple:
+    app = Flask('stale')
+    app.config.update(CACHE_TYPE='SimpleCache', CACHE_THRESHOLD=100)
+    store = CatalogStore(Cache(app), poll_interval=0.05)
+
+    def scrape():
+        time.sleep(scrape_seconds)
+        return list(courses)
+
+    @app.route('/api/courses')
+    def get_courses():
+        version, fresh = store.current_state()
+        if version is None:
+            version = store.refresh(scrape)
+        elif not fresh:
+            store.revalidate(scrape)
+        return app.response_class(store.get_blob(version), mimetype='application/json')
+
+    store.publish(courses)
+    return app, store
+
+
+def measure(courses: list, scrape_seconds: float, requests: int, expire) -> list:
+    app, store = make_app(courses, scrape_seconds)
+    client = app.test_client()
+    latencies = []
+    for i in range(requests):
+        if i == requests // 2:
+            expire(store)
+        start = time.perf_counter()
+        client.get('/api/courses')
+        latencies.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.005)
+    return sorted(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--courses', type=int, default=2000)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--scrape-seconds', type=float, default=3.0)
+    args = parser.parse_args()
+
+    courses = synthetic_catalog(args.courses)
+    scenarios = {
+        'hard expiry': lambda store: store.cache.clear(),
+        'soft expiry': lambda store: store.cache.delete(store.FRESH_KEY),
+    }
+    for name, expire in scenarios.items():
+        latencies = measure(courses, args.scrape_seconds, args.requests, expire)
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"{name:<12} p50={statistics.median(latencies):.2f}ms p99={p99:.2f}ms max={latencies[-1]:.2f}ms")
+
+
+if __name__ == '__main__':
+    main()
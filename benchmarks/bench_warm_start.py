@@ -0,0 +1,63 @@
+"""Cold start with an empty cache: restoring the last snapshot from SQLite vs publishing a fresh catalog.
+
+'publish' is the work a cold start did on top of the live scrape itself
+(encoding, compressing and caching the catalog); 'restore' reads the last
+snapshot and its response bodies back from the snapshot database into an
+empty cache. Both are followed by serving one gzip response. Uses
+Flask-Caching's SimpleCache.
+
+    python benchmarks/bench_warm_start.py --courses 1000 10000 50000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+from flask import Flask
+from flask_caching import Cache
+
+from bench_serve import synthetic_catalog
+from catalog_store import CatalogStore
+from snapshot_db import SnapshotDB
+
+
+def empty_store(snapshot_db: SnapshotDB) -> CatalogStore:
+    app = Flask('warm_start')
+    app.config.update(CACHE_TYPE='SimpleCache', CACHE_THRESHOLD=100000)
+    return CatalogStore(Cache(app), snapshot_db=snapshot_db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--courses', type=int, nargs='+', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    for size in args.courses:
+        courses = synthetic_catalog(size)
+        with tempfile.TemporaryDirectory() as directory:
+            snapshot_db = SnapshotDB(os.path.join(directory, 'snapshots.sqlite3'))
+
+            store = empty_store(snapshot_db)
+            start = time.perf_counter()
+            version = store.publish(courses)
+            store.get_blob(version, 'gzip')
+            publish = time.perf_counter() - start
+
+            store = empty_store(snapshot_db)
+            start = time.perf_counter()
+            restored = store.restore()
+            body = store.get_blob(restored, 'gzip')
+            restore = time.perf_counter() - start
+            assert restored == version and body
+
+            database = os.path.getsize(snapshot_db.path)
+            print(f"courses={size:<6} publish={publish * 1000:8.1f}ms restore={restore * 1000:7.1f}ms "
+                  f"database={database / 2 ** 20:5.1f}MiB")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Synthetic provider pages that mirror the markup each extractor targets.
+
+The generated pages are deterministic, so they double as fixtures for
+comparing extraction results and as scalable input for parse benchmarks.
+"""
+import html
+
+
+def _page(body: str) -> str:
+    return f"<!DOCTYPE html><html><head><title>Courses</title></head><body>{body}</body></html>"
+
+
+def coursera_page(count: int = 12, page: int = 1, total: int = None, next_page: bool = None) -> str:
+    cards = []
+    for i in range(count):
+        n = (page - 1) * count + i
+        cards.append(f"""
+<li><div class="css-16m4c33"><div class="cds-ProductCard-gridCard">
+  <div class="cds-CommonCard-previewImage"><img src="https://d3njjcbhbojbot.cloudfront.net/api/utilities/v1/imageproxy/https://images.example.org/coursera/{n}.png?auto=format" alt=""></div>
+  <div class="cds-ProductCard-header">
+    <p class="cds-ProductCard-partnerNames css-vac8rf">University {n % 7}</p>
+    <a class="cds-119 cds-113 cds-115 cds-CommonCard-titleLink css-vflzcf" href="/learn/course-{n}">
+      <h3 class="cds-CommonCard-title css-6ecy9b">Course {n}: {html.escape('Data & Society')}</h3>
+    </a>
+  </div>
+  <div class="cds-ProductCard-body"><div class="cds-CommonCard-bodyContent"><p>Skills you'll gain: topic {n}, topic {n + 1}</p></div></div>
+  <div class="cds-ProductCard-footer"><div class="cds-RatingStat-meter"><p class="css-2xargn">4.{n % 10}</p></div></div>
+</div></div></li>""")
+    # A result count (8 pages worth by default), or a next-page link when next_page is given instead
+    if total is None and next_page is None:
+        total = count * 8
+    if total is not None:
+        footer = f'{total} results'
+    else:
+        footer = f'<a aria-label="Next Page" href="?page={page + 1}">Next</a>' if next_page else ''
+    return _page(f'<main><div class="cds-9 css-0"><ul>{"".join(cards)}</ul><div class="pagination">{footer}</div></div></main>')
+
+
+def harvard_page(count: int = 24) -> str:
+    cards = []
+    for i in range(count):
+        cards.append(f"""
+<article class="node node--type-course">
+  <div class="node__content">
+    <div class="field field--name-field-hero-image field--type-image">
+      <div class="field__item"><a href="/course/harvard-course-{i}"><img src="/sites/default/files/styles/16_9_medium/public/course/{i}.jpg" alt=""></a></div>
+    </div>
+    <div class="group-details">
+      <div class="field field---extra-field-pll-extra-field-subject field--name-extra-field-pll-extra-field-subject field--type- field--label-inline clearfix">
+        <div class="field__label">Subject</div><div class="field__item">Subject {i % 5}</div>
+      </div>
+      <h3 class="field__item"><a href="/course/harvard-course-{i}">Harvard Course {i}</a></h3>
+    </div>
+  </div>
+</article>""")
+    return _page(f'<div class="view-content">{"".join(cards)}</div>')
+
+
+def life_page(count: int = 20) -> str:
+    cards = []
+    for i in range(count):
+        cards.append(f"""
+<span class="ui-core-emotion-cache-4233sn" href="/course/life-course-{i}">
+  <div class="image-wrapper">
+    <img alt="" data-nimg="fill" src="data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7">
+    <noscript><img alt="" data-nimg="fill" src="/_next/image?url=%2Fimages%2Fcourse-{i}.png&amp;w=3840&amp;q=75"></noscript>
+  </div>
+  <h2 class="ui-core-emotion-cache-1k10co">Life Course {i}</h2>
+  <p class="ui-core-emotion-cache-1yh6jjn">Learn life-saving skill {i}.</p>
+  <p class="ui-core-emotion-cache-1h70fjn">{1000 + i} enrolled</p>
+</span>""")
+    return _page(f'<div id="__next">{"".join(cards)}</div>')
+
+
+def who_page(count: int = 30) -> str:
+    cards = []
+    for i in range(count):
+        cards.append(f"""
+<div class="course-card course-card--expandable">
+  <div class="course-card__image"><picture><img src="https://s3.openwho.org/courses/{i}/visual.jpg" alt=""></picture></div>
+  <div class="course-card__content">
+    <div class="course-card__title"><a href="/courses/who-course-{i}">WHO Course {i}</a></div>
+    <div class="course-card__teacher">Health Emergencies Programme</div>
+    <div class="course-card__description"><p>Introduction to outbreak topic {i}.</p></div>
+    <ul class="course-card__info">
+      <li class="course-card__date"><span class="xi-icon fa-regular fa-calendar"></span><span>Self-paced</span></li>
+      <li class="course-card__language"><span class="xi-icon fa-regular fa-language"></span><span>{['English', 'French', 'Spanish'][i % 3]}</span></li>
+      <li class="course-card__certificates"><span class="xi-icon fa-regular fa-file-certificate"></span><span>Record of Achievement</span></li>
+    </ul>
+  </div>
+</div>""")
+    return _page(f'<div class="course-list">{"".join(cards)}</div>')
+
+
+def udemy_page(count: int = 40) -> str:
+    cards = []
+    for i in range(count):
+        stars = '<i class="icon-star"></i>' * (i % 5 + 1) + '<i class="icon-star-half"></i>'
+        cards.append(f"""
+<li class="course-list-course bg-white">
+  <div class="row">
+    <picture><source srcset="https://ccweb.imgix.net/course-{i}.png?w=300 1x, https://ccweb.imgix.net/course-{i}.png?w=600 2x"><img src="https://ccweb.imgix.net/course-{i}.png" alt=""></picture>
+    <a class="course-name color-charcoal" href="/course/udemy-learn-topic-{i}-{40000 + i}"><h2 class="text-1 weight-semi">Learn Topic {i}</h2></a>
+    <p class="text-2 margin-bottom-xsmall">A free introduction to topic {i}.</p>
+    <span class="cmpt-rating-medium">{stars}</span>
+  </div>
+</li>""")
+    return _page(f'<ol class="catalog-grid__results">{"".join(cards)}</ol>')
+
+
+def provider_pages(coursera_pages: int = 8) -> dict:
+    """Return {provider: [page_html, ...]} for a full refresh worth of pages"""
+    return {
+        'coursera': [coursera_page(page=page) for page in range(1, coursera_pages + 1)],
+        'harvard': [harvard_page()],
+        'life': [life_page()],
+        'who': [who_page()],
+        'udemy': [udemy_page()],
+    }
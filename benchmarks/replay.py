@@ -0,0 +1,176 @@
+"""Record provider listing pages once, then replay them from local stand-in hosts.
+
+A recording is a directory holding index.json and one gzipped body per
+page. `record` fetches every page the scraper would fetch from the live
+sites, following pagination the same way; `synthetic` writes the
+deterministic pages from fixtures.py under the providers' real URLs, for
+machines without network access.
+
+When replaying, every recorded host gets its own StandInServer, so
+per-host connection pools and rate limiting behave as they do live, and
+the registered providers are pointed at them for the duration.
+
+    python benchmarks/replay.py record --dir benchmarks/recordings/live
+    python benchmarks/replay.py synthetic --dir benchmarks/recordings/synthetic
+    python benchmarks/replay.py show --dir benchmarks/recordings/live
+"""
+import argparse
+import copy
+import gzip
+import hashlib
+import json
+import os
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+from urllib.parse import urlsplit, urlunsplit
+
+sys.path.append('src')
+sys.path.append('benchmarks')
+
+import providers
+from course_scaper import Scraper
+from fixtures import provider_pages
+from stand_in_server import StandInServer
+
+
+DEFAULT_RECORDING_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings')
+INDEX_FILE = 'index.json'
+
+
+class RecordingSession:
+    """Wraps a requests session and keeps every response it returns"""
+
+    def __init__(self, session):
+        self.session = session
+        self.responses = []
+
+    def get(self, url, **kwargs):
+        response = self.session.get(url, **kwargs)
+        # Read the body while the recording can still see it, streamed or not
+        self.responses.append((url, response.status_code, response.headers.get('Content-Type', ''), response.content))
+        return response
+
+
+def _write(directory: str, source: str, pages: list):
+    """Write pages, (provider, url, status, content type, body) tuples, as a recording"""
+    os.makedirs(os.path.join(directory, 'pages'), exist_ok=True)
+    index = []
+    for provider, url, status, content_type, body in pages:
+        name = os.path.join('pages', hashlib.sha1(url.encode('utf-8')).hexdigest()[:16] + '.gz')
+        with open(os.path.join(directory, name), 'wb') as f:
+            f.write(gzip.compress(body, compresslevel=9, mtime=0))
+        index.append({'provider': provider, 'url': url, 'status': status, 'content_type': content_type, 'file': name})
+    with open(os.path.join(directory, INDEX_FILE), 'w', encoding='utf-8') as f:
+        json.dump({'source': source, 'recorded_at': time.time(), 'pages': index}, f, indent=1)
+
+
+def record(directory: str, names=None) -> int:
+    """Fetch every page of the given providers (all when None) from the live sites into a recording.
+
+    Providers are scraped one after another with the HTTP cache and page
+    store off, so each page is fetched in full exactly as the scraper asks
+    for it.
+
+    Returns:
+        int: Number of pages recorded
+    """
+    scraper = Scraper(response_cache=False, page_store=False)
+    session = scraper.session = RecordingSession(scraper.session)
+    pages = []
+    for name in names or providers.provider_names():
+        session.responses = []
+        courses = scraper.scrape_provider(name)
+        print(f"{name}: {len(session.responses)} pages, {len(courses)} courses")
+        pages.extend((name, *response) for response in session.responses)
+    _write(directory, 'live', pages)
+    return len(pages)
+
+
+def synthetic(directory: str) -> int:
+    """Write the fixtures.py pages under the providers' real URLs as a recording"""
+    pages = []
+    for name, contents in provider_pages().items():
+        provider = providers.get_provider(name)
+        if provider.paginated:
+            first_page, _ = provider.page_range()
+            urls = [provider.url_for_page(first_page + offset) for offset in range(len(contents))]
+        else:
+            urls = provider.urls
+        pages.extend((name, url, 200, 'text/html; charset=utf-8', content.encode('utf-8'))
+                     for url, content in zip(urls, contents))
+    _write(directory, 'synthetic', pages)
+    return len(pages)
+
+
+def load(directory: str) -> dict:
+    """Read a recording: index.json with each page's body loaded under 'body'"""
+    with open(os.path.join(directory, INDEX_FILE), encoding='utf-8') as f:
+        recording = json.load(f)
+    for page in recording['pages']:
+        with open(os.path.join(directory, page['file']), 'rb') as f:
+            page['body'] = gzip.decompress(f.read())
+    return recording
+
+
+def _local_url(url: str, servers: dict) -> str:
+    parts = urlsplit(url)
+    local = urlsplit(servers[parts.netloc].url)
+    return urlunsplit((local.scheme, local.netloc, parts.path, parts.query, ''))
+
+
+@contextmanager
+def replaying(recording: dict, **server_options):
+    """Serve a recording from one local stand-in per recorded host and point the providers at them.
+
+    Args:
+        recording (dict): A recording returned by load()
+        **server_options: StandInServer latency and error injection options,
+            e.g. response_delay, connect_delay, error_rate
+
+    Yields:
+        dict: Recorded host mapped to the StandInServer replaying it
+    """
+    hosts = {}
+    for page in recording['pages']:
+        route = (page['body'], page['content_type'] or 'text/html', page['status'])
+        hosts.setdefault(urlsplit(page['url']).netloc, {})[page['url']] = route
+
+    with ExitStack() as stack:
+        servers = {host: stack.enter_context(StandInServer(routes=routes, **server_options))
+                   for host, routes in hosts.items()}
+        registered = dict(providers.REGISTRY)
+        for name, provider in registered.items():
+            replayed = copy.copy(provider)
+            replayed.urls = [_local_url(url, servers) for url in provider.urls if urlsplit(url).netloc in servers]
+            if provider.paginated and urlsplit(provider.page_url).netloc in servers:
+                # Only the host changes, so "{page}" survives in the template
+                replayed.page_url = _local_url(provider.page_url, servers)
+            providers.REGISTRY[name] = replayed
+        try:
+            yield servers
+        finally:
+            providers.REGISTRY.clear()
+            providers.REGISTRY.update(registered)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('command', choices=('record', 'synthetic', 'show'))
+    parser.add_argument('--dir', default=DEFAULT_RECORDING_DIR)
+    parser.add_argument('--providers', nargs='+', help='Providers to record, every registered one by default')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        print(f"Recorded {record(args.dir, args.providers)} pages to {args.dir}")
+    elif args.command == 'synthetic':
+        print(f"Wrote {synthetic(args.dir)} synthetic pages to {args.dir}")
+    else:
+        recording = load(args.dir)
+        print(f"{recording['source']} recording from {time.ctime(recording['recorded_at'])}")
+        for page in recording['pages']:
+            print(f"{page['provider']:<9} {page['status']} {len(page['body']):>8}B {page['url']}")
+
+
+if __name__ == '__main__':
+    main()
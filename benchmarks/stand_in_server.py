@@ -0,0 +1,144 @@
+"""Local HTTP stand-in for provider sites, used by the benchmarks.
+
+The server speaks HTTP/1.1 with keep-alive, and can add a delay whenever a
+new TCP connection is accepted to model the TCP+TLS handshake cost that a
+real provider connection pays. With an ETag configured it answers
+conditional requests with 304 Not Modified.
+
+To exercise retries and throttling it can fail a share of requests with a
+given status, and enforce a requests-per-second limit, answering 429 with
+Retry-After like a provider protecting itself.
+
+With routes it serves a different recorded response per path and query,
+and 404 for anything else, to replay a provider site offline.
+"""
+import random
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+
+def route_key(target: str) -> str:
+    """Path and query of a URL or request target, with query parameters in a canonical order"""
+    parts = urlsplit(target)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return (parts.path or '/') + ('?' + query if query else '')
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+        if self.server.connect_delay:
+            time.sleep(self.server.connect_delay)
+
+    def _send_error(self, status: int, retry_after=None):
+        self.server.count(status)
+        self.send_response(status)
+        if retry_after is not None:
+            self.send_header('Retry-After', str(retry_after))
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_GET(self):
+        body, content_type, status = self.server.body, self.server.content_type, 200
+        if self.server.routes is not None:
+            route = self.server.routes.get(route_key(self.path))
+            if route is None:
+                self._send_error(404)
+                return
+            body, content_type, status = route
+        if self.server.response_delay:
+            time.sleep(self.server.response_delay)
+        if not self.server.within_rate_limit():
+            self._send_error(429, retry_after=1)
+            return
+        if self.server.error_rate and self.server.random.random() < self.server.error_rate:
+            self._send_error(self.server.error_status, self.server.error_retry_after)
+            return
+        etag = self.server.etag
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.server.not_modified += 1
+            self.server.count(304)
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.server.count(status)
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, connect_delay: float = 0.0, response_delay: float = 0.0, body: bytes = b'<html></html>',
+                 etag: str = None, error_rate: float = 0.0, error_status: int = 503, error_retry_after=None,
+                 rate_limit: float = None, seed: int = 0, content_type: str = 'text/html; charset=utf-8',
+                 routes: dict = None):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.connect_delay = connect_delay
+        self.response_delay = response_delay
+        self.body = body
+        self.content_type = content_type
+        # route_key(path) -> (body, content type, status), served instead of body when set
+        self.routes = {route_key(path): route for path, route in routes.items()} if routes is not None else None
+        # When set, responses carry this ETag and matching If-None-Match requests get a 304
+        self.etag = etag
+        # Share of requests failed with error_status (and Retry-After, seconds or an HTTP date, when set)
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.error_retry_after = error_retry_after
+        # Requests per second served before answering 429, None for no limit
+        self.rate_limit = rate_limit
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.not_modified = 0
+        self.statuses = {}
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def count(self, status: int):
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+    def within_rate_limit(self) -> bool:
+        """Record a request against the limit over the last second; False if it is over"""
+        if self.rate_limit is None:
+            return True
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                return False
+            self._recent.append(now)
+            return True
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+import os
+import time
+
+import aiohttp
+
+from course_scaper import Scraper
+from http_cache import FetchedPage, get_response_cache
+from http_session import POOL_MAXSIZE
+from metrics import PARSE_SECONDS, PROVIDER_COURSES, PROVIDER_SECONDS, observe_fetch
+from page_store import get_page_store
+from pagination import PAGE_CONCURRENCY, last_page_for
+from parse_pool import get_parse_pool, parse_page
+from providers import get_provider, provider_names
+from rate_limit import RETRY_STATUSES, RetryPolicy, get_rate_limiter
+
+
+# Maximum number of requests in flight across all providers
+ASYNC_MAX_CONCURRENCY = int(os.getenv('SCRAPER_ASYNC_MAX_CONCURRENCY', 32))
+
+
+def fetch_trace_config() -> aiohttp.TraceConfig:
+    """Trace hooks filling a request's trace_request_ctx dict with its 'dns' and 'connect' seconds.
+
+    Like the threads engine, connect time includes DNS resolution.
+    """
+    async def dns_start(session, context, params):
+        context.dns_start = time.monotonic()
+
+    async def dns_end(session, context, params):
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx['dns'] = time.monotonic() - context.dns_start
+
+    async def connect_start(session, context, params):
+        context.connect_start = time.monotonic()
+
+    async def connect_end(session, context, params):
+        if context.trace_request_ctx is not None:
+            context.trace_request_ctx['connect'] = time.monotonic() - context.connect_start
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(dns_start)
+    trace_config.on_dns_resolvehost_end.append(dns_end)
+    trace_config.on_connection_create_start.append(connect_start)
+    trace_config.on_connection_create_end.append(connect_end)
+    return trace_config
+
+
+class AsyncScraper(Scraper):
+    """Asyncio counterpart of Scraper.
+
+    Every provider runs as a coroutine on a single event loop, so adding
+    providers or pages adds tasks rather than OS threads. A global semaphore
+    caps the number of requests in flight.
+    """
+
+    def __init__(self, max_concurrency: int = ASYNC_MAX_CONCURRENCY, limit_per_host: int = POOL_MAXSIZE,
+                 parse_pool=None, response_cache=None, page_store=None, rate_limiter=None, retry_policy=None):
+        self.logger = logging.getLogger(__name__)
+        logging.basicConfig(level=logging.INFO)  # Basic configuration for logging
+        self.parse_pool = parse_pool if parse_pool is not None else get_parse_pool()
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+        self.page_store = page_store if page_store is not None else get_page_store()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        self.max_concurrency = max_concurrency
+        self.limit_per_host = limit_per_host
+        # Opened in scrape_all, one session per event loop
+        self.session = None
+        self._semaphore = None
+
+    async def _make_request(self, url: str, timeout: int = 10):
+        """Make a conditional HTTP request with error handling and random headers, returning a FetchedPage.
+
+        Paced by the host's rate limiter and retried like Scraper._make_request.
+        """
+        limiter = self.rate_limiter.host(url)
+        attempt = 0
+        while True:
+            headers = self._get_random_headers()
+            cached = self.response_cache.get(url) if self.response_cache else None
+            headers.update(self.response_cache.conditional_headers(cached) if cached else {})
+
+            # Wait for the host before taking a global slot, so a paused host holds none
+            await limiter.acquire_async()
+            start = time.monotonic()
+            status = None
+            timings = {}
+            try:
+                async with self._semaphore:
+                    timings['sent'] = time.monotonic()
+                    async with self.session.get(url, timeout=aiohttp.ClientTimeout(total=timeout), headers=headers,
+                                                trace_request_ctx=timings) as response:
+                        timings['headers'] = time.monotonic()
+                        status = response.status
+                        if status in RETRY_STATUSES and self.retry_policy.can_retry(attempt):
+                            retry_after = response.headers.get('Retry-After')
+                            delay = self.retry_policy.delay(attempt, retry_after)
+                            pause_host = self.retry_policy.pauses_host(status, retry_after)
+                            self.logger.warning(f"Retrying {url} in {delay:.1f}s after HTTP {status}")
+                        else:
+                            if status == 304 and cached:
+                                return FetchedPage(url, cached['body'], status_code=304, headers=response.headers, not_modified=True)
+
+                            response.raise_for_status()
+                            text = await response.text()
+                            timings['done'] = time.monotonic()
+                            if self.response_cache:
+                                self.response_cache.store_response(url, text, response.headers)
+                            return FetchedPage(url, text, status_code=status, headers=response.headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = status is None and not isinstance(e, aiohttp.InvalidURL)
+                if not retryable or not self.retry_policy.can_retry(attempt):
+                    self.logger.error(f"Error fetching URL {url}: {e}")
+                    return None
+                delay = self.retry_policy.delay(attempt)
+                pause_host = False
+                self.logger.warning(f"Retrying {url} in {delay:.1f}s after {e!r}")
+            finally:
+                limiter.release(time.monotonic() - start, status)
+                observe_fetch(url, status, timings)
+
+            if pause_host:
+                limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _parse(self, provider: str, page_content: str) -> list:
+        """Parse a page off the event loop, so fetches keep being served meanwhile.
+
+        Pages go to the process pool when one is configured, otherwise (executor
+        None) to the loop's default thread pool.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_pool.executor, parse_page, provider, page_content, self.parse_pool.backend)
+
+    async def _parse_pages(self, provider: str, pages: list) -> list:
+        """Extract courses from (url, page) pairs, parsing only pages whose content changed"""
+        reused, to_parse = self._split_unchanged(pages)
+        with PARSE_SECONDS.time(provider=provider):
+            parsed = await asyncio.gather(*(self._parse(provider, text) for _, text, _ in to_parse))
+        return self._merge_parsed(pages, reused, to_parse, parsed)
+
+    async def _fetch_page(self, provider, url: str):
+        """Fetch one listing page of a provider"""
+        response = await self._make_request(url)
+        if response is None:
+            self.logger.error(f"Failed to fetch {provider.label} page {url}")
+        return response
+
+    async def _fetch_pages(self, provider, urls) -> list:
+        """Fetch pages concurrently, returning (url, response) pairs"""
+        urls = list(urls)
+        responses = await asyncio.gather(*(self._fetch_page(provider, url) for url in urls))
+        return list(zip(urls, responses))
+
+    async def _scrape_paginated(self, provider) -> list:
+        """Scrape a paginated provider, discovering from the first page how many pages to fetch"""
+        first_page, last_page = provider.page_range()
+        pages = await self._fetch_pages(provider, [provider.url_for_page(first_page)])
+        courses_list = await self._parse_pages(provider.name, pages)
+        response = pages[0][1]
+        if response is None or not courses_list:
+            return courses_list
+
+        total = self._result_count(response)
+        if total is not None:
+            last = last_page_for(first_page, last_page, total, len(courses_list))
+            self.logger.info(f"{provider.label} reports {total} results, fetching pages {first_page}-{last}")
+            pages = await self._fetch_pages(provider, (provider.url_for_page(page) for page in range(first_page + 1, last + 1)))
+            return courses_list + await self._parse_pages(provider.name, pages)
+
+        # Batches double up to PAGE_CONCURRENCY, so short result sets cost few extra requests
+        page, batch_size = first_page + 1, 1
+        while self._has_next_page(response) and page <= last_page:
+            batch_pages = range(page, min(page + batch_size, last_page + 1))
+            batch = await self._fetch_pages(provider, (provider.url_for_page(number) for number in batch_pages))
+            for url, response in batch:
+                page_courses = await self._parse_pages(provider.name, [(url, response)]) if response is not None else []
+                if not page_courses:
+                    return courses_list
+                courses_list.extend(page_courses)
+                if not self._has_next_page(response):
+                    return courses_list
+            page += len(batch)
+            batch_size = min(batch_size * 2, PAGE_CONCURRENCY)
+        return courses_list
+
+    async def scrape_provider(self, name: str) -> list:
+        """Scrape every listing page of a registered provider"""
+        provider = get_provider(name)
+        try:
+            with PROVIDER_SECONDS.time(provider=name):
+                if provider.paginated:
+                    courses_list = await self._scrape_paginated(provider)
+                else:
+                    pages = await self._fetch_pages(provider, provider.urls)
+                    if all(response is None for _, response in pages):
+                        self.logger.error(f"Failed to fetch {provider.label} courses")
+                        return []
+                    courses_list = await self._parse_pages(name, pages)
+
+            PROVIDER_COURSES.set(len(courses_list), provider=name)
+            self.logger.info(f"Successfully scraped {len(courses_list)} {provider.label} courses")
+            return courses_list
+
+        except Exception as e:
+            self.logger.error(f"Error during {provider.label} courses scraping: {str(e)}")
+            return []
+
+    async def _with_deadline(self, name: str, scrape, deadline: float):
+        """Await a provider scraper, giving up on it after deadline seconds"""
+        try:
+            return await asyncio.wait_for(scrape, deadline)
+        except asyncio.TimeoutError:
+            self.logger.error(f"{name} scraping missed its {deadline}s deadline")
+            return None
+
+    async def scrape_all(self, providers=None, deadline: float = None) -> dict:
+        """Run provider scrapers concurrently on the current event loop.
+
+        Args:
+            providers (list): Provider names, every registered provider when None
+            deadline (float): Seconds each provider may take, unlimited when None
+
+        Returns:
+            dict: Provider name mapped to its list of courses, or None if it missed the deadline
+        """
+        names = provider_names() if providers is None else list(providers)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency, limit_per_host=self.limit_per_host)
+        async with aiohttp.ClientSession(connector=connector, trace_configs=[fetch_trace_config()]) as session:
+            self.session = session
+            results = await asyncio.gather(*(self._with_deadline(name, self.scrape_provider(name), deadline) for name in names))
+        self.session = None
+        return dict(zip(names, results))
+
+    def run(self, providers=None, deadline: float = None) -> dict:
+        """Blocking entry point that runs scrape_all on a fresh event loop"""
+        return asyncio.run(self.scrape_all(providers, deadline))
@@ -0,0 +1,55 @@
+import uuid
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+
+# Query parameters that only track the visit and never change the target page
+TRACKING_PARAM_PREFIXES = ('utm_',)
+TRACKING_PARAMS = {'fbclid', 'gclid', 'mc_cid', 'mc_eid', 'ref', 'referrer'}
+
+# Namespace for content-derived course IDs
+COURSE_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, 'https://free-course-hive.onrender.com/courses')
+
+
+def canonical_link(link: str) -> str:
+    """Normalise a course URL so the same course always yields the same string.
+
+    Lowercases scheme and host, drops the fragment, tracking parameters and
+    the trailing slash, and sorts the remaining query parameters.
+    """
+    if not link or link == 'N/A':
+        return ''
+    parts = urlsplit(link.strip())
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not (key.lower().startswith(TRACKING_PARAM_PREFIXES) or key.lower() in TRACKING_PARAMS)
+    ]
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(sorted(query)), ''))
+
+
+def course_id(source: str, link: str, title: str = '') -> str:
+    """Deterministic course ID derived from the source and the canonical link.
+
+    The ID keeps the UUID format of the previous random IDs. Courses without
+    a link fall back to their title so they still get a stable ID.
+    """
+    key = canonical_link(link) or f"title:{title.strip().lower()}"
+    return str(uuid.uuid5(COURSE_ID_NAMESPACE, f"{source}|{key}"))
+
+
+def diff_catalogs(old_courses, new_courses) -> dict:
+    """Compute the changes between two catalogs keyed by course ID.
+
+    Returns:
+        dict: 'added' and 'changed' hold full courses, 'removed' holds IDs
+    """
+    old_by_id = {course['id']: course for course in old_courses or []}
+    new_by_id = {course['id']: course for course in new_courses or []}
+
+    added = [course for course_id_, course in new_by_id.items() if course_id_ not in old_by_id]
+    changed = [
+        course for course_id_, course in new_by_id.items()
+        if course_id_ in old_by_id and old_by_id[course_id_] != course
+    ]
+    removed = [course_id_ for course_id_ in old_by_id if course_id_ not in new_by_id]
+    return {'added': added, 'removed': removed, 'changed': changed}
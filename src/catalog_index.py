@@ -0,0 +1,106 @@
+from bisect import bisect_left
+
+
+# Course fields that can be filtered on with /api/courses?<field>=<value>
+FILTER_FIELDS = ('provider', 'category', 'language', 'certificate')
+
+
+def _index_values(field: str, value) -> set:
+    """Normalised index keys for a field value.
+
+    Provider names like "coursera / University of X" are also indexed under
+    their source prefix, so provider=coursera matches every Coursera course.
+    build_postings adds each course's registry source the same way.
+    """
+    if value is None or value == 'N/A':
+        return set()
+    value = str(value).strip().lower()
+    keys = {value}
+    if field == 'provider' and ' / ' in value:
+        keys.add(value.split(' / ', 1)[0])
+    return keys
+
+
+def _contains(positions: list, position: int) -> bool:
+    index = bisect_left(positions, position)
+    return index < len(positions) and positions[index] == position
+
+
+def build_postings(courses) -> dict:
+    """Per-field inverted lists: field -> value -> ascending catalog positions"""
+    postings = {field: {} for field in FILTER_FIELDS}
+    for position, course in enumerate(courses):
+        for field in FILTER_FIELDS:
+            keys = _index_values(field, course.get(field))
+            if field == 'provider':
+                # provider=who matches WHO courses whatever their provider field says
+                keys |= _index_values(field, getattr(course, 'source', None))
+            for key in keys:
+                postings[field].setdefault(key, []).append(position)
+    return postings
+
+
+class CatalogIndex:
+    """Filter, paginate and project one catalog snapshot without scanning it.
+
+    Postings are built once per snapshot at publish time. A query intersects
+    the posting lists of the requested filters and starts the page at the
+    cursor position with a binary search, so its cost depends on the page
+    and the smallest posting list, not on the catalog size.
+    """
+
+    def __init__(self, courses, postings: dict = None):
+        self.courses = courses
+        self.postings = postings if postings is not None else build_postings(courses)
+        self._positions = None
+
+    def course(self, course_id: str):
+        """The course with this ID, or None"""
+        if self._positions is None:
+            self._positions = {course['id']: position for position, course in enumerate(self.courses)}
+        position = self._positions.get(course_id)
+        return self.courses[position] if position is not None else None
+
+    def matching_positions(self, filters: dict):
+        """Ascending catalog positions matching every filter (None means all positions)"""
+        lists = [
+            self.postings.get(field, {}).get(str(value).strip().lower(), [])
+            for field, value in filters.items()
+        ]
+        if not lists:
+            return None
+
+        # Walk the shortest list and binary-search the others
+        lists.sort(key=len)
+        smallest, others = lists[0], lists[1:]
+        return [position for position in smallest if all(_contains(other, position) for other in others)]
+
+    def query(self, filters: dict = None, cursor: int = 0, limit: int = 20, fields=None) -> dict:
+        """Return one page of matching courses.
+
+        Args:
+            filters (dict): field -> value, fields limited to FILTER_FIELDS
+            cursor (int): Catalog position to resume from
+            limit (int): Maximum number of courses in the page
+            fields (list): Course keys to keep, all keys when None
+
+        Returns:
+            dict: 'courses', 'total' matches and 'next_cursor' (None on the last page)
+        """
+        positions = self.matching_positions(filters or {})
+        if positions is None:
+            total = len(self.courses)
+            page_positions = range(cursor, min(cursor + limit, total))
+            has_more = cursor + limit < total
+        else:
+            total = len(positions)
+            start = bisect_left(positions, cursor)
+            page_positions = positions[start:start + limit]
+            has_more = start + limit < total
+
+        courses = [self.courses[position] for position in page_positions]
+        if fields:
+            courses = [{field: course[field] for field in fields if field in course} for course in courses]
+
+        next_cursor = page_positions[-1] + 1 if has_more and len(page_positions) else None
+        return {'courses': courses, 'total': total, 'next_cursor': next_cursor}
@@ -0,0 +1,602 @@
+import gzip
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip and identity are always served
+    brotli = None
+
+from catalog import diff_catalogs
+from course import as_course, course_json, decode_courses, encode_courses
+from metrics import CATALOG_COURSES, CATALOG_PUBLISHED, REFRESH_STAGE_SECONDS
+from catalog_index import CatalogIndex, build_postings
+from search_index import SearchIndex
+
+
+logger = logging.getLogger(__name__)
+
+# Content-Encodings stored for every snapshot, in order of preference
+ENCODINGS = ('br', 'gzip', 'identity') if brotli else ('gzip', 'identity')
+# Compression levels of the stored bodies. Every publish compresses the whole
+# catalog while holding the refresh lock, and the top levels cost hundreds of
+# times more than these for a few percent smaller bodies
+GZIP_LEVEL = int(os.getenv('SCRAPER_GZIP_LEVEL', 6))
+BROTLI_QUALITY = int(os.getenv('SCRAPER_BROTLI_QUALITY', 5))
+# Courses per stored NDJSON chunk; a streaming request holds one chunk at a time
+NDJSON_CHUNK_SIZE = 500
+# Deletes the refresh lock only while it still holds the releasing caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def encode_catalog(courses) -> dict:
+    """Serialize a catalog to JSON once and compress it with every supported encoding.
+
+    Returns:
+        dict: Content-Encoding mapped to the response body bytes
+    """
+    body = json.dumps(courses, separators=(',', ':'), default=course_json).encode('utf-8')
+    blobs = {'identity': body, 'gzip': gzip.compress(body, compresslevel=GZIP_LEVEL)}
+    if brotli:
+        blobs['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return blobs
+
+
+def encode_ndjson_chunks(courses, chunk_size: int = NDJSON_CHUNK_SIZE) -> list:
+    """Serialize a catalog as newline-delimited JSON, split into chunks of chunk_size courses"""
+    chunks = []
+    for start in range(0, len(courses), chunk_size):
+        lines = [json.dumps(course, separators=(',', ':'), default=course_json) for course in courses[start:start + chunk_size]]
+        chunks.append(('\n'.join(lines) + '\n').encode('utf-8'))
+    return chunks
+
+
+def catalog_version(courses) -> str:
+    """Content hash of a catalog, independent of the order courses are served in"""
+    digest = hashlib.sha1()
+    for course in sorted(courses, key=lambda course: course['id']):
+        digest.update(json.dumps(course, sort_keys=True, default=course_json).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def _remaining(timeout: int, age: float) -> int:
+    """Seconds left of timeout after age, at least 1 since a cache timeout of 0 never expires"""
+    return max(1, math.ceil(timeout - age))
+
+
+class CatalogStore:
+    """Versioned catalog snapshots kept in the Flask cache.
+
+    Every published catalog is stored under its content version, and a
+    pointer key names the current one. Older snapshots are kept for
+    history_timeout so clients can ask for the changes since the version
+    they already hold.
+
+    Refreshes are single-flight: a lock key makes sure only one thread in
+    one worker scrapes at a time, while everyone else is served the last
+    published snapshot or waits for the new one. On Redis the lock is taken
+    with SET NX EX and released with a compare-and-delete script; other
+    backends fall back to the cache's add.
+
+    Expiry has two tiers. After soft_timeout the current catalog is stale:
+    it is still served, and a background refresh is started. The pointer
+    itself only expires after timeout, the hard TTL, which matters only when
+    refreshes keep failing.
+
+    With a SnapshotDB every published catalog is also written to disk, and
+    restore() brings the newest one back into an empty cache without scraping.
+    """
+
+    CURRENT_KEY = 'catalog:current'
+    # Last published version, kept as long as its snapshot to serve while refreshing
+    LATEST_KEY = 'catalog:latest'
+    # Present while the current catalog is younger than soft_timeout
+    FRESH_KEY = 'catalog:fresh'
+    LOCK_KEY = 'catalog:refresh-lock'
+
+    def __init__(self, cache, timeout: int = 7 * 86400, history_timeout: int = 7 * 86400, memo_size: int = 6,
+                 lock_timeout: int = 900, wait_timeout: float = 120, poll_interval: float = 0.5,
+                 soft_timeout: int = 86400, retry_interval: int = 300, snapshot_db=None):
+        self.cache = cache
+        self.snapshot_db = snapshot_db
+        self.timeout = timeout
+        self.soft_timeout = soft_timeout
+        # Pause between background refreshes while they keep failing
+        self.retry_interval = retry_interval
+        self.history_timeout = max(history_timeout, timeout)
+        # The lock outlives a hung refresh by at most lock_timeout
+        self.lock_timeout = lock_timeout
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        # Per-process copy of recently served blobs, so a cache hit costs one
+        # small version lookup instead of transferring the whole body
+        self._memo = OrderedDict()
+        self._memo_size = memo_size
+        self._memo_lock = threading.Lock()
+        # Indexes of the snapshots this process has queried, by version
+        self._indexes = OrderedDict()
+        # Full-text index as a (version, SearchIndex) pair, replaced whole by an
+        # index updated on a copy, so searches never wait for an update
+        self._search = None
+        # Held while an updated search index is built
+        self._search_lock = threading.Lock()
+        # Held while rebuilding bodies missing from the cache, so concurrent
+        # requests in this process wait for one rebuild instead of each encoding
+        self._rebuild_lock = threading.Lock()
+        self._release_script = None
+
+    def _snapshot_key(self, version: str) -> str:
+        return f'catalog:snapshot:{version}'
+
+    def _blob_key(self, version: str, encoding: str) -> str:
+        return f'catalog:blob:{version}:{encoding}'
+
+    def _index_key(self, version: str) -> str:
+        return f'catalog:index:{version}'
+
+    def _delta_key(self, since: str, version: str) -> str:
+        return f'catalog:delta:{since}:{version}'
+
+    def _ndjson_key(self, version: str, chunk) -> str:
+        return f'catalog:ndjson:{version}:{chunk}'
+
+    def current_version(self):
+        """Version of the catalog currently being served, or None when nothing is cached"""
+        return self.cache.get(self.CURRENT_KEY)
+
+    def current_state(self) -> tuple:
+        """(current version or None, whether it is still within the soft TTL), in one cache round trip"""
+        version, fresh = self.cache.get_many(self.CURRENT_KEY, self.FRESH_KEY)
+        return version, fresh is not None and fresh == version
+
+    def get(self, version: str = None):
+        """Return the courses of a snapshot (the current one by default), or None"""
+        version = version or self.current_version()
+        if version is None:
+            return None
+        data = self.cache.get(self._snapshot_key(version))
+        if data is None and self.snapshot_db is not None:
+            # Older snapshots outlive the cache on disk, so deltas from them still work
+            data = self._snapshot_db_call(self.snapshot_db.courses, version)
+        return decode_courses(data) if data is not None else None
+
+    def publish(self, courses) -> str:
+        """Store courses as a new snapshot, make it current and return its version"""
+        start = time.monotonic()
+        courses = [as_course(course) for course in courses]
+        version = catalog_version(courses)
+        previous = self.current_version()
+        snapshot = encode_courses(courses)
+        CATALOG_COURSES.set(len(courses))
+        CATALOG_PUBLISHED.set(time.time())
+
+        if version == previous and self._available(version) and self._extend_bodies(version):
+            # Nothing changed since the current snapshot and its bodies are all
+            # still stored: extend it instead of re-encoding
+            REFRESH_STAGE_SECONDS.observe(time.monotonic() - start, stage='encode')
+            with REFRESH_STAGE_SECONDS.time(stage='cache_write'):
+                self.cache.set(self._snapshot_key(version), snapshot, timeout=self.history_timeout)
+                self._set_pointers(version)
+            if self.snapshot_db is not None:
+                with REFRESH_STAGE_SECONDS.time(stage='snapshot_db'):
+                    # restore() counts a snapshot's age from its last publish; one
+                    # missing from disk is saved, its bodies rebuilt when restored
+                    if not self._snapshot_db_call(self.snapshot_db.touch, version):
+                        self._snapshot_db_call(self.snapshot_db.save, version, snapshot, len(courses))
+            return version
+
+        blobs = encode_catalog(courses)
+        chunks = encode_ndjson_chunks(courses)
+        postings = build_postings(courses)
+        REFRESH_STAGE_SECONDS.observe(time.monotonic() - start, stage='encode')
+
+        with REFRESH_STAGE_SECONDS.time(stage='cache_write'):
+            self.cache.set(self._snapshot_key(version), snapshot, timeout=self.history_timeout)
+            self._store_blobs(version, blobs)
+            self._write_ndjson(version, chunks)
+            self.cache.set(self._index_key(version), postings, timeout=self.timeout)
+        if self.snapshot_db is not None:
+            with REFRESH_STAGE_SECONDS.time(stage='snapshot_db'):
+                self._snapshot_db_call(self.snapshot_db.save, version, snapshot, len(courses), blobs)
+        self._set_pointers(version)
+
+        with self._search_lock:
+            # Keep an already loaded search index current without waiting for a query
+            if self._search is not None:
+                self._index_search(version, courses)
+
+        if previous and previous != version:
+            delta = self.delta(previous, version)
+            if delta is not None:
+                logger.info(f"Catalog {previous} -> {version}: {len(delta['added'])} added, "
+                            f"{len(delta['removed'])} removed, {len(delta['changed'])} changed")
+        return version
+
+    def _extend(self, key: str, timeout: int) -> bool:
+        """Restart the TTL of a stored key, returning False if it is gone"""
+        client, prefix = self._redis()
+        if client is not None:
+            return bool(client.expire(f'{prefix}{key}', timeout))
+        value = self.cache.get(key)
+        if value is None:
+            return False
+        self.cache.set(key, value, timeout=timeout)
+        return True
+
+    def _extend_bodies(self, version: str) -> bool:
+        """Give a snapshot's blobs, NDJSON chunks and postings a full TTL again.
+
+        Returns:
+            bool: False if any of them is gone and the snapshot must be written in full
+        """
+        count = self.cache.get(self._ndjson_key(version, 'count'))
+        if count is None:
+            return False
+        keys = [self._blob_key(version, encoding) for encoding in ENCODINGS]
+        keys += [self._ndjson_key(version, number) for number in range(count)]
+        keys += [self._ndjson_key(version, 'count'), self._index_key(version)]
+        return all(self._extend(key, self.timeout) for key in keys)
+
+    def _snapshot_db_call(self, method, *args):
+        # The cache stays authoritative: a failing disk store is logged, not raised
+        try:
+            return method(*args)
+        except Exception:
+            logger.exception("Snapshot database unavailable")
+            return None
+
+    def restore(self):
+        """Make the newest snapshot on disk current when the cache holds no catalog.
+
+        This is a local read with no scraping or re-encoding; the NDJSON chunks
+        and filter postings are rebuilt on first use. The restored pointers
+        keep only what is left of their TTLs: a snapshot older than
+        soft_timeout is restored stale, so the next request refreshes it in
+        the background, and one older than timeout is not restored at all.
+
+        Returns:
+            str: The restored version, or None if nothing was restored
+        """
+        if self.snapshot_db is None:
+            return None
+        token = self._acquire_lock()
+        if token is None:
+            # A refresh is running and will publish shortly
+            return None
+        try:
+            if self.current_version() is not None:
+                return None
+            saved = self._snapshot_db_call(self.snapshot_db.latest)
+            if saved is None:
+                return None
+            version = saved['version']
+            age = max(0.0, time.time() - saved['published_at'])
+            if age >= self.timeout:
+                logger.info(f"Not restoring catalog {version}: {age / 3600:.1f}h old, past the hard TTL")
+                return None
+            self.cache.set(self._snapshot_key(version), saved['courses'], timeout=_remaining(self.history_timeout, age))
+            self._store_blobs(version, saved['blobs'])
+            self._set_pointers(version, age)
+            logger.info(f"Restored catalog {version} from disk ({age / 3600:.1f}h old)")
+            return version
+        finally:
+            self._release_lock(token)
+
+    def _set_pointers(self, version: str, age: float = 0):
+        # A catalog published age seconds ago only gets what is left of each TTL
+        self.cache.set(self.CURRENT_KEY, version, timeout=_remaining(self.timeout, age))
+        self.cache.set(self.LATEST_KEY, version, timeout=_remaining(self.history_timeout, age))
+        if age < self.soft_timeout:
+            self.cache.set(self.FRESH_KEY, version, timeout=_remaining(self.soft_timeout, age))
+        else:
+            self.cache.delete(self.FRESH_KEY)
+
+    def _available(self, version) -> bool:
+        return version is not None and self.cache.has(self._snapshot_key(version))
+
+    def latest_version(self):
+        """Last published version whose snapshot is still stored, even if no longer current"""
+        version = self.cache.get(self.LATEST_KEY)
+        return version if self._available(version) else None
+
+    def refresh(self, scrape, wait: bool = True):
+        """Publish scrape() unless another thread or worker is already doing it.
+
+        The caller that takes the lock scrapes and publishes. Other callers
+        get the last published snapshot while the refresh runs, or, when
+        there is none, wait up to wait_timeout for the refresh to publish.
+
+        Args:
+            scrape (callable): Returns the full course list
+            wait (bool): Wait for a refresh in progress instead of returning None
+
+        Returns:
+            str: The published (or last published) version, or None
+        """
+        stale = self.cache.get(self.CURRENT_KEY)
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            token = self._acquire_lock()
+            if token is not None:
+                try:
+                    return self.publish(scrape())
+                finally:
+                    self._release_lock(token)
+
+            latest = self.latest_version()
+            if latest is not None:
+                return latest
+            if not wait or time.monotonic() >= deadline:
+                logger.warning("Catalog refresh in progress elsewhere, no snapshot to serve")
+                return None
+
+            # Wait for the lock holder to publish; take over if it gave up
+            time.sleep(self.poll_interval)
+            version = self.cache.get(self.CURRENT_KEY)
+            if version != stale and self._available(version):
+                return version
+
+    def revalidate(self, scrape, background: bool = True) -> bool:
+        """Refresh a stale catalog in a background thread unless a refresh is already running.
+
+        With background=False the refresh runs in the calling thread, as on a
+        scrape worker that has nothing else to do meanwhile.
+
+        Returns:
+            bool: True if this call started the refresh
+        """
+        token = self._acquire_lock()
+        if token is None:
+            return False
+        if not background:
+            self._revalidate(scrape, token)
+            return True
+        thread = threading.Thread(target=self._revalidate, args=(scrape, token))
+        thread.daemon = True
+        thread.start()
+        return True
+
+    def _revalidate(self, scrape, token: str):
+        try:
+            self.publish(scrape())
+        except Exception:
+            # The stale catalog keeps being served until the hard TTL;
+            # hold it as fresh for a while so providers are not retried on every request
+            logger.exception("Background catalog refresh failed")
+            version = self.current_version()
+            if version is not None:
+                self.cache.set(self.FRESH_KEY, version, timeout=self.retry_interval)
+        finally:
+            self._release_lock(token)
+
+    def wait_for_publish(self):
+        """Wait up to wait_timeout for a catalog published elsewhere, e.g. by a scrape worker.
+
+        Returns:
+            str: The current version once its snapshot is stored, or None on timeout
+        """
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            version = self.cache.get(self.CURRENT_KEY)
+            if self._available(version):
+                return version
+            if time.monotonic() >= deadline:
+                logger.warning(f"No catalog published within {self.wait_timeout}s")
+                return None
+            time.sleep(self.poll_interval)
+
+    def _redis(self):
+        """The redis-py client behind a Redis cache backend and its key prefix, or (None, None)"""
+        backend = getattr(self.cache, 'cache', self.cache)
+        client = getattr(backend, '_write_client', None)
+        if client is None or not hasattr(client, 'register_script'):
+            return None, None
+        return client, backend._get_prefix()
+
+    def _acquire_lock(self):
+        token = uuid.uuid4().hex
+        client, prefix = self._redis()
+        if client is not None:
+            # One command, so a lock can never be left behind without its expiry
+            acquired = client.set(f'{prefix}{self.LOCK_KEY}', token, nx=True, ex=self.lock_timeout)
+        else:
+            acquired = self.cache.add(self.LOCK_KEY, token, timeout=self.lock_timeout)
+        return token if acquired else None
+
+    def _release_lock(self, token: str):
+        # Only release our own lock, not one taken after ours expired
+        client, prefix = self._redis()
+        if client is not None:
+            if self._release_script is None:
+                self._release_script = client.register_script(RELEASE_LOCK_SCRIPT)
+            self._release_script(keys=[f'{prefix}{self.LOCK_KEY}'], args=[token], client=client)
+        elif self.cache.get(self.LOCK_KEY) == token:
+            self.cache.delete(self.LOCK_KEY)
+
+    def _store_blobs(self, version: str, blobs: dict):
+        for encoding, blob in blobs.items():
+            self.cache.set(self._blob_key(version, encoding), blob, timeout=self.timeout)
+
+    def get_blob(self, version: str, encoding: str = 'identity'):
+        """Pre-serialized JSON body of a snapshot in the given Content-Encoding.
+
+        Blobs missing from the cache (e.g. snapshots published before blobs
+        existed) are rebuilt from the snapshot and stored, once per process
+        however many requests ask for them at the same time.
+
+        Returns:
+            bytes: The encoded body, or None if the snapshot is not stored
+        """
+        memo_key = (version, encoding)
+        with self._memo_lock:
+            blob = self._memo.get(memo_key)
+            if blob is not None:
+                self._memo.move_to_end(memo_key)
+                return blob
+
+        blob = self.cache.get(self._blob_key(version, encoding))
+        if blob is None:
+            with self._rebuild_lock:
+                # Rebuilt by another request while this one waited for the lock
+                blob = self.cache.get(self._blob_key(version, encoding))
+                if blob is None:
+                    courses = self.get(version)
+                    if courses is None:
+                        return None
+                    blobs = encode_catalog(courses)
+                    self._store_blobs(version, blobs)
+                    blob = blobs.get(encoding)
+            if blob is None:
+                return None
+
+        with self._memo_lock:
+            self._memo[memo_key] = blob
+            while len(self._memo) > self._memo_size:
+                self._memo.popitem(last=False)
+        return blob
+
+    def _store_ndjson(self, version: str, courses) -> int:
+        return self._write_ndjson(version, encode_ndjson_chunks(courses))
+
+    def _write_ndjson(self, version: str, chunks: list) -> int:
+        for number, chunk in enumerate(chunks):
+            self.cache.set(self._ndjson_key(version, number), chunk, timeout=self.timeout)
+        # The count goes last, so a reader that sees it finds every chunk
+        self.cache.set(self._ndjson_key(version, 'count'), len(chunks), timeout=self.timeout)
+        return len(chunks)
+
+    def ndjson_chunk_count(self, version: str):
+        """Number of stored NDJSON chunks of a snapshot, rebuilt from the snapshot if missing.
+
+        Returns:
+            int: The chunk count, or None if the snapshot is not stored
+        """
+        count = self.cache.get(self._ndjson_key(version, 'count'))
+        if count is None:
+            with self._rebuild_lock:
+                count = self.cache.get(self._ndjson_key(version, 'count'))
+                if count is None:
+                    courses = self.get(version)
+                    if courses is None:
+                        return None
+                    count = self._store_ndjson(version, courses)
+        return count
+
+    def iter_ndjson(self, version: str, count: int):
+        """Yield the NDJSON chunks of a snapshot one at a time, fetching each from the cache as it is sent"""
+        for number in range(count):
+            chunk = self.cache.get(self._ndjson_key(version, number))
+            if chunk is None:
+                # Expired mid-stream; a truncated body is all that can be sent now
+                logger.warning(f"NDJSON chunk {number}/{count} of {version} is gone, ending stream")
+                return
+            yield chunk
+
+    def get_index(self, version: str):
+        """CatalogIndex of a snapshot, loaded once per process from the postings built at publish time.
+
+        Returns:
+            CatalogIndex: The index, or None if the snapshot is not stored
+        """
+        with self._memo_lock:
+            index = self._indexes.get(version)
+        if index is not None:
+            return index
+
+        courses = self.get(version)
+        if courses is None:
+            return None
+        postings = self.cache.get(self._index_key(version))
+        index = CatalogIndex(courses, postings)
+        if postings is None:
+            self.cache.set(self._index_key(version), index.postings, timeout=self.timeout)
+
+        with self._memo_lock:
+            self._indexes[version] = index
+            while len(self._indexes) > 2:
+                self._indexes.popitem(last=False)
+        return index
+
+    def _index_search(self, version: str, courses=None):
+        """Update a copy of the search index to version and swap it in; called with _search_lock held"""
+        if courses is None:
+            courses = self.get(version)
+            if courses is None:
+                return
+        index = self._search[1].copy() if self._search is not None else SearchIndex()
+        stats = index.update(courses)
+        self._search = (version, index)
+        logger.info(f"Search index at {version}: {stats['added']} added, "
+                    f"{stats['removed']} removed, {stats['changed']} changed")
+
+    def _index_search_in_background(self, version: str):
+        try:
+            self._index_search(version)
+        except Exception:
+            logger.exception("Search index update failed")
+        finally:
+            self._search_lock.release()
+
+    def search(self, version: str, query: str, limit: int = 20):
+        """Full-text search over a snapshot.
+
+        The first search of a process indexes the snapshot. A newer version
+        is then indexed in a background thread, incrementally on a copy of the
+        index, and searches keep being answered from the current index until
+        the updated one replaces it.
+
+        Returns:
+            tuple: Version searched and its (score, course) pairs best first,
+            or None if there is no index yet and the snapshot is not stored
+        """
+        searched = self._search
+        if searched is None:
+            with self._search_lock:
+                if self._search is None:
+                    self._index_search(version)
+                searched = self._search
+            if searched is None:
+                return None
+        elif searched[0] != version and self._search_lock.acquire(blocking=False):
+            thread = threading.Thread(target=self._index_search_in_background, args=(version,))
+            thread.daemon = True
+            thread.start()
+        searched_version, index = searched
+        return searched_version, index.search(query, limit)
+
+    def delta(self, since: str, version: str = None):
+        """Changes between the snapshot `since` and `version` (the current one by default).
+
+        Returns:
+            dict: added/removed/changed changeset, or None if either snapshot is no longer stored
+        """
+        version = version or self.current_version()
+        if version is None:
+            return None
+        if since == version:
+            return {'added': [], 'removed': [], 'changed': []}
+
+        key = self._delta_key(since, version)
+        delta = self.cache.get(key)
+        if delta is not None:
+            return delta
+
+        old_courses = self.get(since)
+        new_courses = self.get(version)
+        if old_courses is None or new_courses is None:
+            return None
+        delta = diff_catalogs(old_courses, new_courses)
+        self.cache.set(key, delta, timeout=self.history_timeout)
+        return delta
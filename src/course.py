@@ -0,0 +1,152 @@
+import gc
+import marshal
+import sys
+
+
+# Every field a provider may fill, in the order they are serialized
+FIELDS = ('id', 'title', 'provider', 'detail', 'rating', 'category', 'enrollment',
+          'course_type', 'language', 'certificate', 'link', 'image')
+# Placeholder for values a provider lists but a course leaves empty
+PLACEHOLDER = sys.intern('N/A')
+
+# Bump when the binary snapshot layout changes; format 1 rows had no source
+SNAPSHOT_FORMAT = 2
+# marshal version 4 writes repeated and interned strings once and references them
+MARSHAL_VERSION = 4
+
+
+def _share(value):
+    # Providers, categories and the like repeat across courses: keep one copy of each
+    return sys.intern(value) if type(value) is str else value
+
+
+class Course:
+    """One course record, whatever provider it came from.
+
+    Fields a provider does not report are None and left out of to_dict(),
+    so serialized courses keep the keys their provider always had. Records
+    also answer the read-only dict interface (course['title'],
+    course.get('category'), 'rating' in course) for code that filters and
+    indexes them.
+
+    `source` is the name of the registered provider that scraped the course.
+    It travels with the record in snapshots but is not one of its FIELDS.
+    """
+
+    __slots__ = FIELDS + ('source',)
+
+    def __init__(self, id, title, provider=None, detail=None, rating=None, category=None, enrollment=None,
+                 course_type=None, language=None, certificate=None, link=None, image=None, source=None):
+        self.id = id
+        self.title = title
+        self.provider = _share(provider)
+        self.detail = PLACEHOLDER if detail == PLACEHOLDER else detail
+        self.rating = PLACEHOLDER if rating == PLACEHOLDER else rating
+        self.category = _share(category)
+        self.enrollment = _share(enrollment)
+        self.course_type = _share(course_type)
+        self.language = _share(language)
+        self.certificate = _share(certificate)
+        self.link = PLACEHOLDER if link == PLACEHOLDER else link
+        self.image = PLACEHOLDER if image == PLACEHOLDER else image
+        self.source = _share(source)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'Course':
+        return cls(**{field: data[field] for field in FIELDS if field in data})
+
+    @classmethod
+    def from_row(cls, row: tuple) -> 'Course':
+        """Course from a row of to_row(), taking its values as they are"""
+        course = cls.__new__(cls)
+        (course.id, course.title, course.provider, course.detail, course.rating, course.category,
+         course.enrollment, course.course_type, course.language, course.certificate,
+         course.link, course.image, course.source) = row
+        return course
+
+    def to_row(self) -> tuple:
+        """Field values in FIELDS order, then the source"""
+        return (self.id, self.title, self.provider, self.detail, self.rating, self.category,
+                self.enrollment, self.course_type, self.language, self.certificate, self.link, self.image,
+                self.source)
+
+    def to_dict(self) -> dict:
+        # zip() stops at the last of FIELDS, leaving the source out
+        return {field: value for field, value in zip(FIELDS, self.to_row()) if value is not None}
+
+    def __reduce__(self):
+        return Course, self.to_row()
+
+    def __eq__(self, other):
+        if not isinstance(other, Course):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Course(id={self.id!r}, title={self.title!r}, provider={self.provider!r})"
+
+    def __getitem__(self, field: str):
+        value = getattr(self, field, None) if field in FIELDS else None
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def __contains__(self, field) -> bool:
+        return field in FIELDS and getattr(self, field) is not None
+
+    def get(self, field: str, default=None):
+        value = getattr(self, field, None) if field in FIELDS else None
+        return default if value is None else value
+
+    def keys(self) -> list:
+        return [field for field, value in zip(FIELDS, self.to_row()) if value is not None]
+
+
+def as_course(course) -> Course:
+    """Course from a Course or a course dict (as stored before Course records existed)"""
+    return course if isinstance(course, Course) else Course.from_dict(course)
+
+
+def course_json(value):
+    """`default` hook for json.dumps that serializes Course records as their dict"""
+    if isinstance(value, Course):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def encode_courses(courses) -> bytes:
+    """Serialize courses to the compact binary snapshot format.
+
+    Courses are written as rows of field values with marshal, which stores
+    each interned string (providers, categories, 'N/A') once per snapshot.
+    """
+    rows = [as_course(course).to_row() for course in courses]
+    return marshal.dumps((SNAPSHOT_FORMAT, FIELDS, rows), MARSHAL_VERSION)
+
+
+def decode_courses(data) -> list:
+    """Courses from encode_courses() bytes, or from a list of course dicts stored by older releases"""
+    if not isinstance(data, bytes):
+        return [as_course(course) for course in data]
+    # Rows hold no reference cycles; collections triggered by allocating
+    # them would only rescan the growing list and cost more than the decode
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        snapshot_format, fields, rows = marshal.loads(data)
+        if snapshot_format not in (1, SNAPSHOT_FORMAT):
+            raise ValueError(f"Unsupported course snapshot format {snapshot_format}")
+        if fields != FIELDS or snapshot_format == 1:
+            # Written with another field list or without sources: place every value by name
+            courses = [Course.from_dict(dict(zip(fields, row))) for row in rows]
+            for course, row in zip(courses, rows):
+                if len(row) > len(fields):
+                    course.source = _share(row[len(fields)])
+            return courses
+        from_row = Course.from_row
+        return [from_row(row) for row in rows]
+    finally:
+        if gc_enabled:
+            gc.enable()
@@ -1,24 +1,51 @@
 import requests
-from bs4 import BeautifulSoup
 import random
 import logging
-import uuid
-from concurrent.futures import ThreadPoolExecutor
-import re
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from http_session import get_session, take_connect_seconds
+from http_cache import FetchedPage, get_response_cache
+from metrics import PARSE_SECONDS, PROVIDER_COURSES, PROVIDER_SECONDS, observe_fetch
+from page_store import content_fingerprint, get_page_store
+from pagination import PAGE_CONCURRENCY, has_next_page, last_page_for, result_count
+from parse_pool import get_parse_pool
+from providers import get_provider, provider_names
+from rate_limit import RETRY_STATUSES, RetryPolicy, get_rate_limiter
 
 
+# Threads fetching pages, shared by every provider of a run
+FETCH_WORKERS = int(os.getenv('SCRAPER_FETCH_WORKERS', 16))
+# Providers scraped at the same time; each one mostly waits on the fetch pool
+PROVIDER_WORKERS = int(os.getenv('SCRAPER_PROVIDER_WORKERS', 8))
+
 
 class Scraper:
-    def __init__(self):
-        self.session = requests
+    user_agents = [
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3",
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15",
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Gecko/20100101 Firefox/83.0",
+        "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:86.0) Gecko/20100101 Firefox/86.0",
+    ]
+
+    def __init__(self, session=None, parse_pool=None, response_cache=None, page_store=None,
+                 rate_limiter=None, retry_policy=None, fetch_workers: int = FETCH_WORKERS):
+        # Shared keep-alive session so concurrent page fetches reuse connections
+        self.session = session if session is not None else get_session()
+        # Parsing runs in its own stage so it can be moved to worker processes
+        self.parse_pool = parse_pool if parse_pool is not None else get_parse_pool()
+        # Cached bodies and validators for conditional GETs, None when disabled
+        self.response_cache = response_cache if response_cache is not None else get_response_cache()
+        # Content fingerprints so unchanged pages reuse their previous extraction
+        self.page_store = page_store if page_store is not None else get_page_store()
+        # Per-host request pacing and retries of throttled or failed requests
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_rate_limiter()
+        self.retry_policy = retry_policy if retry_policy is not None else RetryPolicy()
+        # One bounded pool fetches the pages of every provider
+        self.fetch_workers = fetch_workers
+        self._fetch_pool = None
         self.logger = logging.getLogger(__name__)
         logging.basicConfig(level=logging.INFO)  # Basic configuration for logging
-        self.user_agents = [
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3",
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.0.3 Safari/605.1.15",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Gecko/20100101 Firefox/83.0",
-            "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:86.0) Gecko/20100101 Firefox/86.0",
-        ]
 
     def _get_random_headers(self) -> dict:
         """Generate random headers for requests"""
@@ -30,289 +57,256 @@ class Scraper:
         }
 
     def _make_request(self, url: str, timeout: int = 10):
-        """Make HTTP request with error handling and random headers"""
-        try:
+        """Make HTTP request with error handling and random headers.
+
+        When the response cache holds validators for url the request is
+        conditional; a 304 answer returns the cached body as a FetchedPage
+        with not_modified set instead of downloading it again.
+
+        Requests wait for the host's rate limiter. Connection errors,
+        timeouts and 429/5xx answers are retried with backoff, honouring
+        Retry-After, up to the retry policy's attempts.
+        """
+        limiter = self.rate_limiter.host(url)
+        attempt = 0
+        while True:
             headers = self._get_random_headers()
-            response = self.session.get(url, timeout=timeout, headers=headers)
+            cached = self.response_cache.get(url) if self.response_cache else None
+            headers.update(self.response_cache.conditional_headers(cached) if cached else {})
+
+            limiter.acquire()
+            start = time.monotonic()
+            try:
+                response = self._get(url, timeout, headers)
+            except requests.RequestException as e:
+                limiter.release(time.monotonic() - start)
+                retryable = isinstance(e, (requests.ConnectionError, requests.Timeout))
+                if not retryable or not self.retry_policy.can_retry(attempt):
+                    self.logger.error(f"Error fetching URL {url}: {e}")
+                    return None
+                delay = self.retry_policy.delay(attempt)
+                self.logger.warning(f"Retrying {url} in {delay:.1f}s after {e}")
+                time.sleep(delay)
+            else:
+                limiter.release(time.monotonic() - start, response.status_code)
+                if response.status_code not in RETRY_STATUSES or not self.retry_policy.can_retry(attempt):
+                    return self._handle_response(url, response, cached)
+                retry_after = response.headers.get('Retry-After')
+                delay = self.retry_policy.delay(attempt, retry_after)
+                self.logger.warning(f"Retrying {url} in {delay:.1f}s after HTTP {response.status_code}")
+                if self.retry_policy.pauses_host(response.status_code, retry_after):
+                    limiter.pause(delay)
+                else:
+                    time.sleep(delay)
+            attempt += 1
+
+    def _get(self, url: str, timeout: int, headers: dict):
+        """GET url, recording connect, time to first byte and download time for its host"""
+        take_connect_seconds()
+        timings = {'sent': time.monotonic()}
+        status = None
+        try:
+            response = self.session.get(url, timeout=timeout, headers=headers, stream=True)
+            timings['headers'] = time.monotonic()
+            status = response.status_code
+            # Read the whole body now, which also hands the connection back to the pool
+            response.content
+            timings['done'] = time.monotonic()
+            return response
+        finally:
+            timings['connect'] = take_connect_seconds()
+            observe_fetch(url, status, timings)
+
+    def _handle_response(self, url: str, response, cached):
+        """Turn a final response into a FetchedPage or response, or None for an HTTP error"""
+        try:
+            if response.status_code == 304 and cached:
+                return FetchedPage(url, cached['body'], status_code=304, headers=response.headers, not_modified=True)
+
             response.raise_for_status()
+            response.not_modified = False
+            if self.response_cache:
+                self.response_cache.store_response(url, response.text, response.headers)
             return response
         except requests.RequestException as e:
             self.logger.error(f"Error fetching URL {url}: {e}")
             return None
 
-    def _fetch_coursera_page(self, page: int):
-        """Fetch a single Coursera page with enhanced logging."""
-        base_url = 'https://www.coursera.org/courses?query=free'
-        url = f"{base_url}&page={page}&index=prod_all_launched_products_term_optimization"
-        # self.logger.info(f"Fetching Coursera page: {url}")
-        # print(f"Fetching Coursera page: {url}")
-        
-        response = self._make_request(url)
-        if response:
-            # self.logger.info(f"Successfully fetched page {page}")
-            # print(f"Successfully fetched page {page}")
-            return response.text
-        else:
-            self.logger.error(f"Failed to fetch Coursera page {page}")
-            # print(f"Failed to fetch Coursera page {page}")
-        return None
-
-    def scrape_coursera(self):
-        """Scrape multiple pages of Coursera courses concurrently"""
-        courses_list = []
-        page_numbers = range(1, 9)  # Fetch first 3 pages
-
-        try:
-            with ThreadPoolExecutor(max_workers=8) as executor:
-                # Fetch all pages concurrently
-                page_contents = list(executor.map(self._fetch_coursera_page, page_numbers))
-
-            for page_content in page_contents:
-                if page_content is None:
-                    continue
-
-                soup = BeautifulSoup(page_content, "html.parser")
-                courses = soup.find_all('div', class_='css-16m4c33')
-
-                for course in courses:
-                    try:
-                        title_element = course.find('h3', class_='cds-CommonCard-title')
-                        provider_element = course.find('p', class_='cds-ProductCard-partnerNames')
-                        detail_element = course.find('div', class_='cds-ProductCard-body')
-                        rating_element = course.find('p', class_='css-2xargn')
-                        a_tag = course.find('a', class_=lambda value: value and 'cds-CommonCard-titleLink' in value)
-                        image_element = course.find('div', class_='cds-CommonCard-previewImage').find('img')
-            
-                        if image_element and 'src' in image_element.attrs:
-                            img_url = image_element['src']
-                            # print(f"Found image URL: {img_url}")
-                            base_url = "https://d3njjcbhbojbot.cloudfront.net/api/utilities/v1/imageproxy/"
-                            image_url = img_url.replace(base_url, "")
-                        else:
-                            print("No image found for this course.")
-
-                        if not (title_element and provider_element and a_tag):
-                            continue
-
-                        course_data = {
-                            "id": str(uuid.uuid4()),  # Generate a unique ID
-                            "title": title_element.text.strip(),
-                            "provider": f"coursera / {provider_element.text.strip()}",
-                            "detail": detail_element.text.strip() if detail_element else 'N/A',
-                            "rating": rating_element.text.strip() if rating_element else 'N/A',
-                            "category": provider_element.text.strip(),
-                            "link": f"https://www.coursera.org{a_tag['href']}",
-                            "image": image_url
-                        }
-                        # print('course data', course_data)
-                        courses_list.append(course_data)
-
-                    except Exception as e:
-                        self.logger.error(f"Error parsing Coursera course: {str(e)}")
-                        continue
-
-            # self.logger.info(f"Fetched {len(courses_list)} Coursera courses from {len(page_numbers)} pages")
-            return courses_list
-
-        except Exception as e:
-            self.logger.error(f"Error in concurrent Coursera scraping: {str(e)}")
-            return []
+    def _split_unchanged(self, pages: list):
+        """Separate fetched pages whose content is unchanged from those that need parsing.
+
+        Pages answered with 304 carry the cached body, so they hash to the
+        stored fingerprint as well.
+
+        Args:
+            pages (list): (url, response) pairs, response may be None
+
+        Returns:
+            tuple: {url: courses} for unchanged pages and [(url, text, fingerprint)] to parse
+        """
+        reused = {}
+        to_parse = []
+        for url, response in pages:
+            if response is None:
+                continue
+            fingerprint = content_fingerprint(response.text)
+            records = self.page_store.lookup(url, fingerprint) if self.page_store else None
+            if records is not None:
+                reused[url] = records
+                continue
+            to_parse.append((url, response.text, fingerprint))
+        return reused, to_parse
+
+    def _merge_parsed(self, pages: list, reused: dict, to_parse: list, parsed: list) -> list:
+        """Store fresh extractions under their fingerprints and return all courses in page order"""
+        results = dict(reused)
+        for (url, _, fingerprint), courses in zip(to_parse, parsed):
+            results[url] = courses
+            if self.page_store:
+                self.page_store.store(url, fingerprint, courses)
+        if reused:
+            self.logger.info(f"Reused {len(reused)} unchanged pages, parsed {len(to_parse)}")
 
-    def scrape_harvard_courses(self):
-        """Scrape courses from Harvard's online course catalog"""
         courses_list = []
-        URL = 'https://pll.harvard.edu/catalog/free'
-        response = self._make_request(URL)
-
-        if response:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            harvards = soup.find_all('div', class_='group-details')
-            harvard_images = soup.find_all('div', class_='node__content')
-
-            for harvard, harvard_image in zip(harvards, harvard_images):
-                try:
-                    title_element = harvard.find('div', class_='field field---extra-field-pll-extra-field-subject field--name-extra-field-pll-extra-field-subject field--type- field--label-inline clearfix')
-                    provider_element = harvard.find('h3', class_='field__item')
-                    course_href = harvard.find('h3', class_='field__item').find('a')['href']
-                    link_href = 'https://pll.harvard.edu' + course_href
-                    image_element = harvard_image.find('div', class_='field__item').find('a').find('img')
-
-                    if image_element and 'src' in image_element.attrs:
-                        img_url = image_element['src']
-                        # print(f"Found image URL: {img_url}")
-                        # add https://pll.harvard.edu/ to the image URL
-                        img_url = 'https://pll.harvard.edu' + img_url
-                        
-                    else:
-                        print("No image found for this course.")
-
-                    if not (title_element and provider_element):
-                        continue
-
-                    if title_element and provider_element:
-                        course_data = {
-                            "id": str(uuid.uuid4()),  # Generate a unique ID
-                            "title": provider_element.text.strip(),
-                            "provider": "Harvard",
-                            "detail": 'N/A',
-                            "rating": 'N/A',
-                            "category": title_element.text.strip(),
-                            "link": link_href,
-                            "image": img_url
-                        }
-                        courses_list.append(course_data)
-
-                except Exception as e:
-                    self.logger.error(f"Error parsing Harvard course: {str(e)}")
-                    continue
-
-            # self.logger.info(f"Fetched {len(courses_list)} Harvard courses")
+        for url, _ in pages:
+            courses_list.extend(results.get(url, []))
+        return courses_list
+
+    def _parse_pages(self, provider: str, pages: list) -> list:
+        """Extract courses from (url, response) pairs, parsing only pages whose content changed"""
+        reused, to_parse = self._split_unchanged(pages)
+        with PARSE_SECONDS.time(provider=provider):
+            parsed = self.parse_pool.map(provider, [text for _, text, _ in to_parse])
+        return self._merge_parsed(pages, reused, to_parse, parsed)
+
+    def _result_count(self, response):
+        """Total number of results a fetched page reports, or None"""
+        return result_count(response.text)
+
+    def _has_next_page(self, response) -> bool:
+        return has_next_page(response.text)
+
+    @property
+    def fetch_pool(self) -> ThreadPoolExecutor:
+        if self._fetch_pool is None:
+            self._fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_workers)
+        return self._fetch_pool
+
+    def _fetch_page(self, provider, url: str):
+        """Fetch one listing page of a provider"""
+        response = self._make_request(url)
+        if response is None:
+            self.logger.error(f"Failed to fetch {provider.label} page {url}")
+        return response
+
+    def _fetch_pages(self, provider, urls) -> list:
+        """Fetch pages on the shared fetch pool, returning (url, response) pairs"""
+        urls = list(urls)
+        responses = list(self.fetch_pool.map(lambda url: self._fetch_page(provider, url), urls))
+        return list(zip(urls, responses))
+
+    def _scrape_paginated(self, provider) -> list:
+        """Scrape a paginated provider, discovering from the first page how many pages to fetch.
+
+        When the first page reports a result count, exactly the pages needed
+        to cover it are fetched. Otherwise next-page markers are followed a
+        batch of pages at a time until a page comes back empty.
+        """
+        first_page, last_page = provider.page_range()
+        pages = self._fetch_pages(provider, [provider.url_for_page(first_page)])
+        courses_list = self._parse_pages(provider.name, pages)
+        response = pages[0][1]
+        if response is None or not courses_list:
             return courses_list
-        else:
-            self.logger.error("Failed to fetch Harvard courses")
-            return []
-    def scrape_Life_courses(self):
-        """Scrape courses from Life's online course catalog"""
-        courses_list = []
-        URL = 'https://www.life-global.org/allcourses'
-        response = self._make_request(URL)
 
-        if not response:
-            self.logger.error("Failed to fetch Life courses")
-            return []
+        total = self._result_count(response)
+        if total is not None:
+            last = last_page_for(first_page, last_page, total, len(courses_list))
+            self.logger.info(f"{provider.label} reports {total} results, fetching pages {first_page}-{last}")
+            pages = self._fetch_pages(provider, (provider.url_for_page(page) for page in range(first_page + 1, last + 1)))
+            return courses_list + self._parse_pages(provider.name, pages)
+
+        # Batches double up to PAGE_CONCURRENCY, so short result sets cost few extra requests
+        page, batch_size = first_page + 1, 1
+        while self._has_next_page(response) and page <= last_page:
+            batch_pages = range(page, min(page + batch_size, last_page + 1))
+            batch = self._fetch_pages(provider, (provider.url_for_page(number) for number in batch_pages))
+            for url, response in batch:
+                page_courses = self._parse_pages(provider.name, [(url, response)]) if response is not None else []
+                if not page_courses:
+                    return courses_list
+                courses_list.extend(page_courses)
+                if not self._has_next_page(response):
+                    return courses_list
+            page += len(batch)
+            batch_size = min(batch_size * 2, PAGE_CONCURRENCY)
+        return courses_list
+
+    def scrape_page(self, name: str, url: str):
+        """Fetch and parse a single listing page of a registered provider.
+
+        Returns:
+            tuple: (response, courses), or None if the page could not be fetched
+        """
+        response = self._fetch_page(get_provider(name), url)
+        if response is None:
+            return None
+        return response, self._parse_pages(name, [(url, response)])
 
+    def scrape_provider(self, name: str) -> list:
+        """Scrape every listing page of a registered provider"""
+        provider = get_provider(name)
         try:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            course_containers = soup.find_all('span', class_='ui-core-emotion-cache-4233sn')
-            
-            self.logger.info(f"Found {len(course_containers)} potential course containers")
-
-            for container in course_containers:
-                try:
-                    # Extract course title
-                    title_element = container.find('h2', class_='ui-core-emotion-cache-1k10co')
-                    
-                    # Extract course link from the span's href attribute
-                    course_link = container.get('href', '')
-                    
-                    # Extract description
-                    description = container.find('p', class_='ui-core-emotion-cache-1yh6jjn')
-                    
-                    # Extract enrollment count
-                    enrollment_element = container.find('p', class_='ui-core-emotion-cache-1h70fjn')
-                    
-                    # Extract image URL - specifically targeting the noscript img with data-nimg="fill"
-                    noscript_element = container.find('noscript')
-                    img_url = None
-                    if noscript_element:
-                        img_tag = noscript_element.find('img', attrs={'data-nimg': 'fill'})
-                        if img_tag and 'src' in img_tag.attrs:
-                            # Extract the base image URL from the src attribute
-                            img_src = img_tag['src']
-                            if img_src.startswith('/_next/image'):
-                                img_url = f"https://www.life-global.org{img_src}"
-
-                    # Skip if required elements are missing
-                    if not title_element:
-                        self.logger.warning("Skipping course - missing title element")
-                        continue
-
-                    course_data = {
-                        "id": str(uuid.uuid4()),
-                        "title": title_element.text.strip() if title_element else 'N/A',
-                        "provider": "Life HP",
-                        "detail": description.text.strip() if description else 'N/A',
-                        "enrollment": enrollment_element.text.strip() if enrollment_element else 'N/A',
-                        "link": f"https://www.life-global.org{course_link}" if course_link else 'N/A',
-                        "image": img_url if img_url else 'N/A'
-                    }
-
-                    self.logger.debug(f"Parsed course: {course_data['title']}")
-                    courses_list.append(course_data)
-
-                except Exception as e:
-                    self.logger.error(f"Error parsing individual course: {str(e)}")
-                    continue
-
-            self.logger.info(f"Successfully scraped {len(courses_list)} Life courses")
+            with PROVIDER_SECONDS.time(provider=name):
+                if provider.paginated:
+                    courses_list = self._scrape_paginated(provider)
+                else:
+                    pages = self._fetch_pages(provider, provider.urls)
+                    if all(response is None for _, response in pages):
+                        self.logger.error(f"Failed to fetch {provider.label} courses")
+                        return []
+                    courses_list = self._parse_pages(name, pages)
+
+            PROVIDER_COURSES.set(len(courses_list), provider=name)
+            self.logger.info(f"Successfully scraped {len(courses_list)} {provider.label} courses")
             return courses_list
 
         except Exception as e:
-            self.logger.error(f"Error during Life courses scraping: {str(e)}")
-            return []
-        
-    def scrape_who_courses(self):
-        """Scrape courses from WHO online course catalog"""
-        courses_list = []
-        URL = 'https://openwho.org/courses?q=&channel=&lang=&category=&topic='
-        response = self._make_request(URL)
-
-        if not response:
-            self.logger.error("Failed to fetch WHO courses")
+            self.logger.error(f"Error during {provider.label} courses scraping: {str(e)}")
             return []
 
-        try:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            course_containers = soup.find_all('div', class_='course-card course-card--expandable')
-            
-            self.logger.info(f"Found WHO {len(course_containers)} potential course containers")
-
-            for container in course_containers:
-                try:
-                    # Extract course title and link
-                    title_element = container.find('div', class_='course-card__title').find('a')
-                    course_link = title_element.get('href') if title_element else None
-                    
-                    # Extract description
-                    description = container.find('div', class_='course-card__description').find('p')
-                    
-                    # Extract provider
-                    provider = container.find('div', class_='course-card__teacher')
-                    
-                    # Extract course date/type
-                    date_element = container.find('li', class_='course-card__date').find('span', class_='xi-icon').find_next_sibling('span')
-                    
-                    # Extract language
-                    language_element = container.find('li', class_='course-card__language').find('span', class_='xi-icon').find_next_sibling('span')
-                    
-                    # Extract certificate type
-                    certificate_element = container.find('li', class_='course-card__certificates').find('span', class_='xi-icon').find_next_sibling('span')
-                    
-                    # Extract image URL from the picture element's img tag
-                    img_element = container.find('picture').find('img')
-                    img_url = img_element.get('src') if img_element else None
-
-                    # Skip if required elements are missing
-                    if not title_element:
-                        self.logger.warning("Skipping course - missing title element")
-                        continue
-
-                    course_data = {
-                        "id": str(uuid.uuid4()),
-                        "title": title_element.text.strip() if title_element else 'N/A',
-                        "provider": provider.text.strip() if provider else 'WHO',
-                        "detail": description.text.strip() if description else 'N/A',
-                        "course_type": date_element.text.strip() if date_element else 'N/A',
-                        "language": language_element.text.strip() if language_element else 'N/A',
-                        "certificate": certificate_element.text.strip() if certificate_element else 'N/A',
-                        "link": f"https://openwho.org{course_link}" if course_link else 'N/A',
-                        "image": img_url if img_url else 'N/A'
-                    }
-
-                    self.logger.debug(f"Parsed WHO course: {course_data['title']}")
-                    courses_list.append(course_data)
-
-                except Exception as e:
-                    self.logger.error(f"Error parsing individual WHO course: {str(e)}")
-                    continue
-
-            self.logger.info(f"Successfully scraped {len(courses_list)} WHO courses")
-            return courses_list
+    def run(self, providers=None, deadline: float = None) -> dict:
+        """Scrape providers concurrently, sharing one pool of fetch threads.
+
+        Args:
+            providers (list): Provider names, every registered provider when None
+            deadline (float): Seconds to wait for the providers, unlimited when None
+
+        Returns:
+            dict: Provider name mapped to its courses, or None if it failed or missed the deadline
+        """
+        providers = provider_names() if providers is None else list(providers)
+        executor = ThreadPoolExecutor(max_workers=max(1, min(PROVIDER_WORKERS, len(providers))))
+        futures = {name: executor.submit(self.scrape_provider, name) for name in providers}
+        done, _ = wait(futures.values(), timeout=deadline)
+        # Don't wait for providers past their deadline; their threads finish in the background
+        executor.shutdown(wait=False)
+        if self._fetch_pool is not None:
+            self._fetch_pool.shutdown(wait=False)
+            self._fetch_pool = None
+
+        results = {}
+        for name, future in futures.items():
+            if future not in done:
+                self.logger.error(f"{name} scraping missed its {deadline}s deadline")
+                results[name] = None
+            elif future.exception() is not None:
+                self.logger.error(f"{name} scraping failed: {future.exception()}")
+                results[name] = None
+            else:
+                results[name] = future.result()
+        return results
 
-        except Exception as e:
-            self.logger.error(f"Error during WHO courses scraping: {str(e)}")
-            return []
-        
     # def scrape_udacity_courses(self):
     #     """Scrape courses from Udacity's online course catalog"""
     #     courses_list = []
@@ -427,117 +421,3 @@ class Scraper:
     #     except Exception as e:
     #         self.logger.error(f"Error in scraping Udacity courses: {str(e)}")
     #         return []
-        
-
-    def scrape_udemy_courses(self):
-        """Scrape courses from Udemy's online course catalog"""
-        courses_list = []
-        URL = 'https://www.classcentral.com/provider/udemy?free=true'
-        
-        try:
-            response = self._make_request(URL)
-            if not response:
-                self.logger.error("Failed to fetch Udacity courses")
-                return []
-
-            soup = BeautifulSoup(response.text, 'html.parser')
-            course_items = soup.find_all('li', class_='course-list-course')
-
-            def extract_image_url(course_item):
-                """Extract the course image URL with multiple fallback strategies."""
-                # Try to find an image within the <picture> tag
-                img = course_item.find('picture')
-                # print(img)
-                if img:
-                    # Check for 'img' tag inside <picture>
-                    # img_tag = img.find('img')
-                    # if img_tag and img_tag.get('src'):
-                    #     return img_tag['src']
-                    
-                    # Check for 'source' tag with 'srcset' attribute inside <picture>
-                    source_tag = img.find('source')
-                    if source_tag and source_tag.get('srcset'):
-                        try:
-                            # Split the srcset into multiple URLs and take the last one
-                            last_srcset_item = source_tag['srcset'].split(',')[0]
-                            # Further split by space to get just the URL
-                            image_url = last_srcset_item.split()[0]
-                            return image_url
-                        except (IndexError, AttributeError):
-                        # Return a fallback image or 'N/A' if there's an issue
-                         return 'https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcRyHXDWa_y17Bn3eVyMhDOizFfK3o0eJFyyiw&s'
-                    # If 'srcset' attribute is not found, return the first URL in 'srcset'
-                        # return source_tag['srcset'].split(',')[0].split()[2]  # Use first URL in srcset
-                    
-                # Fallback: check if there's any 'img' tag directly inside the course item
-                fallback_img = course_item.find('img')
-                if fallback_img and fallback_img.get('src'):
-                    return fallback_img['src']
-                
-                # If all fails, return a placeholder or indicate missing image
-                return 'https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcRyHXDWa_y17Bn3eVyMhDOizFfK3o0eJFyyiw&s'
-            def clean_udemy_url(url):
-                """Clean Udemy course URL by removing 'udemy-' prefix and numeric suffix.
-                
-                Args:
-                    url (str): The original Udemy course URL
-                    
-                Returns:
-                    str: Cleaned URL with prefix and suffix removed
-                """
-                try:
-                    # Split the URL to get the course slug
-                    parts = url.split('/course/')
-                    if len(parts) != 2:
-                        return url
-                        
-                    base_url = parts[0]
-                    course_slug = parts[1]
-                    
-                    # Remove the numeric suffix (e.g., -25803)
-                    course_slug = re.sub(r'-\d+/?$', '', course_slug)
-                    
-                    # Remove 'udemy-' prefix from the course slug
-                    if course_slug.startswith('udemy-'):
-                        course_slug = course_slug[6:]
-                        
-                    # Reconstruct the URL
-                    return f"{base_url}/course/{course_slug}"
-                except:
-                    return url
-
-            for course_item in course_items:
-                try:
-                    # Extract course details
-                    title_element = course_item.find('h2', class_='text-1')
-                    link_element = course_item.find('a', class_='course-name')
-                    detail_element = course_item.find('p', class_='text-2')
-                    rating_element = course_item.find('span', class_='cmpt-rating-medium')
-                    image_element = course_item.find('picture').find('img')
-
-                    # print(image_element, '===test====')
-                    
-                    course_data = {
-                        "id": str(uuid.uuid4()),
-                        "title": title_element.text.strip() if title_element else 'N/A',
-                        "provider": "Udemy",
-                        "link": clean_udemy_url("https://www.udemy.com" + link_element.get('href', 'N/A')) if link_element else 'N/A',
-                        "detail": detail_element.text.strip() if detail_element else 'N/A',
-                        "rating": len(rating_element.find_all('i', class_='icon-star')) if rating_element else 'N/A',
-                        "category": 'N/A',
-                        "image": extract_image_url(course_item)
-                    }
-                    # print(course_data)
-                    courses_list.append(course_data)
-
-                except Exception as e:
-                    self.logger.error(f"Error parsing Udacity course: {str(e)}")
-                    continue
-
-            self.logger.info(f"Fetched {len(courses_list)} Udacity courses")
-            # print(courses_list)
-            return courses_list
-
-        except Exception as e:
-            self.logger.error(f"Error in scraping Udacity courses: {str(e)}")
-            return []
\ No newline at end of file
@@ -0,0 +1,191 @@
+import hashlib
+import logging
+import os
+import re
+from urllib.parse import urlsplit, urlunsplit
+
+from catalog import canonical_link
+
+
+logger = logging.getLogger(__name__)
+
+# Set to 0 to publish every scraped course, duplicates included
+DEDUP_ENABLED = os.getenv('SCRAPER_DEDUP', '1') == '1'
+# Share of title trigrams two courses must have in common to count as the same course
+TITLE_THRESHOLD = float(os.getenv('SCRAPER_DEDUP_TITLE_THRESHOLD', 0.85))
+# Also merge near-identical titles from different providers, not only within one
+ACROSS_PROVIDERS = os.getenv('SCRAPER_DEDUP_ACROSS_PROVIDERS', '1') == '1'
+
+# Title sketch: one-permutation MinHash with SKETCH_BINS bins, split into
+# LSH bands of BAND_ROWS bins. Titles sharing a band are compared exactly;
+# with 8 bands of 6, titles 0.85 similar meet 98% of the time, 0.9 similar
+# 99.8%, while titles only sharing common words rarely do.
+SKETCH_BINS = 48
+BAND_ROWS = 6
+SHINGLE_SIZE = 3
+
+# Listing ids some sites append to course slugs ("/course/python-basics-25803")
+NUMERIC_SUFFIX_RE = re.compile(r'-\d{4,}$')
+TITLE_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+
+def dedup_link(link: str) -> str:
+    """Canonical link with listing ids stripped from the last path segment, '' for no link"""
+    link = canonical_link(link)
+    if not link:
+        return ''
+    parts = urlsplit(link)
+    path = NUMERIC_SUFFIX_RE.sub('', parts.path)
+    return urlunsplit((parts.scheme, parts.netloc, path, parts.query, ''))
+
+
+def title_shingles(title) -> frozenset:
+    """Character trigrams of a title, normalised to lowercase words separated by single spaces"""
+    if not title or title == 'N/A':
+        return frozenset()
+    text = ' '.join(TITLE_TOKEN_RE.findall(str(title).lower()))
+    if len(text) <= SHINGLE_SIZE:
+        return frozenset([text]) if text else frozenset()
+    return frozenset(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+
+
+def title_numbers(title) -> tuple:
+    """Numbers in a title, which tell apart parts and editions of an otherwise identical title"""
+    if not title or title == 'N/A':
+        return ()
+    return tuple(token for token in TITLE_TOKEN_RE.findall(str(title).lower()) if token.isdigit())
+
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+class TitleSketcher:
+    """One-permutation MinHash signatures of shingle sets.
+
+    Each shingle is hashed once: the hash picks a bin and the bin keeps its
+    smallest value, so a signature costs one hash per shingle rather than
+    one per shingle and permutation. Empty bins borrow the value of the next
+    filled bin (rotation densification), so short titles still get a full
+    signature. Shingle hashes are remembered, as titles share most trigrams.
+    """
+
+    def __init__(self, bins: int = SKETCH_BINS):
+        self.bins = bins
+        self._hashes = {}
+
+    def _hash(self, shingle: str) -> tuple:
+        """(bin, value within the bin) of a shingle"""
+        hashed = self._hashes.get(shingle)
+        if hashed is None:
+            digest = hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest()
+            hashed = self._hashes[shingle] = divmod(int.from_bytes(digest, 'big'), self.bins)[::-1]
+        return hashed
+
+    def signature(self, shingles) -> tuple:
+        bins = self.bins
+        hashes = self._hashes
+        minimums = [None] * bins
+        for shingle in shingles:
+            slot, value = hashes.get(shingle) or self._hash(shingle)
+            current = minimums[slot]
+            if current is None or value < current:
+                minimums[slot] = value
+        if None in minimums:
+            last = max((slot for slot, value in enumerate(minimums) if value is not None), default=None)
+            if last is None:
+                return ()
+            # Walk backwards from the last filled bin so each empty bin sees the next filled one;
+            # the distance to it keeps borrowed values apart from real ones
+            donor, distance = minimums[last], 0
+            for slot in range(last - 1, last - 1 - bins, -1):
+                distance += 1
+                if minimums[slot] is None:
+                    minimums[slot] = (donor, distance)
+                elif type(minimums[slot]) is int:
+                    donor, distance = minimums[slot], 0
+        return tuple(minimums)
+
+
+def _close_in_size(size: int, other: int, threshold: float) -> bool:
+    # Jaccard similarity is at most the ratio of the smaller set size to the larger
+    return min(size, other) >= threshold * max(size, other)
+
+
+def _completeness(course) -> int:
+    """Number of fields a course actually fills"""
+    return sum(1 for field in course.keys() if course[field] != 'N/A')
+
+
+def dedupe_courses(parts: dict, threshold: float = TITLE_THRESHOLD, across_providers: bool = ACROSS_PROVIDERS) -> list:
+    """Concatenate provider courses, dropping duplicates.
+
+    Courses are duplicates when their links are the same after
+    canonicalization (dedup_link), or when their titles are near-identical:
+    trigram Jaccard similarity of at least threshold, with the same numbers
+    ("Python 2" and "Python 3" stay apart). Title candidates come
+    from LSH buckets of MinHash signatures, so only courses sharing a bucket
+    are compared. Of each group, the course filling the most fields is kept,
+    earlier providers and courses winning ties.
+
+    Args:
+        parts (dict): Provider name mapped to its courses, in provider order
+        threshold (float): Title similarity from which courses are merged
+        across_providers (bool): Merge titles across providers, not only within one
+
+    Returns:
+        list: The kept courses, in provider order
+    """
+    entries = [
+        (position, provider, course)
+        for provider, courses in parts.items()
+        for position, course in enumerate(courses)
+    ]
+    order = {provider: rank for rank, provider in enumerate(parts)}
+    # Best course of each group first, so it is the one kept
+    entries.sort(key=lambda entry: (-_completeness(entry[2]), order[entry[1]], entry[0]))
+
+    sketcher = TitleSketcher()
+    bands = range(0, SKETCH_BINS, BAND_ROWS)
+    links = set()
+    buckets = {}
+    kept_titles = []
+    kept = set()
+    by_link = by_title = 0
+
+    for position, provider, course in entries:
+        link = dedup_link(course.get('link'))
+        if link and link in links:
+            by_link += 1
+            continue
+
+        title = course.get('title')
+        shingles = title_shingles(title)
+        numbers = title_numbers(title)
+        signature = sketcher.signature(shingles)
+        scope = None if across_providers else provider
+        keys = [(scope, band, signature[band:band + BAND_ROWS]) for band in bands] if signature else []
+        candidates = {index for key in keys for index in buckets.get(key, ())}
+        if any(kept_titles[index][1] == numbers and jaccard(shingles, kept_titles[index][0]) >= threshold
+               for index in candidates if _close_in_size(len(shingles), kept_titles[index][2], threshold)):
+            by_title += 1
+            continue
+
+        index = len(kept_titles)
+        kept_titles.append((shingles, numbers, len(shingles)))
+        for key in keys:
+            buckets.setdefault(key, []).append(index)
+        if link:
+            links.add(link)
+        kept.add((provider, position))
+
+    logger.info(f"Dedup dropped {by_link} courses with a known link and {by_title} with a near-identical title")
+    return [
+        course
+        for provider, courses in parts.items()
+        for position, course in enumerate(courses)
+        if (provider, position) in kept
+    ]
@@ -0,0 +1,357 @@
+import logging
+import re
+
+from catalog import course_id
+from course import Course
+from parser_backends import get_backend
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the shape or content of extracted records changes, so stored
+# extractions of unchanged pages are not reused across the change
+EXTRACTOR_VERSION = 4
+
+UDEMY_PLACEHOLDER_IMAGE = 'https://encrypted-tbn0.gstatic.com/images?q=tbn:ANd9GcRyHXDWa_y17Bn3eVyMhDOizFfK3o0eJFyyiw&s'
+
+# CSS selectors for each provider. Extraction is written once against these
+# and the backend interface, so it runs unchanged on every parser backend.
+COURSERA_SELECTORS = {
+    'item': 'div.css-16m4c33',
+    'title': 'h3.cds-CommonCard-title',
+    'partner': 'p.cds-ProductCard-partnerNames',
+    'detail': 'div.cds-ProductCard-body',
+    'rating': 'p.css-2xargn',
+    'link': 'a.cds-CommonCard-titleLink',
+    'image': 'div.cds-CommonCard-previewImage img',
+}
+
+HARVARD_SELECTORS = {
+    'item': 'div.group-details',
+    'image_item': 'div.node__content',
+    'subject': 'div.field--name-extra-field-pll-extra-field-subject',
+    'title': 'h3.field__item',
+    'link': 'h3.field__item a',
+    'image': 'div.field__item a img',
+}
+
+LIFE_SELECTORS = {
+    'item': 'span.ui-core-emotion-cache-4233sn',
+    'title': 'h2.ui-core-emotion-cache-1k10co',
+    'detail': 'p.ui-core-emotion-cache-1yh6jjn',
+    'enrollment': 'p.ui-core-emotion-cache-1h70fjn',
+    'image': 'noscript img[data-nimg="fill"]',
+}
+
+WHO_SELECTORS = {
+    'item': 'div.course-card.course-card--expandable',
+    'title': 'div.course-card__title a',
+    'detail': 'div.course-card__description p',
+    'provider': 'div.course-card__teacher',
+    'course_type': 'li.course-card__date span.xi-icon + span',
+    'language': 'li.course-card__language span.xi-icon + span',
+    'certificate': 'li.course-card__certificates span.xi-icon + span',
+    'image': 'picture img',
+}
+
+UDEMY_SELECTORS = {
+    'item': 'li.course-list-course',
+    'title': 'h2.text-1',
+    'link': 'a.course-name',
+    'detail': 'p.text-2',
+    'rating': 'span.cmpt-rating-medium',
+    'rating_star': 'i.icon-star',
+    'image_source': 'picture source',
+    'image': 'img',
+}
+
+
+def _text(backend, node, default='N/A'):
+    """Stripped text of node, or default when the node is missing"""
+    return backend.text(node).strip() if node is not None else default
+
+
+def extract_coursera(page_content: str, backend=None) -> list:
+    """Extract courses from a single Coursera search results page"""
+    backend = get_backend(backend)
+    selectors = COURSERA_SELECTORS
+    courses_list = []
+    document = backend.parse(page_content)
+
+    for course in backend.select(document, selectors['item']):
+        try:
+            title_element = backend.select_one(course, selectors['title'])
+            provider_element = backend.select_one(course, selectors['partner'])
+            detail_element = backend.select_one(course, selectors['detail'])
+            rating_element = backend.select_one(course, selectors['rating'])
+            a_tag = backend.select_one(course, selectors['link'])
+            image_element = backend.select_one(course, selectors['image'])
+
+            image_url = 'N/A'
+            if image_element is not None and backend.attr(image_element, 'src'):
+                base_url = "https://d3njjcbhbojbot.cloudfront.net/api/utilities/v1/imageproxy/"
+                image_url = backend.attr(image_element, 'src').replace(base_url, "")
+
+            if title_element is None or provider_element is None or a_tag is None:
+                continue
+
+            partner = _text(backend, provider_element)
+            link = f"https://www.coursera.org{backend.attr(a_tag, 'href')}"
+            title = _text(backend, title_element)
+            course_data = Course(
+                id=course_id('coursera', link, title),
+                title=title,
+                provider=f"coursera / {partner}",
+                detail=_text(backend, detail_element),
+                rating=_text(backend, rating_element),
+                category=partner,
+                link=link,
+                image=image_url,
+                source='coursera',
+            )
+            courses_list.append(course_data)
+
+        except Exception as e:
+            logger.error(f"Error parsing Coursera course: {str(e)}")
+            continue
+
+    return courses_list
+
+
+def extract_harvard(page_content: str, backend=None) -> list:
+    """Extract courses from Harvard's free course catalog page"""
+    backend = get_backend(backend)
+    selectors = HARVARD_SELECTORS
+    courses_list = []
+    document = backend.parse(page_content)
+    harvards = backend.select(document, selectors['item'])
+    harvard_images = backend.select(document, selectors['image_item'])
+
+    for harvard, harvard_image in zip(harvards, harvard_images):
+        try:
+            title_element = backend.select_one(harvard, selectors['subject'])
+            provider_element = backend.select_one(harvard, selectors['title'])
+            link_element = backend.select_one(harvard, selectors['link'])
+            image_element = backend.select_one(harvard_image, selectors['image'])
+
+            if title_element is None or provider_element is None or link_element is None:
+                continue
+
+            img_url = 'N/A'
+            if image_element is not None and backend.attr(image_element, 'src'):
+                # add https://pll.harvard.edu/ to the image URL
+                img_url = 'https://pll.harvard.edu' + backend.attr(image_element, 'src')
+
+            link = 'https://pll.harvard.edu' + backend.attr(link_element, 'href')
+            title = _text(backend, provider_element)
+            course_data = Course(
+                id=course_id('harvard', link, title),
+                title=title,
+                provider="Harvard",
+                detail='N/A',
+                rating='N/A',
+                category=_text(backend, title_element),
+                link=link,
+                image=img_url,
+                source='harvard',
+            )
+            courses_list.append(course_data)
+
+        except Exception as e:
+            logger.error(f"Error parsing Harvard course: {str(e)}")
+            continue
+
+    return courses_list
+
+
+def extract_life(page_content: str, backend=None) -> list:
+    """Extract courses from Life's course catalog page"""
+    backend = get_backend(backend)
+    selectors = LIFE_SELECTORS
+    courses_list = []
+    document = backend.parse(page_content)
+    course_containers = backend.select(document, selectors['item'])
+
+    logger.info(f"Found {len(course_containers)} potential course containers")
+
+    for container in course_containers:
+        try:
+            title_element = backend.select_one(container, selectors['title'])
+
+            # Skip if required elements are missing
+            if title_element is None:
+                logger.warning("Skipping course - missing title element")
+                continue
+
+            # The course link is the container span's href attribute
+            course_link = backend.attr(container, 'href')
+
+            # Only the noscript fallback img carries the real /_next/image URL
+            img_url = None
+            img_tag = backend.select_one(container, selectors['image'])
+            if img_tag is not None:
+                img_src = backend.attr(img_tag, 'src') or ''
+                if img_src.startswith('/_next/image'):
+                    img_url = f"https://www.life-global.org{img_src}"
+
+            link = f"https://www.life-global.org{course_link}" if course_link else 'N/A'
+            title = _text(backend, title_element)
+            course_data = Course(
+                id=course_id('life', link, title),
+                title=title,
+                provider="Life HP",
+                detail=_text(backend, backend.select_one(container, selectors['detail'])),
+                enrollment=_text(backend, backend.select_one(container, selectors['enrollment'])),
+                link=link,
+                image=img_url if img_url else 'N/A',
+                source='life',
+            )
+
+            logger.debug(f"Parsed course: {course_data.title}")
+            courses_list.append(course_data)
+
+        except Exception as e:
+            logger.error(f"Error parsing individual course: {str(e)}")
+            continue
+
+    return courses_list
+
+
+def extract_fields(page_content: str, backend=None, source: str = None, selectors: dict = None, fields: dict = None) -> list:
+    """Extract courses from a listing page with a declarative field mapping.
+
+    Every element matching selectors['item'] becomes one course whose
+    fields are read as described by the provider's Field mapping.
+    """
+    backend = get_backend(backend)
+    courses_list = []
+    document = backend.parse(page_content)
+    containers = backend.select(document, selectors['item'])
+
+    logger.info(f"Found {source} {len(containers)} potential course containers")
+
+    for container in containers:
+        try:
+            course_data = {}
+            missing = None
+            for name, field in fields.items():
+                node = container if field.selector is None else backend.select_one(container, selectors[field.selector])
+                if node is None and field.required:
+                    missing = name
+                    break
+
+                if node is None:
+                    value = None
+                elif field.attr:
+                    value = backend.attr(node, field.attr)
+                else:
+                    value = backend.text(node).strip()
+
+                if value is None or (field.attr and not value):
+                    value = field.default
+                elif value and field.prefix:
+                    value = field.prefix + value
+                course_data[name] = value
+
+            # Skip if required elements are missing
+            if missing:
+                logger.warning(f"Skipping {source} course - missing {missing} element")
+                continue
+
+            course_data = Course(id=course_id(source, course_data.get('link'), course_data.get('title')), source=source,
+                                 **course_data)
+            courses_list.append(course_data)
+
+        except Exception as e:
+            logger.error(f"Error parsing individual {source} course: {str(e)}")
+            continue
+
+    return courses_list
+
+
+def extract_image_url(backend, course_item):
+    """Extract the course image URL with multiple fallback strategies."""
+    # Prefer the first srcset entry of the <picture> source
+    source_tag = backend.select_one(course_item, UDEMY_SELECTORS['image_source'])
+    srcset = backend.attr(source_tag, 'srcset') if source_tag is not None else None
+    if srcset:
+        try:
+            # Split the srcset into candidates and keep just the first URL
+            return srcset.split(',')[0].split()[0]
+        except IndexError:
+            return UDEMY_PLACEHOLDER_IMAGE
+
+    # Fallback: check if there's any 'img' tag directly inside the course item
+    fallback_img = backend.select_one(course_item, UDEMY_SELECTORS['image'])
+    if fallback_img is not None and backend.attr(fallback_img, 'src'):
+        return backend.attr(fallback_img, 'src')
+
+    # If all fails, return a placeholder image
+    return UDEMY_PLACEHOLDER_IMAGE
+
+
+def clean_udemy_url(url):
+    """Clean Udemy course URL by removing 'udemy-' prefix and numeric suffix.
+
+    Args:
+        url (str): The original Udemy course URL
+
+    Returns:
+        str: Cleaned URL with prefix and suffix removed
+    """
+    try:
+        # Split the URL to get the course slug
+        parts = url.split('/course/')
+        if len(parts) != 2:
+            return url
+
+        base_url = parts[0]
+        course_slug = parts[1]
+
+        # Remove the numeric suffix (e.g., -25803)
+        course_slug = re.sub(r'-\d+/?$', '', course_slug)
+
+        # Remove 'udemy-' prefix from the course slug
+        if course_slug.startswith('udemy-'):
+            course_slug = course_slug[6:]
+
+        # Reconstruct the URL
+        return f"{base_url}/course/{course_slug}"
+    except:
+        return url
+
+
+def extract_udemy(page_content: str, backend=None) -> list:
+    """Extract Udemy courses from the classcentral provider listing"""
+    backend = get_backend(backend)
+    selectors = UDEMY_SELECTORS
+    courses_list = []
+    document = backend.parse(page_content)
+
+    for course_item in backend.select(document, selectors['item']):
+        try:
+            title_element = backend.select_one(course_item, selectors['title'])
+            link_element = backend.select_one(course_item, selectors['link'])
+            rating_element = backend.select_one(course_item, selectors['rating'])
+            link_href = backend.attr(link_element, 'href') if link_element is not None else None
+            link = clean_udemy_url("https://www.udemy.com" + (link_href or 'N/A')) if link_element is not None else 'N/A'
+            title = _text(backend, title_element)
+
+            course_data = Course(
+                id=course_id('udemy', link, title),
+                title=title,
+                provider="Udemy",
+                link=link,
+                detail=_text(backend, backend.select_one(course_item, selectors['detail'])),
+                rating=len(backend.select(rating_element, selectors['rating_star'])) if rating_element is not None else 'N/A',
+                category='N/A',
+                image=extract_image_url(backend, course_item),
+                source='udemy',
+            )
+            courses_list.append(course_data)
+
+        except Exception as e:
+            logger.error(f"Error parsing Udacity course: {str(e)}")
+            continue
+
+    return courses_list
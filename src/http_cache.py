@@ -0,0 +1,98 @@
+import hashlib
+import json
+import logging
+import os
+
+
+# Directory holding cached provider responses between refreshes
+CACHE_DIR = os.getenv('SCRAPER_CACHE_DIR', '.cache/scraper')
+# Set to 0 to disable conditional requests and the on-disk response cache
+HTTP_CACHE_ENABLED = os.getenv('SCRAPER_HTTP_CACHE', '1') == '1'
+
+logger = logging.getLogger(__name__)
+
+
+class FetchedPage:
+    """Minimal response object for bodies that were not downloaded by requests.
+
+    Returned for 304 Not Modified answers (the body comes from the cache) and
+    by the async engine.
+    """
+
+    def __init__(self, url: str, text: str, status_code: int = 200, headers=None, not_modified: bool = False):
+        self.url = url
+        self.text = text
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.not_modified = not_modified
+
+
+class ResponseCache:
+    """On-disk store of response bodies and their validators.
+
+    Each URL maps to one JSON file named after the URL's hash, holding the
+    body and the ETag/Last-Modified validators. Writes go through a temp file
+    and os.replace so concurrent readers never see a partial entry.
+    """
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url: str):
+        """Return the cached entry for url, or None"""
+        try:
+            with open(self._path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+
+    def _write(self, url: str, entry: dict):
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry for {url}: {e}")
+
+    def conditional_headers(self, entry) -> dict:
+        """Build If-None-Match/If-Modified-Since headers from a cached entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store_response(self, url: str, text: str, headers):
+        """Cache a fresh 200 response body if it carries validators"""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not (etag or last_modified):
+            return
+        self._write(url, {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': text,
+        })
+
+
+_response_cache = None
+
+
+def get_response_cache():
+    """Return the process-wide response cache, or None when disabled"""
+    global _response_cache
+    if HTTP_CACHE_ENABLED and _response_cache is None:
+        _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,109 @@
+import os
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+# Number of per-host connection pools kept alive at once
+POOL_CONNECTIONS = int(os.getenv('SCRAPER_POOL_CONNECTIONS', 10))
+# Maximum number of connections opened to a single host
+POOL_MAXSIZE = int(os.getenv('SCRAPER_POOL_MAXSIZE', 8))
+# When a host's pool is exhausted, wait for a free connection instead of
+# opening an extra throwaway one, so POOL_MAXSIZE is a hard per-host limit
+POOL_BLOCK = os.getenv('SCRAPER_POOL_BLOCK', '1') == '1'
+
+_session = None
+_session_lock = threading.Lock()
+
+# Seconds the current thread spent opening connections, see take_connect_seconds
+_connect_times = threading.local()
+
+
+def _record_connect(seconds: float):
+    _connect_times.seconds = (getattr(_connect_times, 'seconds', None) or 0.0) + seconds
+
+
+def take_connect_seconds():
+    """Seconds this thread spent opening connections (DNS, TCP and TLS) since the last call.
+
+    Returns:
+        float: The time, or None if every request since reused a pooled connection
+    """
+    seconds = getattr(_connect_times, 'seconds', None)
+    _connect_times.seconds = None
+    return seconds
+
+
+class TimedHTTPConnection(HTTPConnection):
+    def connect(self):
+        start = time.monotonic()
+        try:
+            super().connect()
+        finally:
+            _record_connect(time.monotonic() - start)
+
+
+class TimedHTTPSConnection(HTTPSConnection):
+    def connect(self):
+        start = time.monotonic()
+        try:
+            super().connect()
+        finally:
+            _record_connect(time.monotonic() - start)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled connections record how long they took to open"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': TimedHTTPConnectionPool,
+            'https': TimedHTTPSConnectionPool,
+        }
+
+
+def build_session(pool_connections: int = POOL_CONNECTIONS,
+                  pool_maxsize: int = POOL_MAXSIZE,
+                  pool_block: bool = POOL_BLOCK) -> requests.Session:
+    """Create a requests session backed by keep-alive connection pools.
+
+    Args:
+        pool_connections (int): Number of hosts to keep a pool for
+        pool_maxsize (int): Maximum concurrent connections per host
+        pool_block (bool): Block instead of exceeding pool_maxsize
+
+    Returns:
+        requests.Session: Session that reuses TCP/TLS connections per host
+    """
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session() -> requests.Session:
+    """Return the process-wide pooled session, creating it on first use"""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = build_session()
+    return _session
@@ -0,0 +1,246 @@
+import hashlib
+import io
+import ipaddress
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, without it images are cached and served at their original size
+    Image = None
+
+from http_cache import CACHE_DIR
+from http_session import get_session
+
+
+logger = logging.getLogger(__name__)
+
+# Directory holding fetched course images and their thumbnails
+IMAGE_CACHE_DIR = os.getenv('SCRAPER_IMAGE_CACHE_DIR', os.path.join(CACHE_DIR, 'images'))
+# Bounding boxes thumbnails are scaled down to, keeping the aspect ratio
+THUMBNAIL_SIZES = {'small': (160, 90), 'medium': (320, 180), 'large': (640, 360)}
+DEFAULT_THUMBNAIL_SIZE = 'medium'
+THUMBNAIL_QUALITY = 80
+# Seconds clients and proxies may reuse a served image without asking again
+IMAGE_MAX_AGE = int(os.getenv('IMAGE_MAX_AGE', 7 * 86400))
+# Seconds before an image that could not be fetched is tried again
+IMAGE_RETRY_INTERVAL = int(os.getenv('IMAGE_RETRY_INTERVAL', 3600))
+IMAGE_FETCH_TIMEOUT = 10
+# Larger upstream images are not cached
+MAX_IMAGE_BYTES = 10 * 2 ** 20
+# Redirects followed per image, each to a host checked like the first
+MAX_IMAGE_REDIRECTS = 3
+# Locks serializing first fetches, shared by all URLs that hash to the same one
+IMAGE_LOCK_STRIPES = 64
+
+
+def resolve_image_url(url):
+    """Absolute URL of the image behind a course's image field, or None when it has none.
+
+    Protocol-relative URLs get https, and Next.js optimizer URLs
+    (/_next/image?url=/images/x.png&w=3840) point at the original image
+    instead of a 4K rendition of it.
+    """
+    if not url or url == 'N/A':
+        return None
+    url = url.strip()
+    if url.startswith('//'):
+        url = 'https:' + url
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https'):
+        return None
+    if parts.path == '/_next/image':
+        source = parse_qs(parts.query).get('url')
+        if source:
+            return urljoin(url, source[0])
+    return url
+
+
+class CachedImage:
+    """An image file in the cache, ready to be served"""
+
+    def __init__(self, path: str, mimetype: str, etag: str):
+        self.path = path
+        self.mimetype = mimetype
+        self.etag = etag
+
+
+class ImageCache:
+    """Course images fetched once and kept on disk as fixed-size thumbnails.
+
+    Every source URL maps to a small JSON entry naming the SHA-256 digest of
+    the image it returned. Thumbnails are stored under that digest, so images
+    shared by several courses or URLs are stored once, and a digest plus size
+    is a stable ETag. All sizes are rendered when the image is first fetched.
+    Without Pillow the original image is stored and served for every size.
+
+    Image URLs come from scraped pages, so only hosts that resolve to public
+    addresses are fetched, after every redirect too. allow_private lifts
+    that for local stand-in servers in benchmarks.
+    """
+
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, session=None, sizes: dict = None,
+                 retry_interval: int = IMAGE_RETRY_INTERVAL, allow_private: bool = False):
+        self.directory = directory
+        self.session = session if session is not None else get_session()
+        self.sizes = sizes if sizes is not None else THUMBNAIL_SIZES
+        self.retry_interval = retry_interval
+        self.allow_private = allow_private
+        os.makedirs(os.path.join(directory, 'urls'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'blobs'), exist_ok=True)
+        self._locks = [threading.Lock() for _ in range(IMAGE_LOCK_STRIPES)]
+
+    def _entry_path(self, url: str) -> str:
+        return os.path.join(self.directory, 'urls', hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def _blob_path(self, digest: str, size: str) -> str:
+        return os.path.join(self.directory, 'blobs', digest[:2], f"{digest}-{size}")
+
+    def _read_entry(self, url: str):
+        try:
+            with open(self._entry_path(url), encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable image cache entry for {url}: {e}")
+            return None
+
+    def _write(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _cached(self, entry, size: str):
+        if not entry or not entry.get('digest'):
+            return None
+        # Entries written without Pillow point at the original for every size
+        path = self._blob_path(entry['digest'], size if entry.get('resized') else 'original')
+        if not os.path.exists(path):
+            return None
+        return CachedImage(path, entry['mimetype'], f"{entry['digest'][:16]}-{size}")
+
+    def _lock(self, url: str) -> threading.Lock:
+        # A fixed table, however many URLs are seen; URLs sharing a lock only
+        # wait on each other while one of them is fetched for the first time
+        return self._locks[hash(url) % len(self._locks)]
+
+    def get(self, url: str, size: str = DEFAULT_THUMBNAIL_SIZE):
+        """Thumbnail of the image at url, fetching and rendering it on first use.
+
+        Concurrent requests for the same URL in this process wait for one fetch.
+        URLs that resolve to loopback, private, link-local or other
+        non-public addresses are never fetched.
+
+        Returns:
+            CachedImage: The thumbnail file, or None if the image could not be fetched
+        """
+        image = self._cached(self._read_entry(url), size)
+        if image is not None:
+            return image
+
+        with self._lock(url):
+            entry = self._read_entry(url)
+            image = self._cached(entry, size)
+            if image is not None:
+                return image
+            if entry and entry.get('failed_at', 0) > time.time() - self.retry_interval:
+                return None
+            entry = self._fetch(url)
+            self._write(self._entry_path(url), json.dumps(entry).encode('utf-8'))
+            return self._cached(entry, size)
+
+    def _check_target(self, url: str):
+        """Raise ValueError unless url is http(s) on a host with only public addresses"""
+        parts = urlsplit(url)
+        if parts.scheme not in ('http', 'https') or not parts.hostname:
+            raise ValueError("not an http(s) URL")
+        if self.allow_private:
+            return
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        try:
+            addresses = {info[4][0] for info in socket.getaddrinfo(parts.hostname, port, proto=socket.IPPROTO_TCP)}
+        except socket.gaierror as e:
+            raise ValueError(f"cannot resolve {parts.hostname}: {e}")
+        for address in addresses:
+            # Drop the scope of link-local IPv6 addresses ("fe80::1%eth0")
+            ip = ipaddress.ip_address(address.split('%', 1)[0])
+            if not ip.is_global or ip.is_multicast:
+                raise ValueError(f"{parts.hostname} resolves to non-public address {ip}")
+
+    def _get(self, url: str):
+        """Streamed response for url, following redirects one checked hop at a time"""
+        for _ in range(MAX_IMAGE_REDIRECTS + 1):
+            self._check_target(url)
+            response = self.session.get(url, timeout=IMAGE_FETCH_TIMEOUT, stream=True, allow_redirects=False)
+            if not response.is_redirect:
+                return response
+            response.close()
+            url = urljoin(url, response.headers['Location'])
+        raise ValueError(f"more than {MAX_IMAGE_REDIRECTS} redirects")
+
+    def _fetch(self, url: str) -> dict:
+        """Download url, store its thumbnails and return the entry describing them"""
+        try:
+            with self._get(url) as response:
+                content_type = response.headers.get('Content-Type', '').split(';')[0].strip()
+                if response.status_code != 200 or not content_type.startswith('image/'):
+                    raise ValueError(f"status {response.status_code}, content type {content_type or 'missing'}")
+                body = response.raw.read(MAX_IMAGE_BYTES + 1, decode_content=True)
+            if len(body) > MAX_IMAGE_BYTES:
+                raise ValueError(f"larger than {MAX_IMAGE_BYTES} bytes")
+            digest = hashlib.sha256(body).hexdigest()
+            mimetype = self._store(digest, body, content_type)
+            resized = Image is not None
+        except Exception as e:
+            logger.warning(f"Could not cache image {url}: {e}")
+            return {'url': url, 'failed_at': time.time()}
+        return {'url': url, 'digest': digest, 'mimetype': mimetype, 'resized': resized, 'fetched_at': time.time()}
+
+    def _store(self, digest: str, body: bytes, content_type: str) -> str:
+        """Write the thumbnails of an image (unless already stored) and return their mimetype"""
+        if Image is None:
+            if not os.path.exists(self._blob_path(digest, 'original')):
+                self._write(self._blob_path(digest, 'original'), body)
+            return content_type
+
+        source = Image.open(io.BytesIO(body))
+        # JPEGs can be decoded straight at a fraction of their size, which is much faster
+        source.draft('RGB', max(self.sizes.values()))
+        if source.mode not in ('RGB', 'L'):
+            # JPEG has no alpha channel: flatten transparent images onto white
+            source = source.convert('RGBA')
+            background = Image.new('RGB', source.size, 'white')
+            background.paste(source, mask=source.getchannel('A'))
+            source = background
+        for size, box in self.sizes.items():
+            path = self._blob_path(digest, size)
+            if os.path.exists(path):
+                continue
+            thumbnail = source.copy()
+            thumbnail.thumbnail(box, Image.LANCZOS)
+            buffer = io.BytesIO()
+            thumbnail.save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY, optimize=True, progressive=True)
+            self._write(path, buffer.getvalue())
+        return 'image/jpeg'
+
+
+_image_cache = None
+_image_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    """Return the process-wide image cache, creating it on first use"""
+    global _image_cache
+    if _image_cache is None:
+        with _image_cache_lock:
+            if _image_cache is None:
+                _image_cache = ImageCache()
+    return _image_cache
@@ -0,0 +1,224 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+# Histogram buckets in seconds, from a fast cache hit to a slow provider page
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names: tuple, values: tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _combine(self, value, other):
+        """Value of a series recorded as value here and as other in another process"""
+        raise NotImplementedError
+
+    def export(self) -> list:
+        """[label values, value] of every series, as JSON-serializable lists"""
+        with self._lock:
+            return [[list(key), list(value) if isinstance(value, list) else value] for key, value in self._values.items()]
+
+    def values(self, states=()) -> dict:
+        """Series of this process combined with the exported series of other processes.
+
+        Args:
+            states: export_state() results of other processes, oldest first
+        """
+        with self._lock:
+            values = {key: list(value) if isinstance(value, list) else value for key, value in self._values.items()}
+        for state in states:
+            for key, value in state.get(self.name, ()):
+                key = tuple(key)
+                values[key] = self._combine(values[key], value) if key in values else value
+        return values
+
+    def samples(self, states=()) -> list:
+        """(suffix, label string, value) of every series"""
+        raise NotImplementedError
+
+    def render(self, states=()) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(f'{self.name}{suffix}{labels} {_number(value)}' for suffix, labels, value in self.samples(states))
+        return '\n'.join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label set"""
+
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _combine(self, value, other):
+        return value + other
+
+    def samples(self, states=()) -> list:
+        return [('_total', _labels(self.labelnames, key), value) for key, value in sorted(self.values(states).items())]
+
+
+class Gauge(_Metric):
+    """Last set value per label set"""
+
+    kind = 'gauge'
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _combine(self, value, other):
+        # States come oldest first, so the last value set anywhere wins
+        return other
+
+    def samples(self, states=()) -> list:
+        return [('', _labels(self.labelnames, key), value) for key, value in sorted(self.values(states).items())]
+
+
+class Histogram(_Metric):
+    """Distribution of observed values per label set, in cumulative buckets"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket counts, then sum and count
+                series = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent in the with block"""
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(time.monotonic() - start, **labels)
+
+    def _combine(self, value, other):
+        if len(other) != len(value):
+            # Exported with other buckets; only sum and count can be merged
+            return value[:-2] + [value[-2] + other[-2], value[-1] + other[-1]]
+        return [a + b for a, b in zip(value, other)]
+
+    def samples(self, states=()) -> list:
+        samples = []
+        for key, values in sorted(self.values(states).items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                samples.append(('_bucket', _labels(self.labelnames, key, f'le="{_number(bound)}"'), cumulative))
+            samples.append(('_sum', _labels(self.labelnames, key), values[-2]))
+            samples.append(('_count', _labels(self.labelnames, key), values[-1]))
+        return samples
+
+
+# Every metric of this process, in the order they are exported
+REGISTRY = []
+
+
+def render(states=()) -> str:
+    """All metrics in the Prometheus text exposition format.
+
+    Args:
+        states: export_state() results of other processes to merge in,
+            oldest first: counters and histograms are summed, gauges keep
+            the newest value
+    """
+    return '\n'.join(metric.render(states) for metric in REGISTRY) + '\n'
+
+
+def export_state() -> dict:
+    """Every metric's series by metric name, for render() in another process"""
+    return {metric.name: metric.export() for metric in REGISTRY}
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc
+
+
+def observe_fetch(url: str, status, timings: dict):
+    """Record one fetch attempt of url.
+
+    Args:
+        url (str): The fetched URL, recorded by host
+        status: Response status, None when no response arrived
+        timings (dict): Monotonic 'sent', 'headers' and 'done' marks, plus
+            'dns' and 'connect' durations when a new connection was opened
+    """
+    host = host_of(url)
+    FETCH_RESPONSES.inc(host=host, status='error' if status is None else status)
+    for phase in ('dns', 'connect'):
+        if timings.get(phase) is not None:
+            FETCH_PHASE_SECONDS.observe(timings[phase], host=host, phase=phase)
+    if 'sent' in timings and 'headers' in timings:
+        # Connect time includes DNS; whatever is left until the headers is the server's
+        ttfb = timings['headers'] - timings['sent'] - (timings.get('connect') or 0.0)
+        FETCH_PHASE_SECONDS.observe(max(0.0, ttfb), host=host, phase='ttfb')
+    if 'headers' in timings and 'done' in timings:
+        FETCH_PHASE_SECONDS.observe(timings['done'] - timings['headers'], host=host, phase='download')
+
+
+FETCH_PHASE_SECONDS = Histogram(
+    'scraper_fetch_phase_seconds',
+    'Time per phase of provider page fetches: dns, connect (including DNS and TLS), ttfb, download',
+    ('host', 'phase'))
+FETCH_RESPONSES = Counter(
+    'scraper_fetch_responses', 'Provider page fetch attempts by response status, "error" when none arrived',
+    ('host', 'status'))
+PARSE_SECONDS = Histogram('scraper_parse_seconds', 'Time spent parsing the pages of one provider batch', ('provider',))
+PROVIDER_SECONDS = Histogram('scraper_provider_seconds', 'Time to scrape one provider end to end', ('provider',))
+PROVIDER_COURSES = Gauge('scraper_provider_courses', 'Courses found by the last scrape of a provider', ('provider',))
+REFRESH_STAGE_SECONDS = Histogram(
+    'scraper_refresh_stage_seconds',
+    'Time per catalog refresh stage: scrape, assemble, dedup, encode, cache_write, snapshot_db',
+    ('stage',))
+CATALOG_COURSES = Gauge('scraper_catalog_courses', 'Courses in the last published catalog')
+CATALOG_PUBLISHED = Gauge('scraper_catalog_published_timestamp_seconds', 'Unix time the last catalog was published')
+REQUEST_SECONDS = Histogram(
+    'api_request_seconds', 'Time to serve an API request, by endpoint and status', ('endpoint', 'method', 'status'))
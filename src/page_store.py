@@ -0,0 +1,75 @@
+import hashlib
+import json
+import logging
+import os
+
+from course import Course, as_course
+from extractors import EXTRACTOR_VERSION
+from http_cache import CACHE_DIR
+
+
+# Set to 0 to always re-parse every page
+PAGE_STORE_ENABLED = os.getenv('SCRAPER_PAGE_STORE', '1') == '1'
+
+logger = logging.getLogger(__name__)
+
+
+def content_fingerprint(page_content: str) -> str:
+    """Hash of a page body, used to detect pages that did not change"""
+    return hashlib.sha256(page_content.encode('utf-8')).hexdigest()
+
+
+class PageStore:
+    """Per-page content fingerprints and the course records extracted from them.
+
+    A refresh looks up each fetched page here; when the body hashes to the
+    stored fingerprint the stored records are reused and only changed pages
+    are parsed, so parse work scales with the number of changed pages.
+    """
+
+    def __init__(self, directory: str = os.path.join(CACHE_DIR, 'pages')):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def lookup(self, url: str, fingerprint: str):
+        """Return the records stored for url if they were extracted from a body with this
+        fingerprint by the current extractor version"""
+        try:
+            with open(self._path(url), encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable page store entry for {url}: {e}")
+            return None
+        if entry.get('fingerprint') != fingerprint or entry.get('version') != EXTRACTOR_VERSION:
+            return None
+        records = entry.get('records')
+        # Records are stored as Course rows, which keep the source to_dict() leaves out
+        return [Course(*record) for record in records] if records is not None else None
+
+    def store(self, url: str, fingerprint: str, records: list):
+        """Remember the records extracted from url's body with this fingerprint"""
+        path = self._path(url)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                rows = [as_course(record).to_row() for record in records]
+                json.dump({'url': url, 'fingerprint': fingerprint, 'version': EXTRACTOR_VERSION, 'records': rows}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write page store entry for {url}: {e}")
+
+
+_page_store = None
+
+
+def get_page_store():
+    """Return the process-wide page store, or None when disabled"""
+    global _page_store
+    if PAGE_STORE_ENABLED and _page_store is None:
+        _page_store = PageStore()
+    return _page_store
@@ -0,0 +1,49 @@
+import math
+import os
+import re
+
+
+# Pages fetched at once while following next-page markers
+PAGE_CONCURRENCY = int(os.getenv('SCRAPER_PAGE_CONCURRENCY', 8))
+
+# "1,234 results" / "Showing 1.234 total results"
+RESULT_COUNT_RE = re.compile(r'(\d[\d,.]*)\s+(?:total\s+)?results\b', re.IGNORECASE)
+NEXT_PAGE_RE = re.compile(r'''rel=["']next["']|aria-label=["']Next Page["']''', re.IGNORECASE)
+
+
+def page_ranges(spec: str = None) -> dict:
+    """Per-provider (first page, last page) from a "name=first-last,..." spec (SCRAPER_PAGE_RANGES by default).
+
+    Providers declare their own range (Provider.pages); these only override it.
+    """
+    spec = os.getenv('SCRAPER_PAGE_RANGES', '') if spec is None else spec
+    ranges = {}
+    for item in spec.split(','):
+        name, _, pages = item.partition('=')
+        first, _, last = pages.partition('-')
+        if name.strip() and first.strip() and last.strip():
+            ranges[name.strip()] = (int(first), int(last))
+    return ranges
+
+
+# Page ranges overriding the providers' own, e.g. SCRAPER_PAGE_RANGES="coursera=1-40"
+PAGE_RANGES = page_ranges()
+
+
+def result_count(page_content: str):
+    """Total number of results a search page reports, or None if it does not say"""
+    match = RESULT_COUNT_RE.search(page_content or '')
+    if match is None:
+        return None
+    return int(re.sub(r'[,.]', '', match.group(1)))
+
+
+def has_next_page(page_content: str) -> bool:
+    """Whether a results page links to a following page"""
+    return bool(NEXT_PAGE_RE.search(page_content or ''))
+
+
+def last_page_for(first_page: int, last_page: int, total_results: int, per_page: int) -> int:
+    """Last page to fetch to cover total_results, never past last_page"""
+    pages = math.ceil(total_results / per_page) if per_page else 1
+    return max(first_page, min(last_page, first_page + pages - 1))
@@ -0,0 +1,89 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from parser_backends import PARSER_BACKEND
+from providers import get_provider
+
+
+# Number of worker processes used for HTML parsing; 0 parses in-process
+PARSE_WORKERS = int(os.getenv('SCRAPER_PARSE_WORKERS', 0))
+# Start method for the worker processes. 'spawn' is safe to use from the
+# threaded web process, 'fork' starts faster for one-off batch runs
+PARSE_START_METHOD = os.getenv('SCRAPER_PARSE_START_METHOD', 'spawn')
+
+logger = logging.getLogger(__name__)
+
+
+def parse_page(provider: str, page_content: str, backend: str = None) -> list:
+    """Extract the courses of one provider page with the given parser backend.
+
+    Module-level so it can be sent to worker processes.
+    """
+    return get_provider(provider).extract(page_content, backend)
+
+
+class ParsePool:
+    """Parse stage that runs HTML extraction off the fetch threads.
+
+    With workers > 0 raw HTML is handed to a process pool, so pages are parsed
+    in parallel instead of serialising on the GIL. With workers == 0 pages are
+    parsed in the calling thread, which is cheaper for small runs.
+    """
+
+    def __init__(self, workers: int = PARSE_WORKERS, start_method: str = PARSE_START_METHOD, backend: str = PARSER_BACKEND):
+        self.workers = workers
+        self.backend = backend
+        self.start_method = start_method
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        """The underlying ProcessPoolExecutor, or None when parsing in-process"""
+        if self.workers <= 0:
+            return None
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    context = multiprocessing.get_context(self.start_method)
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                    logger.info(f"Started parse pool with {self.workers} workers")
+        return self._executor
+
+    def map(self, provider: str, page_contents: list) -> list:
+        """Parse several pages of one provider in parallel, returning one list of courses per page"""
+        executor = self.executor
+        if executor is None:
+            return [parse_page(provider, page, self.backend) for page in page_contents]
+        count = len(page_contents)
+        return list(executor.map(parse_page, [provider] * count, page_contents, [self.backend] * count))
+
+    def parse_many(self, provider: str, page_contents) -> list:
+        """Parse several pages of one provider in parallel and return all courses in page order"""
+        page_contents = [page for page in page_contents if page is not None]
+        courses_list = []
+        for courses in self.map(provider, page_contents):
+            courses_list.extend(courses)
+        return courses_list
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> ParsePool:
+    """Return the process-wide parse pool, creating it on first use"""
+    global _parse_pool
+    if _parse_pool is None:
+        with _parse_pool_lock:
+            if _parse_pool is None:
+                _parse_pool = ParsePool()
+    return _parse_pool
@@ -0,0 +1,83 @@
+import os
+
+
+# Parser used by the extractors: 'html.parser', 'lxml' or 'selectolax'
+PARSER_BACKEND = os.getenv('SCRAPER_PARSER_BACKEND', 'html.parser')
+
+
+class SoupBackend:
+    """BeautifulSoup tree with CSS selectors, on the html.parser or lxml tree builder"""
+
+    def __init__(self, features: str):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+        self.name = features
+        self.features = features
+
+    def parse(self, page_content: str):
+        return self._soup(page_content, self.features)
+
+    def select(self, node, selector: str) -> list:
+        return node.select(selector)
+
+    def select_one(self, node, selector: str):
+        return node.select_one(selector)
+
+    def text(self, node) -> str:
+        return node.get_text()
+
+    def attr(self, node, name: str):
+        value = node.get(name)
+        # bs4 splits multi-valued attributes such as class into lists
+        if isinstance(value, list):
+            return ' '.join(value)
+        return value
+
+
+class SelectolaxBackend:
+    """selectolax's C-based lexbor DOM with its native CSS selector engine"""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, page_content: str):
+        return self._parser(page_content)
+
+    def select(self, node, selector: str) -> list:
+        return node.css(selector)
+
+    def select_one(self, node, selector: str):
+        return node.css_first(selector)
+
+    def text(self, node) -> str:
+        return node.text(deep=True)
+
+    def attr(self, node, name: str):
+        return node.attributes.get(name)
+
+
+BACKENDS = {
+    'html.parser': lambda: SoupBackend('html.parser'),
+    'lxml': lambda: SoupBackend('lxml'),
+    'selectolax': SelectolaxBackend,
+}
+
+_instances = {}
+
+
+def get_backend(name: str = None):
+    """Return the parser backend registered under name (defaults to SCRAPER_PARSER_BACKEND).
+
+    Raises:
+        ValueError: If no backend is registered under name
+        ImportError: If the backend's optional dependency is not installed
+    """
+    name = name or PARSER_BACKEND
+    if name not in _instances:
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown parser backend {name!r}, expected one of {sorted(BACKENDS)}")
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
@@ -0,0 +1,91 @@
+import logging
+import os
+import time
+
+from course import decode_courses, encode_courses
+from providers import provider_names
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds a provider's courses are used before it is scraped again,
+# overridable per provider with SCRAPER_PROVIDER_TTLS="coursera=43200,who=604800"
+DEFAULT_PROVIDER_TTL = int(os.getenv('SCRAPER_PROVIDER_TTL', 86400))
+# Seconds a refresh waits for one provider before using its last good courses
+PROVIDER_DEADLINE = float(os.getenv('SCRAPER_PROVIDER_DEADLINE', 120))
+# Last good courses of a provider are kept this long after their last successful scrape
+PROVIDER_RETENTION = int(os.getenv('SCRAPER_PROVIDER_RETENTION', 30 * 86400))
+
+
+def provider_ttls(spec: str = None) -> dict:
+    """Per-provider TTLs from a "name=seconds,..." spec (SCRAPER_PROVIDER_TTLS by default)"""
+    spec = os.getenv('SCRAPER_PROVIDER_TTLS', '') if spec is None else spec
+    ttls = {name: DEFAULT_PROVIDER_TTL for name in provider_names()}
+    for item in spec.split(','):
+        name, _, seconds = item.partition('=')
+        if name.strip() and seconds.strip():
+            ttls[name.strip()] = int(seconds)
+    return ttls
+
+
+class ProviderStore:
+    """Last good courses of every provider, each cached under its own key.
+
+    A refresh only scrapes the providers whose courses are older than their
+    TTL. A provider that fails, returns nothing or misses its deadline keeps
+    serving the courses of its last successful scrape.
+    """
+
+    def __init__(self, cache, ttls: dict = None, retention: int = PROVIDER_RETENTION):
+        self.cache = cache
+        self.ttls = ttls if ttls is not None else provider_ttls()
+        self.retention = retention
+
+    def _key(self, name: str) -> str:
+        return f'provider:{name}'
+
+    def get(self, name: str):
+        """{'courses': [...], 'fetched_at': epoch seconds} of a provider's last good scrape, or None"""
+        part = self.cache.get(self._key(name))
+        if part is None:
+            return None
+        return {'courses': decode_courses(part['courses']), 'fetched_at': part['fetched_at']}
+
+    def due(self, now: float = None) -> list:
+        """Providers never scraped, or scraped longer ago than their TTL"""
+        now = time.time() if now is None else now
+        names = provider_names()
+        parts = self.cache.get_many(*(self._key(name) for name in names))
+        return [
+            name for name, part in zip(names, parts)
+            if part is None or now - part['fetched_at'] >= self.ttls.get(name, DEFAULT_PROVIDER_TTL)
+        ]
+
+    def store(self, name: str, courses: list):
+        self.cache.set(self._key(name), {'courses': encode_courses(courses), 'fetched_at': time.time()},
+                       timeout=self.retention)
+
+    def assemble(self, results: dict) -> dict:
+        """Store fresh provider results and fill in the rest from the last good ones.
+
+        Args:
+            results (dict): Provider name mapped to its scraped courses, or None
+                when the provider failed or missed its deadline
+
+        Returns:
+            dict: Every provider mapped to the courses to publish
+        """
+        parts = {}
+        for name in provider_names():
+            courses = results.get(name)
+            if courses:
+                self.store(name, courses)
+                parts[name] = courses
+                continue
+
+            part = self.get(name)
+            if name in results:
+                age = f"{(time.time() - part['fetched_at']) / 3600:.1f}h old" if part else 'none kept'
+                logger.warning(f"{name} has no fresh courses, using last good data ({age})")
+            parts[name] = part['courses'] if part else []
+        return parts
@@ -0,0 +1,113 @@
+from functools import partial
+
+from extractors import (
+    WHO_SELECTORS,
+    extract_coursera,
+    extract_fields,
+    extract_harvard,
+    extract_life,
+    extract_udemy,
+)
+from pagination import PAGE_RANGES
+
+
+COURSERA_URL = 'https://www.coursera.org/courses?query=free'
+HARVARD_URL = 'https://pll.harvard.edu/catalog/free'
+LIFE_URL = 'https://www.life-global.org/allcourses'
+WHO_URL = 'https://openwho.org/courses?q=&channel=&lang=&category=&topic='
+UDEMY_URL = 'https://www.classcentral.com/provider/udemy?free=true'
+
+
+class Field:
+    """How one course field is read from a listing item.
+
+    Args:
+        selector (str): Key into the provider's selectors, None for the item itself
+        attr (str): Attribute to read, None for the element's text
+        prefix (str): Prepended to non-empty values, e.g. the site origin for relative links
+        default: Value used when the element (or attribute) is missing
+        required (bool): Skip items where the element is missing
+    """
+
+    def __init__(self, selector: str = None, attr: str = None, prefix: str = '', default='N/A', required: bool = False):
+        self.selector = selector
+        self.attr = attr
+        self.prefix = prefix
+        self.default = default
+        self.required = required
+
+
+class Provider:
+    """Declaration of one course source: where its listing pages are and how to read them.
+
+    A provider either lists fixed urls, or a page_url template with a
+    "{page}" placeholder whose pages are discovered from the first one
+    within its page range (SCRAPER_PAGE_RANGES overrides `pages`).
+    Courses are read with a field mapping over CSS selectors, or with a
+    custom extract function for sites the mapping cannot express.
+    """
+
+    def __init__(self, name: str, label: str, urls=(), page_url: str = None, pages: tuple = (1, 1),
+                 selectors: dict = None, fields: dict = None, extract=None):
+        self.name = name
+        self.label = label
+        self.urls = list(urls)
+        self.page_url = page_url
+        self.pages = pages
+        self.selectors = selectors
+        self.fields = fields
+        self.extract = extract or partial(extract_fields, source=name, selectors=selectors, fields=fields)
+
+    @property
+    def paginated(self) -> bool:
+        return self.page_url is not None
+
+    def page_range(self) -> tuple:
+        """(first page, last page) this provider may be scraped from"""
+        return PAGE_RANGES.get(self.name, self.pages)
+
+    def url_for_page(self, page: int) -> str:
+        return self.page_url.format(page=page)
+
+
+# Registered providers by name, in the order their courses are concatenated
+REGISTRY = {}
+
+
+def register(provider: Provider) -> Provider:
+    REGISTRY[provider.name] = provider
+    return provider
+
+
+def get_provider(name: str) -> Provider:
+    return REGISTRY[name]
+
+
+def provider_names() -> list:
+    return list(REGISTRY)
+
+
+register(Provider(
+    'coursera', 'Coursera',
+    page_url=COURSERA_URL + '&page={page}&index=prod_all_launched_products_term_optimization',
+    pages=(1, 25),
+    extract=extract_coursera,
+))
+register(Provider('harvard', 'Harvard', urls=[HARVARD_URL], extract=extract_harvard))
+register(Provider('udemy', 'Udemy', urls=[UDEMY_URL], extract=extract_udemy))
+register(Provider('life', 'Life', urls=[LIFE_URL], extract=extract_life))
+register(Provider(
+    'who', 'WHO',
+    urls=[WHO_URL],
+    selectors=WHO_SELECTORS,
+    fields={
+        'title': Field('title', required=True),
+        'provider': Field('provider', default='WHO'),
+        'detail': Field('detail'),
+        'course_type': Field('course_type'),
+        'language': Field('language'),
+        'certificate': Field('certificate'),
+        'link': Field('title', attr='href', prefix='https://openwho.org'),
+        'image': Field('image', attr='src'),
+    },
+))
@@ -0,0 +1,306 @@
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+try:
+    import redis
+except ImportError:  # redis is optional, without it every process paces its own requests
+    redis = None
+
+from http_session import POOL_MAXSIZE
+
+
+logger = logging.getLogger(__name__)
+
+
+# Requests per second each host may receive (0 disables the token bucket) and the burst allowed
+HOST_RATE = float(os.getenv('SCRAPER_HOST_RATE', 10))
+HOST_BURST = float(os.getenv('SCRAPER_HOST_BURST', 10))
+# Upper bound of the adaptive per-host concurrency limit
+HOST_MAX_CONCURRENCY = int(os.getenv('SCRAPER_HOST_MAX_CONCURRENCY', POOL_MAXSIZE))
+
+# Attempts per URL and the exponential backoff between them, in seconds
+RETRY_ATTEMPTS = int(os.getenv('SCRAPER_RETRY_ATTEMPTS', 4))
+RETRY_BASE_DELAY = float(os.getenv('SCRAPER_RETRY_BASE_DELAY', 0.5))
+RETRY_MAX_DELAY = float(os.getenv('SCRAPER_RETRY_MAX_DELAY', 30))
+
+# Responses worth retrying, and the one meaning the host wants us to slow down
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+THROTTLED = 429
+
+# Latency above this multiple of the fastest observed one (plus a fixed slack for
+# jitter on fast hosts) is treated as the host queueing us
+LATENCY_TOLERANCE = 2.0
+LATENCY_SLACK = 0.05
+# Weight of the newest sample in the latency moving average
+LATENCY_SMOOTHING = 0.2
+# Minimum seconds between two cuts of a host's limits, so one burst of errors cuts them once
+DECREASE_INTERVAL = 1.0
+# Async waiters poll this often while the host is at its concurrency limit
+SLOT_POLL_INTERVAL = 0.01
+
+# Redis holding token buckets and pauses shared by every process that scrapes
+# the same hosts, e.g. Celery page workers; unset, each process paces itself
+RATE_LIMIT_REDIS_URL = os.getenv('SCRAPER_RATE_LIMIT_REDIS_URL')
+# Seconds an idle host's shared bucket is kept
+SHARED_BUCKET_TTL = 3600
+
+# Takes a token from a host's shared bucket. Returns the seconds to wait as a
+# string (Lua numbers come back truncated to integers), "0" when taken
+TAKE_TOKEN_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local rate, burst = tonumber(ARGV[1]), tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated', 'paused_until')
+local paused_until = tonumber(state[3]) or 0
+if now < paused_until then
+    return tostring(paused_until - now)
+end
+local tokens = math.min(burst, (tonumber(state[1]) or burst) + (now - (tonumber(state[2]) or now)) * rate)
+local wait = 0
+if tokens < 1 then
+    wait = (1 - tokens) / rate
+else
+    tokens = tokens - 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return tostring(wait)
+"""
+# Holds every request to a host for ARGV[1] seconds, unless already held longer
+PAUSE_SCRIPT = """
+local clock = redis.call('TIME')
+local paused_until = tonumber(clock[1]) + tonumber(clock[2]) / 1000000 + tonumber(ARGV[1])
+if paused_until > (tonumber(redis.call('HGET', KEYS[1], 'paused_until')) or 0) then
+    redis.call('HSET', KEYS[1], 'paused_until', tostring(paused_until))
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 0
+"""
+
+
+def parse_retry_after(value, now: float = None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+class RetryPolicy:
+    """How often and how long to back off before retrying a failed request"""
+
+    def __init__(self, max_attempts: int = RETRY_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def can_retry(self, attempt: int) -> bool:
+        """Whether another attempt may follow attempt (0-based)"""
+        return attempt + 1 < self.max_attempts
+
+    def pauses_host(self, status: int = None, retry_after: str = None) -> bool:
+        """Whether a failure asks for the whole host to back off, not only the failed request"""
+        return status == THROTTLED or parse_retry_after(retry_after) is not None
+
+    def delay(self, attempt: int, retry_after: str = None) -> float:
+        """Seconds to wait after attempt (0-based) failed.
+
+        A Retry-After header from the host wins, capped at max_delay;
+        otherwise exponential backoff with full jitter.
+        """
+        requested = parse_retry_after(retry_after)
+        if requested is not None:
+            return min(requested, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class SharedBuckets:
+    """Per-host token buckets and pauses in Redis, shared by every process using them.
+
+    Each process still runs its own HostLimiters, whose adaptive concurrency
+    and rates stay local; a request also needs a token from the host's
+    shared bucket, so all processes together stay within the host's rate.
+    When Redis cannot be reached the local limits apply alone.
+    """
+
+    def __init__(self, client, prefix: str = 'scraper:host-rate:'):
+        self.client = client
+        self.prefix = prefix
+        self._take = client.register_script(TAKE_TOKEN_SCRIPT)
+        self._pause = client.register_script(PAUSE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> 'SharedBuckets':
+        if redis is None:
+            raise RuntimeError("Shared rate limiting needs the redis package")
+        return cls(redis.Redis.from_url(url))
+
+    def take(self, host: str, rate: float, burst: float) -> float:
+        """Take a token for a request to host: 0 on success, else seconds to wait"""
+        try:
+            return float(self._take(keys=[self.prefix + host], args=[rate, burst, SHARED_BUCKET_TTL]))
+        except Exception as e:
+            logger.warning(f"Shared rate limit for {host} unavailable, pacing locally: {e}")
+            return 0.0
+
+    def pause(self, host: str, seconds: float):
+        """Hold every process's requests to host for the next `seconds`"""
+        try:
+            self._pause(keys=[self.prefix + host], args=[seconds, SHARED_BUCKET_TTL])
+        except Exception as e:
+            logger.warning(f"Could not share the pause of {host}: {e}")
+
+
+class HostLimiter:
+    """Token bucket plus an adaptive concurrency limit for one host.
+
+    The concurrency limit grows additively while responses are quick and
+    successful, shrinks while latency is well above the fastest seen, and is
+    cut in half on throttling (429) or server errors (AIMD). Throttling also
+    halves the request rate, which then recovers gradually. Throttling and
+    Retry-After pause the whole host, so every request to it waits, not just
+    the one that was told to. With SharedBuckets the token bucket and the
+    pauses also hold across processes.
+    """
+
+    def __init__(self, rate: float = HOST_RATE, burst: float = HOST_BURST, max_concurrency: int = HOST_MAX_CONCURRENCY,
+                 host: str = '', buckets: SharedBuckets = None):
+        self.host = host
+        self.buckets = buckets
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.tokens = self.burst
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self.min_latency = None
+        self.latency = None
+        self._updated = time.monotonic()
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def _try_acquire(self, now: float):
+        """Take a slot and a token: 0 on success, else seconds to wait (None: until a slot frees up)"""
+        if now < self.paused_until:
+            return self.paused_until - now
+        if self.in_flight >= int(self.limit):
+            return None
+        if self.rate > 0:
+            self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self.tokens < 1:
+                return (1 - self.tokens) / self.rate
+            if self.buckets is not None:
+                wait = self.buckets.take(self.host, self.rate, self.burst)
+                if wait > 0:
+                    return wait
+            self.tokens -= 1
+        self.in_flight += 1
+        return 0
+
+    def acquire(self):
+        """Block until a request to this host is allowed"""
+        with self._cond:
+            while True:
+                wait = self._try_acquire(time.monotonic())
+                if wait == 0:
+                    return
+                self._cond.wait(wait)
+
+    async def acquire_async(self):
+        """Wait on the event loop until a request to this host is allowed"""
+        while True:
+            with self._cond:
+                wait = self._try_acquire(time.monotonic())
+            if wait == 0:
+                return
+            await asyncio.sleep(wait if wait is not None else SLOT_POLL_INTERVAL)
+
+    def release(self, latency: float, status: int = None):
+        """Return the slot and adapt to the outcome (status None means no response)"""
+        with self._cond:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if status is None or status >= 500 or status == THROTTLED:
+                self._decrease(now, throttled=status == THROTTLED)
+            else:
+                self.min_latency = latency if self.min_latency is None else min(self.min_latency, latency)
+                self.latency = latency if self.latency is None else (
+                    LATENCY_SMOOTHING * latency + (1 - LATENCY_SMOOTHING) * self.latency)
+                if self.latency > self.min_latency * LATENCY_TOLERANCE + LATENCY_SLACK:
+                    self.limit = max(1.0, self.limit - 1 / self.limit)
+                else:
+                    self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+                    self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+            self._cond.notify_all()
+
+    def _decrease(self, now: float, throttled: bool = False):
+        # Responses to requests sent before the last cut say nothing new
+        if now - self._last_decrease < max(DECREASE_INTERVAL, self.latency or 0.0):
+            return
+        self._last_decrease = now
+        self.limit = max(1.0, self.limit / 2)
+        if throttled and self.rate > 0:
+            self.rate = max(self.max_rate * 0.05, self.rate / 2)
+
+    def pause(self, seconds: float):
+        """Hold every request to this host for the next `seconds`"""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        if self.buckets is not None:
+            self.buckets.pause(self.host, seconds)
+
+
+class RateLimiter:
+    """HostLimiters by hostname, created on first use with the same settings"""
+
+    def __init__(self, rate: float = HOST_RATE, burst: float = HOST_BURST, max_concurrency: int = HOST_MAX_CONCURRENCY,
+                 buckets: SharedBuckets = None):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.buckets = buckets
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def host(self, url: str) -> HostLimiter:
+        """Limiter of the host url points to"""
+        host = urlsplit(url).netloc
+        limiter = self._hosts.get(host)
+        if limiter is None:
+            with self._lock:
+                limiter = self._hosts.get(host)
+                if limiter is None:
+                    limiter = self._hosts[host] = HostLimiter(self.rate, self.burst, self.max_concurrency,
+                                                              host, self.buckets)
+        return limiter
+
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter, creating it on first use"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                buckets = SharedBuckets.from_url(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else None
+                _rate_limiter = RateLimiter(buckets=buckets)
+    return _rate_limiter
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+import redis
+from celery import Celery, group
+from celery.exceptions import TimeoutError as TaskTimeout
+from celery.signals import task_postrun
+
+import metrics
+from course import Course
+from course_scaper import Scraper
+from pagination import has_next_page, result_count
+from provider_store import PROVIDER_DEADLINE
+from rate_limit import RATE_LIMIT_REDIS_URL, RateLimiter, SharedBuckets
+from stores import CACHE_CONFIG, cache, catalog_store, scrape_all_courses
+
+
+logger = logging.getLogger(__name__)
+
+# With SCRAPER_QUEUE=1 refreshes run on Celery workers and web workers only serve:
+#   celery -A scrape_queue worker -Q refresh --concurrency 1
+#   celery -A scrape_queue worker -Q pages
+#   celery -A scrape_queue beat  (exactly one)
+SCRAPE_QUEUE_ENABLED = os.getenv('SCRAPER_QUEUE', '0') == '1'
+CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://redis:6379/1')
+# Page results travel back to the refreshing worker through the result backend
+CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', CELERY_BROKER_URL)
+# The refresh task waits on page tasks, so it gets its own queue, consumed by
+# workers that take no pages: a worker on both queues could fill every slot
+# with refreshes waiting on pages that no slot is left to run
+REFRESH_QUEUE = 'refresh'
+PAGE_QUEUE = 'pages'
+# Seconds between scheduled refreshes, the same setting as the in-process scheduler
+REFRESH_INTERVAL = int(os.getenv('PROVIDER_CHECK_MINUTES', 60)) * 60
+# Seconds a batch of page tasks may take before its pages count as failed
+PAGE_TASK_TIMEOUT = float(os.getenv('SCRAPER_PAGE_TASK_TIMEOUT', PROVIDER_DEADLINE))
+# Cache key present while a refresh is queued, so requests don't queue one each
+REFRESH_QUEUED_KEY = 'catalog:refresh-queued'
+REFRESH_QUEUED_TIMEOUT = 900
+# Page workers take every request's token from per-host buckets in Redis, so
+# scaling them out does not multiply the rate each host receives
+PAGE_RATE_LIMIT_REDIS_URL = RATE_LIMIT_REDIS_URL or CACHE_CONFIG['CACHE_REDIS_URL']
+# Worker processes serve no /metrics of their own: after every task each one
+# writes its metrics to this hash, and the web app's /metrics merges them in
+WORKER_METRICS_KEY = 'scraper:worker-metrics'
+# Seconds after which the metrics of a process that ran no task are dropped
+WORKER_METRICS_TTL = int(os.getenv('SCRAPER_WORKER_METRICS_TTL', 3600))
+
+celery_app = Celery('scraper', broker=CELERY_BROKER_URL, backend=CELERY_RESULT_BACKEND)
+celery_app.conf.update(
+    task_serializer='json',
+    result_serializer='json',
+    accept_content=['json'],
+    result_expires=3600,
+    task_routes={
+        'scraper.refresh_catalog': {'queue': REFRESH_QUEUE},
+        'scraper.scrape_page': {'queue': PAGE_QUEUE},
+    },
+    # Pages take seconds each: hand them out one at a time so idle workers get their share
+    worker_prefetch_multiplier=1,
+    beat_schedule={
+        'refresh-catalog': {'task': 'scraper.refresh_catalog', 'schedule': REFRESH_INTERVAL},
+    },
+)
+
+
+class QueuedPage:
+    """What a scrape_page task reports about one page: its courses and where pagination goes next"""
+
+    def __init__(self, result: dict):
+        self.courses = [Course(*row) for row in result['courses']]
+        self.total = result['total']
+        self.has_next = result['has_next']
+
+
+class QueueScraper(Scraper):
+    """Scraper that hands every page to scrape_page tasks and merges what they return.
+
+    Pages are fetched and parsed on whichever workers consume the page
+    queue; only the result count and next-page marker of each page come
+    back, which is all the pagination logic of Scraper needs.
+    """
+
+    def __init__(self, page_timeout: float = PAGE_TASK_TIMEOUT):
+        self.logger = logging.getLogger(__name__)
+        self.page_timeout = page_timeout
+        self._fetch_pool = None
+
+    def _fetch_pages(self, provider, urls) -> list:
+        """Scrape pages as one group of tasks, returning (url, QueuedPage or None) pairs"""
+        urls = list(urls)
+        if not urls:
+            return []
+        result = group(scrape_page.s(provider.name, url) for url in urls).apply_async()
+        try:
+            # Runs inside the refresh task, which only waits on tasks of another queue
+            pages = result.get(timeout=self.page_timeout, propagate=False, disable_sync_subtasks=False)
+        except TaskTimeout:
+            self.logger.error(f"{provider.label} pages not scraped within {self.page_timeout}s")
+            pages = [None] * len(urls)
+        finally:
+            result.forget()
+        return [(url, QueuedPage(page) if isinstance(page, dict) else None) for url, page in zip(urls, pages)]
+
+    def _parse_pages(self, provider: str, pages: list) -> list:
+        return [course for _, page in pages if page is not None for course in page.courses]
+
+    def _result_count(self, page):
+        return page.total
+
+    def _has_next_page(self, page) -> bool:
+        return page.has_next
+
+
+_page_scraper = None
+_page_scraper_lock = threading.Lock()
+
+
+def get_page_scraper() -> Scraper:
+    """Return the worker process's scraper, whose connection pools and caches serve every page task"""
+    global _page_scraper
+    if _page_scraper is None:
+        with _page_scraper_lock:
+            if _page_scraper is None:
+                buckets = SharedBuckets.from_url(PAGE_RATE_LIMIT_REDIS_URL)
+                _page_scraper = Scraper(rate_limiter=RateLimiter(buckets=buckets))
+    return _page_scraper
+
+
+@celery_app.task(name='scraper.scrape_page')
+def scrape_page(provider: str, url: str):
+    """Fetch and parse one listing page.
+
+    Returns:
+        dict: The page's courses as Course rows, its result count and whether
+            it links to a next page, or None if it could not be fetched
+    """
+    scraped = get_page_scraper().scrape_page(provider, url)
+    if scraped is None:
+        return None
+    response, courses = scraped
+    return {
+        'courses': [course.to_row() for course in courses],
+        'total': result_count(response.text),
+        'has_next': has_next_page(response.text),
+    }
+
+
+@celery_app.task(name='scraper.refresh_catalog', ignore_result=True)
+def refresh_catalog():
+    """Scrape the due providers through the page queue and publish the catalog, unless a refresh is running"""
+    try:
+        catalog_store.revalidate(lambda: scrape_all_courses(QueueScraper()), background=False)
+    finally:
+        cache.delete(REFRESH_QUEUED_KEY)
+
+
+_metrics_client = None
+
+
+def get_metrics_client():
+    """Return the process's Redis connection for worker metrics"""
+    global _metrics_client
+    if _metrics_client is None:
+        _metrics_client = redis.Redis.from_url(CACHE_CONFIG['CACHE_REDIS_URL'])
+    return _metrics_client
+
+
+@task_postrun.connect
+def publish_worker_metrics(**kwargs):
+    """Write this worker process's metrics to Redis for the web app's /metrics"""
+    state = {'updated': time.time(), 'metrics': metrics.export_state()}
+    try:
+        get_metrics_client().hset(WORKER_METRICS_KEY, f'{socket.gethostname()}:{os.getpid()}', json.dumps(state))
+    except redis.RedisError as e:
+        logger.warning(f"Could not publish worker metrics: {e}")
+
+
+def worker_metric_states() -> list:
+    """Metrics the scrape worker processes published, oldest first, as metrics.render() merges them"""
+    client = get_metrics_client()
+    try:
+        entries = client.hgetall(WORKER_METRICS_KEY)
+    except redis.RedisError as e:
+        logger.warning(f"Could not read worker metrics: {e}")
+        return []
+    states, expired = [], []
+    for process, value in entries.items():
+        state = json.loads(value)
+        if state['updated'] < time.time() - WORKER_METRICS_TTL:
+            # Gone with its worker, or idle for long: its series are dropped
+            expired.append(process)
+        else:
+            states.append(state)
+    if expired:
+        client.hdel(WORKER_METRICS_KEY, *expired)
+    return [state['metrics'] for state in sorted(states, key=lambda state: state['updated'])]
+
+
+def enqueue_refresh(cache) -> bool:
+    """Queue a catalog refresh unless one is already queued.
+
+    Returns:
+        bool: True if this call queued it
+    """
+    if not cache.add(REFRESH_QUEUED_KEY, True, timeout=REFRESH_QUEUED_TIMEOUT):
+        return False
+    try:
+        refresh_catalog.delay()
+    except Exception:
+        logger.exception("Could not queue a catalog refresh")
+        cache.delete(REFRESH_QUEUED_KEY)
+        return False
+    return True
@@ -1,25 +1,53 @@
 import sys
 sys.path.append('src')
 
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-import random
-from flask_caching import Cache
 from flask_apscheduler import APScheduler
 import os
-from course_scaper import Scraper
+from catalog_store import ENCODINGS
+from catalog_index import FILTER_FIELDS
+from course import Course
+import metrics
+from image_cache import DEFAULT_THUMBNAIL_SIZE, IMAGE_MAX_AGE, THUMBNAIL_SIZES, get_image_cache, resolve_image_url
+from scrape_queue import SCRAPE_QUEUE_ENABLED, enqueue_refresh, worker_metric_states
+from stores import CACHE_CONFIG, cache, catalog_store, scrape_all_courses
 # from selenia import UdacityScraper
 import threading
-from concurrent.futures import ThreadPoolExecutor
+import time
 import requests  
 
 app = Flask(__name__)
 CORS(app)
 
-# Cache configuration
-app.config['CACHE_TYPE'] = 'RedisCache'
-app.config['CACHE_REDIS_URL'] = os.getenv('CACHE_REDIS_URL', 'redis://redis:6379/0')
-cache = Cache(app)
+class CourseJSONProvider(DefaultJSONProvider):
+    """jsonify that also serializes Course records, with the keys of their provider"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, Course):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
+
+app.json = CourseJSONProvider(app)
+
+@app.before_request
+def start_request_timer():
+    request.environ['scraper.request_start'] = time.monotonic()
+
+@app.after_request
+def observe_request(response):
+    # Streamed bodies (NDJSON) are timed until the response starts, not until the last chunk
+    start = request.environ.get('scraper.request_start')
+    if start is not None and request.endpoint != 'get_metrics':
+        metrics.REQUEST_SECONDS.observe(time.monotonic() - start, endpoint=request.endpoint or 'unknown',
+                                        method=request.method, status=response.status_code)
+    return response
+
+# Cache configuration; the cache, catalog and provider stores live in stores.py, shared with the scrape workers
+app.config.update(CACHE_CONFIG)
+cache.init_app(app)
 
 # Scheduler configuration
 class Config:
@@ -28,104 +56,263 @@ class Config:
 app.config.from_object(Config)
 scheduler = APScheduler()
 scheduler.init_app(app)
-scheduler.start()
+# Parse pool workers started with 'spawn' re-import this module as __mp_main__
+# when the app is launched as `python src/script.py`; they must not schedule scrapes.
+# With the scrape queue, Celery beat schedules refreshes instead of every web worker
+if __name__ != '__mp_main__' and not SCRAPE_QUEUE_ENABLED:
+    scheduler.start()
+
+def warm_start():
+    """Load the last catalog on disk into an empty cache, e.g. after Redis restarted with the container"""
+    try:
+        catalog_store.restore()
+    except Exception as e:
+        print(f"Warm start skipped: {e}")
+
+if __name__ != '__mp_main__':
+    warm_start()
+
+def refresh_now():
+    """Publish a new catalog and return its version, or None if none was published in time.
+
+    With the scrape queue the refresh runs on a worker and this only waits for it.
+    """
+    if not SCRAPE_QUEUE_ENABLED:
+        return catalog_store.refresh(scrape_all_courses)
+    enqueue_refresh(cache)
+    return catalog_store.wait_for_publish()
+
+def refresh_later():
+    """Refresh a stale catalog in the background, on a worker when the scrape queue is enabled"""
+    if SCRAPE_QUEUE_ENABLED:
+        enqueue_refresh(cache)
+    else:
+        catalog_store.revalidate(scrape_all_courses)
+
+def serving_version():
+    """Version to serve, refreshing the catalog once across all workers when nothing is cached"""
+    version, fresh = catalog_store.current_state()
+    if version is None and catalog_store.restore() is not None:
+        # The cache was flushed: the last snapshot on disk is served, refreshed in the background if stale
+        version, fresh = catalog_store.current_state()
+    if version is None:
+        version = refresh_now()
+    elif not fresh:
+        refresh_later()
+    return version
+
+def refresh_pending():
+    """503 for requests that timed out waiting for the first catalog refresh"""
+    response = jsonify({'error': 'catalog is being refreshed, retry shortly'})
+    response.status_code = 503
+    response.headers['Retry-After'] = '30'
+    return response
+
+def not_modified(etag, vary=None):
+    """Empty 304 response for a client that already holds this catalog version"""
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    if vary:
+        response.headers['Vary'] = vary
+    return response
+
+def courses_delta(since, version):
+    """Changeset from catalog version `since` to the current version"""
+    if since == version:
+        return not_modified(version)
+
+    delta = catalog_store.delta(since, version)
+    if delta is None:
+        # The client's version is no longer stored: send everything and let it start over
+        payload = {'version': version, 'since': since, 'reset': True, 'added': catalog_store.get(version) or [], 'removed': [], 'changed': []}
+    else:
+        payload = {'version': version, 'since': since, 'reset': False, **delta}
+
+    response = jsonify(payload)
+    response.headers['X-Catalog-Version'] = version
+    return response
+
+# Query parameters that switch /api/courses to a paginated, filtered response
+QUERY_PARAMS = ('limit', 'cursor', 'fields') + FILTER_FIELDS
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 500
+
+def courses_page(version):
+    """One page of the catalog, filtered and projected from the snapshot's precomputed indexes"""
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+        cursor_version, _, position = request.args.get('cursor', f'{version}.0').partition('.')
+        position = int(position)
+    except ValueError:
+        return jsonify({'error': 'limit and cursor must be integers'}), 400
+    if limit < 1 or position < 0:
+        return jsonify({'error': 'limit must be positive and cursor non-negative'}), 400
+    if cursor_version != version:
+        return jsonify({'error': 'cursor belongs to an older catalog version, restart without cursor'}), 410
+
+    filters = {field: request.args[field] for field in FILTER_FIELDS if field in request.args}
+    fields = [field for field in request.args.get('fields', '').split(',') if field] or None
+
+    index = catalog_store.get_index(version)
+    if index is None:
+        return jsonify({'error': 'catalog snapshot is no longer available'}), 503
+    page = index.query(filters, cursor=position, limit=limit, fields=fields)
+    next_cursor = page['next_cursor']
+
+    response = jsonify({
+        'version': version,
+        'total': page['total'],
+        'next_cursor': f'{version}.{next_cursor}' if next_cursor is not None else None,
+        'courses': page['courses'],
+    })
+    response.headers['X-Catalog-Version'] = version
+    return response
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+# /api/courses serves JSON or NDJSON by the Accept header
+COURSES_VARY = 'Accept, Accept-Encoding'
+
+def courses_ndjson(version):
+    """Stream the catalog as newline-delimited JSON, one stored chunk at a time"""
+    # Another body than the JSON of the same version, so another ETag
+    etag = f'{version}-ndjson'
+    if request.if_none_match.contains(etag):
+        return not_modified(etag, vary='Accept')
+
+    count = catalog_store.ndjson_chunk_count(version)
+    if count is None:
+        return jsonify({'error': 'catalog snapshot is no longer available'}), 503
+
+    response = app.response_class(stream_with_context(catalog_store.iter_ndjson(version, count)), mimetype=NDJSON_MIMETYPE)
+    response.headers['Vary'] = 'Accept'
+    response.set_etag(etag)
+    response.headers['X-Catalog-Version'] = version
+    return response
+
+@app.route('/api/courses.ndjson', methods=['GET'])
+def get_courses_ndjson():
+    version = serving_version()
+    if version is None:
+        return refresh_pending()
+    return courses_ndjson(version)
+
+# Thumbnails of course images, fetched once and served from the local image cache
+@app.route('/api/images/<course_id>', methods=['GET'])
+def get_course_image(course_id):
+    size = request.args.get('size', DEFAULT_THUMBNAIL_SIZE)
+    if size not in THUMBNAIL_SIZES:
+        return jsonify({'error': f"size must be one of {', '.join(THUMBNAIL_SIZES)}"}), 400
+
+    # Images never trigger a scrape; they are only served for a published catalog
+    version = catalog_store.current_version()
+    if version is None:
+        return refresh_pending()
+    index = catalog_store.get_index(version)
+    course = index.course(course_id) if index is not None else None
+    if course is None:
+        return jsonify({'error': 'unknown course'}), 404
+    url = resolve_image_url(course.get('image'))
+    if url is None:
+        return jsonify({'error': 'course has no image'}), 404
+
+    image = get_image_cache().get(url, size)
+    if image is None:
+        return jsonify({'error': 'course image could not be fetched'}), 502
+    response = send_file(image.path, mimetype=image.mimetype, etag=image.etag, max_age=IMAGE_MAX_AGE, conditional=True)
+    response.cache_control.public = True
+    return response
 
 # API endpoint to return all courses with caching
 @app.route('/api/courses', methods=['GET'])
 def get_courses():
-    # Generate a cache key based on relevant parameters
-    cache_key = 'courses_data'
-    
-    # Try to get data from cache first
-    cached_data = cache.get(cache_key)
-    if cached_data is not None:
-        return jsonify(cached_data)
-    
-    # If not in cache, fetch and store the data
-    scraper = Scraper()
-    # udacity_scraper = UdacityScraper()
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        coursera_future = executor.submit(scraper.scrape_coursera)
-        harvard_future = executor.submit(scraper.scrape_harvard_courses)
-        # udacity_future = executor.submit(scraper.scrape_udacity_courses)
-        udemy_future = executor.submit(scraper.scrape_udemy_courses)
-        life_future = executor.submit(scraper.scrape_Life_courses)
-        who_future = executor.submit(scraper.scrape_who_courses)
-        
-        coursera_courses = coursera_future.result()
-        harvard_courses = harvard_future.result()
-        # udacity_courses = udacity_future.result()
-        udemy_courses = udemy_future.result()
-        life_courses = life_future.result()
-        who_courses = who_future.result()
-        
-        # print(f"Coursera courses: {len(coursera_courses)}")
-        # print(f"Harvard courses: {len(harvard_courses)}")
-        # print(f"Udacity courses: {len(udacity_courses)}")
-        # print(f"Udemy courses: {len(udemy_courses)}")
-        print(f"Life courses: {len(life_courses)}")
-        print(f"WHO courses: {len(who_courses)}")
-        
-        # Concatenate all fetched courses
+    # Current catalog version from cache, or a single shared refresh if not cached
+    version = serving_version()
+    if version is None:
+        return refresh_pending()
 
-        # print(f"Coursera courses: {len(coursera_courses)}")
-        # print(f"Harvard courses: {len(harvard_courses)}")
-        # print(f"Udemy courses: {len(udemy_courses)}")
-        
-        all_courses = coursera_courses + harvard_courses + udemy_courses + life_courses + who_courses
-        # print(f"All courses: {len(all_courses)}")
-        random.shuffle(all_courses)
-        
-        # Store in cache for 24 hours
-        cache.set(cache_key, all_courses, timeout=86400)
-        
-        return jsonify(all_courses)
+    since = request.args.get('since')
+    if since:
+        return courses_delta(since, version)
+
+    if any(param in request.args for param in QUERY_PARAMS):
+        return courses_page(version)
+
+    if request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+        return courses_ndjson(version)
+
+    if request.if_none_match.contains(version):
+        return not_modified(version, vary=COURSES_VARY)
+
+    # Stream the JSON serialized and compressed at publish time
+    encoding = next(enc for enc in ENCODINGS if enc == 'identity' or request.accept_encodings[enc] > 0)
+    body = catalog_store.get_blob(version, encoding)
+    if body is None:
+        # The snapshot behind the version pointer has expired
+        version = refresh_now()
+        if version is None:
+            return refresh_pending()
+        body = catalog_store.get_blob(version, encoding)
+    response = app.response_class(body, mimetype='application/json')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = COURSES_VARY
+    response.set_etag(version)
+    response.headers['X-Catalog-Version'] = version
+    return response
+
+@app.route('/api/courses/search', methods=['GET'])
+def search_courses():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'q is required'}), 400
+    try:
+        limit = min(int(request.args.get('limit', DEFAULT_PAGE_SIZE)), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+
+    version = serving_version()
+    if version is None:
+        return refresh_pending()
+
+    found = catalog_store.search(version, query, limit)
+    if found is None:
+        return jsonify({'error': 'catalog snapshot is no longer available'}), 503
+    # Right after a refresh, results can come from the previous version until it is indexed
+    version, results = found
+
+    response = jsonify({
+        'version': version,
+        'query': query,
+        'courses': [dict(course, score=round(score, 4)) for score, course in results],
+    })
+    response.headers['X-Catalog-Version'] = version
+    return response
 
 def run_background_scraping():
     def background_scrape():
-        scraper = Scraper()
-        # udemy_scraper = UdemyCourseScraper(logger=scraper.logger)
-        # udacity_scraper = UdacityScraper()
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            coursera_future = executor.submit(scraper.scrape_coursera)
-            harvard_future = executor.submit(scraper.scrape_harvard_courses)
-            # udacity_future = executor.submit(scraper.scrape_udacity_courses)
-            udemy_future = executor.submit(scraper.scrape_udemy_courses)
-            life_future = executor.submit(scraper.scrape_Life_courses)
-            who_future = executor.submit(scraper.scrape_who_courses)
-            
-            coursera_courses = coursera_future.result()
-            harvard_courses = harvard_future.result()
-            # udacity_courses = udacity_future.result()
-            udemy_courses = udemy_future.result()
-            life_courses = life_future.result()
-            who_courses = who_future.result()
-            
-            # print(f"Coursera courses: {len(coursera_courses)}")
-            # print(f"Harvard courses: {len(harvard_courses)}")
-            # print(f"Udacity courses: {len(udacity_courses)}")
-            # print(f"Udemy courses: {len(udemy_courses)}")
-            print(f"Life courses: {len(life_courses)}")
-            print(f"WHO courses: {len(who_courses)}")
-            
-            # Concatenate all fetched courses
-            
-            all_courses = coursera_courses + harvard_courses + udemy_courses + life_courses + who_courses
-            random.shuffle(all_courses)
-            
-            # Update the cache with new data
-            cache.set('courses_data', all_courses, timeout=86400)
+        # Update the cache with new data, unless a request-triggered refresh is already running
+        catalog_store.refresh(scrape_all_courses, wait=False)
     
     thread = threading.Thread(target=background_scrape)
     thread.daemon = True  # Make thread daemon so it exits when main program exits
     thread.start()
 
+# Prometheus scrape target; metrics are per process, so each worker reports its own.
+# With the scrape queue, scraping and refresh metrics come from the Celery workers
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    states = worker_metric_states() if SCRAPE_QUEUE_ENABLED else ()
+    return app.response_class(metrics.render(states), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/api/clear_cache', methods=['GET'])
 def clear_cache():
     cache.clear()
     return jsonify({'message': 'Cache cleared'})
 
-@scheduler.task('interval', id='scheduled_scraping', hours=24)
+# Minutes between checks for providers whose TTL has passed
+PROVIDER_CHECK_MINUTES = int(os.getenv('PROVIDER_CHECK_MINUTES', 60))
+
+@scheduler.task('interval', id='scheduled_scraping', minutes=PROVIDER_CHECK_MINUTES)
 def scheduled_task():
     run_background_scraping()
 
@@ -0,0 +1,307 @@
+import heapq
+import math
+import re
+from bisect import bisect_left
+
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Searched course fields and how much a term occurrence in each counts
+FIELD_WEIGHTS = {'title': 3.0, 'category': 1.5, 'provider': 1.0, 'detail': 1.0}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# A prefix never expands to more than this many indexed terms
+MAX_PREFIX_EXPANSIONS = 50
+# Score multiplier for terms matched by prefix rather than exactly
+PREFIX_MATCH_WEIGHT = 0.7
+# Term lookups a multi-token query spends walking postings before it scores
+# the courses matching every token directly instead
+WALK_BUDGET = 2000
+# Multi-token queries expected to match at most this many courses score them all directly
+DIRECT_SCORING_MATCHES = 1500
+
+
+def tokenize(text) -> list:
+    """Lowercase alphanumeric tokens of text"""
+    if not text or text == 'N/A':
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+
+class SearchIndex:
+    """In-memory inverted index over the course catalog with BM25 ranking.
+
+    Every indexed course keeps its weighted term frequencies, so a new
+    catalog is applied incrementally: only added, removed or changed courses
+    are (re)tokenized. Query tokens match indexed terms exactly or, for the
+    last token, as a prefix, which supports search-as-you-type.
+
+    BM25 scores of every term are computed by `update`, together with the
+    term's postings in descending score order, so queries only read them.
+    Single-token queries read the top of those lists; multi-token queries walk
+    the lists of their rarest token best first and stop as soon as no
+    remaining course can make the top results, or score the courses matching
+    every token directly when too few of the walked ones do.
+    """
+
+    def __init__(self):
+        self.courses = {}
+        # course id -> (document length, {term: weighted frequency})
+        self.documents = {}
+        # term -> {course id: weighted frequency}
+        self.postings = {}
+        self.total_length = 0.0
+        self._terms = []
+        # term -> {course id: BM25 score} and term -> [(score, course id)] best first
+        self._scores = {}
+        self._ranked = {}
+
+    def __len__(self):
+        return len(self.documents)
+
+    def copy(self) -> 'SearchIndex':
+        """Index sharing nothing that `update` changes with this one, so queries can keep using it meanwhile"""
+        index = SearchIndex()
+        index.courses = dict(self.courses)
+        index.documents = dict(self.documents)
+        index.postings = {term: dict(postings) for term, postings in self.postings.items()}
+        index.total_length = self.total_length
+        index._terms = self._terms
+        index._scores = self._scores
+        index._ranked = self._ranked
+        return index
+
+    def _add(self, course: dict):
+        frequencies = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(course.get(field)):
+                frequencies[term] = frequencies.get(term, 0.0) + weight
+        length = sum(frequencies.values())
+
+        course_id = course['id']
+        self.courses[course_id] = course
+        self.documents[course_id] = (length, frequencies)
+        self.total_length += length
+        for term, frequency in frequencies.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+            postings[course_id] = frequency
+
+    def _remove(self, course_id: str):
+        length, frequencies = self.documents.pop(course_id)
+        del self.courses[course_id]
+        self.total_length -= length
+        for term in frequencies:
+            postings = self.postings[term]
+            del postings[course_id]
+            if not postings:
+                del self.postings[term]
+
+    def _rank(self):
+        """Compute the BM25 scores and ranked postings of every term"""
+        count = len(self.documents)
+        average_length = self.total_length / count if count else 0.0
+        # Per-course part of the BM25 denominator
+        norms = {course_id: K1 * (1 - B + B * length / average_length)
+                 for course_id, (length, _) in self.documents.items()}
+        scores_by_term = {}
+        ranked_by_term = {}
+        for term, postings in self.postings.items():
+            factor = (K1 + 1) * math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            scores = {course_id: factor * frequency / (frequency + norms[course_id])
+                      for course_id, frequency in postings.items()}
+            scores_by_term[term] = scores
+            ranked_by_term[term] = sorted(zip(scores.values(), scores), reverse=True)
+        self._terms = sorted(self.postings)
+        self._scores = scores_by_term
+        self._ranked = ranked_by_term
+
+    def update(self, courses) -> dict:
+        """Bring the index in line with a new catalog, touching only courses that differ.
+
+        Document count and average length change with any course, and with
+        them every BM25 score, so all terms are ranked again here rather than
+        by the first queries after the update.
+
+        Returns:
+            dict: Number of courses added, removed and changed
+        """
+        incoming = {course['id']: course for course in courses}
+        removed = [course_id for course_id in self.courses if course_id not in incoming]
+        changed = [
+            course_id for course_id, course in incoming.items()
+            if course_id in self.courses and self.courses[course_id] != course
+        ]
+        added = [course_id for course_id in incoming if course_id not in self.courses]
+
+        for course_id in removed + changed:
+            self._remove(course_id)
+        for course_id in changed + added:
+            self._add(incoming[course_id])
+        if removed or changed or added:
+            self._rank()
+        return {'added': len(added), 'removed': len(removed), 'changed': len(changed)}
+
+    def _expand(self, token: str, prefix: bool) -> list:
+        """Indexed terms a query token matches, with their match weight"""
+        matches = [(token, 1.0)] if token in self.postings else []
+        if prefix:
+            start = bisect_left(self._terms, token)
+            for term in self._terms[start:start + MAX_PREFIX_EXPANSIONS + 1]:
+                if not term.startswith(token):
+                    break
+                if term != token:
+                    matches.append((term, PREFIX_MATCH_WEIGHT))
+        return matches
+
+    def _best(self, matches: list) -> float:
+        """Highest score any course gets for a query token"""
+        return max(self._ranked[term][0][0] * match_weight for term, match_weight in matches)
+
+    def _weighted_ranked(self, term: str, match_weight: float):
+        for score, course_id in self._ranked[term]:
+            yield score * match_weight, course_id
+
+    def _token_ranked(self, matches: list):
+        """(score, course id) pairs of a query token, best first"""
+        if len(matches) == 1:
+            term, match_weight = matches[0]
+            return iter(self._ranked[term]) if match_weight == 1.0 else self._weighted_ranked(term, match_weight)
+        return heapq.merge(*[self._weighted_ranked(term, match_weight) for term, match_weight in matches], reverse=True)
+
+    def _top_single(self, matches: list, limit: int) -> dict:
+        """Top courses for a single query token, read from the head of its terms' ranked lists"""
+        scores = {}
+        # Scores of distinct courses; a course improved by a later term keeps its
+        # first score here, which only makes the cut-off more conservative
+        top = []
+        for best, term, match_weight in sorted(
+                ((self._ranked[term][0][0] * match_weight, term, match_weight) for term, match_weight in matches),
+                reverse=True):
+            if len(top) == limit and best <= top[0]:
+                break
+            for score, course_id in self._ranked[term][:limit]:
+                score *= match_weight
+                if len(top) == limit and score <= top[0]:
+                    break
+                if course_id not in scores:
+                    if len(top) < limit:
+                        heapq.heappush(top, score)
+                    else:
+                        heapq.heapreplace(top, score)
+                    scores[course_id] = score
+                elif score > scores[course_id]:
+                    scores[course_id] = score
+        return scores
+
+    def _walk(self, driver: list, others: list, limit: int):
+        """Top courses matching every token, walking the driver token's postings best first.
+
+        Returns:
+            dict: Course id mapped to its total score, or None if WALK_BUDGET
+            term lookups were spent without settling the top results
+        """
+        others_bound = sum(self._best(matches) for matches in others)
+        # Each other token as its terms' (scores, match weight) pairs
+        lookups = [[(self._scores[term], match_weight) for term, match_weight in matches] for matches in others]
+        # Every walked course is looked up in each term of the other tokens
+        cost = sum(len(matches) for matches in others)
+        budget = max(WALK_BUDGET, limit * cost)
+
+        scores = {}
+        top = []
+        for driver_score, course_id in self._token_ranked(driver):
+            if len(top) == limit and driver_score + others_bound <= top[0]:
+                return scores
+            budget -= cost
+            if budget < 0:
+                return None
+            if course_id in scores:
+                continue
+            total = driver_score
+            for token_lookups in lookups:
+                best = 0.0
+                for term_scores, match_weight in token_lookups:
+                    score = term_scores.get(course_id)
+                    if score is not None and score * match_weight > best:
+                        best = score * match_weight
+                if not best:
+                    break
+                total += best
+            else:
+                scores[course_id] = total
+                if len(top) < limit:
+                    heapq.heappush(top, total)
+                elif total > top[0]:
+                    heapq.heapreplace(top, total)
+        return scores
+
+    def _score_matching(self, token_matches: list) -> dict:
+        """Total score of every course matching all tokens, given smallest token first.
+
+        Exact single-term tokens go first; the scores of the first stand in
+        for the totals so far, so only courses it shares with the other
+        tokens are ever visited.
+        """
+        totals = None
+        for matches in sorted(token_matches, key=lambda matches: len(matches) > 1 or matches[0][1] != 1.0):
+            if totals is None and len(matches) == 1 and matches[0][1] == 1.0:
+                totals = self._scores[matches[0][0]]
+                continue
+            best = {}
+            for term, match_weight in matches:
+                scores = self._scores[term]
+                for course_id in scores.keys() if totals is None else totals.keys() & scores.keys():
+                    score = scores[course_id] * match_weight
+                    if score > best.get(course_id, 0.0):
+                        best[course_id] = score
+            totals = best if totals is None else {course_id: totals[course_id] + score for course_id, score in best.items()}
+            if not totals:
+                break
+        return totals
+
+    def search(self, query: str, limit: int = 20) -> list:
+        """Rank courses against query with BM25.
+
+        Every query token must match (exactly, or by prefix for the last one).
+
+        Returns:
+            list: (score, course) pairs, best first
+        """
+        tokens = tokenize(query)
+        if not tokens or not self.documents:
+            return []
+
+        token_matches = [self._expand(token, prefix=position == len(tokens) - 1) for position, token in enumerate(tokens)]
+        if not all(token_matches):
+            return []
+
+        if len(token_matches) == 1:
+            # The overall top results are among the top results of each matched term
+            scores = self._top_single(token_matches[0], limit)
+        else:
+            # Only courses containing the rarest token can match every token.
+            # When few are expected to match them all, those are found with set
+            # intersections and scored directly. Otherwise the rarest token's
+            # postings are walked best first, and the walk stops once even the
+            # best possible score of the rest cannot reach the top results; if
+            # too few walked courses match the rest, it gives up and the
+            # matching courses are scored directly after all.
+            sizes = sorted((sum(len(self.postings[term]) for term, _ in matches), position)
+                           for position, matches in enumerate(token_matches))
+            token_matches = [token_matches[position] for _, position in sizes]
+            expected = len(self.documents)
+            for size, _ in sizes:
+                expected *= size / len(self.documents)
+            scores = None
+            if expected > DIRECT_SCORING_MATCHES:
+                scores = self._walk(token_matches[0], token_matches[1:], limit)
+            if scores is None:
+                scores = self._score_matching(token_matches)
+
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(score, self.courses[course_id]) for course_id, score in best]
@@ -0,0 +1,105 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import closing
+
+from http_cache import CACHE_DIR
+
+
+# SQLite file every published catalog is also written to; set SCRAPER_SNAPSHOT_DB_ENABLED=0 to keep Redis only
+SNAPSHOT_DB_PATH = os.getenv('SCRAPER_SNAPSHOT_DB', os.path.join(CACHE_DIR, 'snapshots.sqlite3'))
+SNAPSHOT_DB_ENABLED = os.getenv('SCRAPER_SNAPSHOT_DB_ENABLED', '1') == '1'
+# Number of past snapshots kept on disk
+SNAPSHOT_HISTORY = int(os.getenv('SCRAPER_SNAPSHOT_HISTORY', 30))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    version TEXT PRIMARY KEY,
+    published_at REAL NOT NULL,
+    course_count INTEGER NOT NULL,
+    courses BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_published_at ON snapshots (published_at);
+CREATE TABLE IF NOT EXISTS snapshot_blobs (
+    version TEXT NOT NULL,
+    encoding TEXT NOT NULL,
+    body BLOB NOT NULL,
+    PRIMARY KEY (version, encoding)
+);
+"""
+
+
+class SnapshotDB:
+    """Durable history of published catalogs in a local SQLite file.
+
+    Each snapshot is stored as the binary course encoding CatalogStore keeps
+    in the cache, so restoring one is a single row read with no decoding.
+    The pre-encoded response bodies are kept for the newest snapshot only,
+    which is the one restored after Redis was flushed or restarted.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_DB_PATH, history: int = SNAPSHOT_HISTORY):
+        self.path = path
+        self.history = max(1, history)
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing(self._connect()) as connection:
+            # WAL lets workers read the last snapshot while another one writes a new one
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def save(self, version: str, courses: bytes, course_count: int, blobs: dict = None):
+        """Store a snapshot (encoded with encode_courses) and its response bodies, then drop old history"""
+        with closing(self._connect()) as connection, connection:
+            connection.execute(
+                'INSERT OR REPLACE INTO snapshots (version, published_at, course_count, courses) VALUES (?, ?, ?, ?)',
+                (version, time.time(), course_count, courses))
+            connection.execute('DELETE FROM snapshot_blobs WHERE version != ?', (version,))
+            connection.executemany(
+                'INSERT OR REPLACE INTO snapshot_blobs (version, encoding, body) VALUES (?, ?, ?)',
+                [(version, encoding, body) for encoding, body in (blobs or {}).items()])
+            connection.execute(
+                'DELETE FROM snapshots WHERE version NOT IN '
+                '(SELECT version FROM snapshots ORDER BY published_at DESC LIMIT ?)', (self.history,))
+
+    def touch(self, version: str) -> bool:
+        """Mark a stored snapshot as published now, returning False if it is not stored"""
+        with closing(self._connect()) as connection, connection:
+            cursor = connection.execute('UPDATE snapshots SET published_at = ? WHERE version = ?', (time.time(), version))
+        return cursor.rowcount > 0
+
+    def latest(self):
+        """The newest snapshot as {'version', 'published_at', 'courses', 'blobs'}, or None"""
+        with closing(self._connect()) as connection:
+            row = connection.execute(
+                'SELECT version, published_at, courses FROM snapshots ORDER BY published_at DESC LIMIT 1').fetchone()
+            if row is None:
+                return None
+            blobs = dict(connection.execute(
+                'SELECT encoding, body FROM snapshot_blobs WHERE version = ?', (row[0],)).fetchall())
+        return {'version': row[0], 'published_at': row[1], 'courses': row[2], 'blobs': blobs}
+
+    def courses(self, version: str):
+        """Encoded courses of a stored snapshot, or None"""
+        with closing(self._connect()) as connection:
+            row = connection.execute('SELECT courses FROM snapshots WHERE version = ?', (version,)).fetchone()
+        return row[0] if row is not None else None
+
+
+_snapshot_db = None
+_snapshot_db_lock = threading.Lock()
+
+
+def get_snapshot_db():
+    """Return the process-wide snapshot database, or None when disabled"""
+    global _snapshot_db
+    if SNAPSHOT_DB_ENABLED and _snapshot_db is None:
+        with _snapshot_db_lock:
+            if _snapshot_db is None:
+                _snapshot_db = SnapshotDB()
+    return _snapshot_db
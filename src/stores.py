@@ -0,0 +1,75 @@
+import os
+import random
+
+from flask import Flask
+from flask_caching import Cache
+
+import metrics
+from async_scraper import AsyncScraper
+from catalog_store import CatalogStore
+from course_scaper import Scraper
+from dedup import DEDUP_ENABLED, dedupe_courses
+from provider_store import ProviderStore, PROVIDER_DEADLINE
+from snapshot_db import get_snapshot_db
+
+
+# The cache, stores and scrape of the catalog, shared by the web app and the
+# Celery workers without either importing the other's process setup
+
+CACHE_CONFIG = {
+    'CACHE_TYPE': 'RedisCache',
+    'CACHE_REDIS_URL': os.getenv('CACHE_REDIS_URL', 'redis://redis:6379/0'),
+}
+# Bound to an app of its own so workers can use it outside any request;
+# the web app binds it to its own app as well
+cache = Cache(Flask(__name__), config=CACHE_CONFIG)
+
+# Scraping engine: 'threads' runs providers on a bounded thread pool sharing one pool of
+# fetch threads, 'async' runs every provider as a coroutine on a single event loop
+SCRAPER_ENGINE = os.getenv('SCRAPER_ENGINE', 'threads')
+
+# Seconds a request waits for a refresh running elsewhere when there is no snapshot to serve
+REFRESH_WAIT_TIMEOUT = float(os.getenv('REFRESH_WAIT_TIMEOUT', 120))
+# After the soft TTL the catalog is served stale while it is refreshed in the background;
+# only after the hard TTL does a request have to wait for a scrape
+CATALOG_SOFT_TTL = int(os.getenv('CATALOG_SOFT_TTL', 86400))
+CATALOG_HARD_TTL = int(os.getenv('CATALOG_HARD_TTL', 7 * 86400))
+
+# Every provider's last good courses, cached and refreshed on their own TTL
+provider_store = ProviderStore(cache)
+
+# Every published catalog is also kept on disk, so an empty cache is refilled without scraping
+catalog_store = CatalogStore(cache, timeout=CATALOG_HARD_TTL, soft_timeout=CATALOG_SOFT_TTL,
+                             wait_timeout=REFRESH_WAIT_TIMEOUT, snapshot_db=get_snapshot_db())
+
+
+def scrape_providers(providers, deadline=PROVIDER_DEADLINE, scraper=None):
+    """Scrape the given providers, with the configured engine unless a scraper is given.
+
+    Returns:
+        dict: Provider name mapped to its courses, or None if it failed or missed the deadline
+    """
+    if scraper is None:
+        scraper = AsyncScraper() if SCRAPER_ENGINE == 'async' else Scraper()
+    return scraper.run(providers, deadline)
+
+
+def scrape_all_courses(scraper=None):
+    """Scrape the providers that are due and return the shuffled catalog assembled from every provider"""
+    due = provider_store.due()
+    with metrics.REFRESH_STAGE_SECONDS.time(stage='scrape'):
+        results = scrape_providers(due, scraper=scraper) if due else {}
+    with metrics.REFRESH_STAGE_SECONDS.time(stage='assemble'):
+        parts = provider_store.assemble(results)
+
+    print(f"Scraped {', '.join(due) or 'no providers'}; "
+          + ', '.join(f"{name}: {len(courses)}" for name, courses in parts.items()))
+
+    # Concatenate all provider courses, the same course scraped twice only once
+    if DEDUP_ENABLED:
+        with metrics.REFRESH_STAGE_SECONDS.time(stage='dedup'):
+            all_courses = dedupe_courses(parts)
+    else:
+        all_courses = [course for courses in parts.values() for course in courses]
+    random.shuffle(all_courses)
+    return all_courses
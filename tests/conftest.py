@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The app modules are flat files in src/, imported by name as script.py does
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+# The benchmarks' stand-in provider server doubles as a local host to fetch from
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks'))
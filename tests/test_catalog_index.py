@@ -0,0 +1,27 @@
+"""provider= filters match courses by their registry source as well as their provider field."""
+import pytest
+
+from catalog_index import CatalogIndex
+from course import decode_courses, encode_courses
+from providers import get_provider
+from test_parser_backends import PAGES, REFERENCE, read_fixture
+
+
+@pytest.fixture
+def courses():
+    return [course for page, name in PAGES.items()
+            for course in get_provider(name).extract(read_fixture(page), REFERENCE)]
+
+
+@pytest.mark.parametrize('name', sorted(set(PAGES.values())))
+def test_provider_filter_matches_source(courses, name):
+    expected = [course.id for course in courses if course.source == name]
+    assert expected
+    result = CatalogIndex(courses).query({'provider': name}, limit=len(courses))
+    assert [course.id for course in result['courses']] == expected
+
+
+def test_source_survives_snapshot(courses):
+    decoded = decode_courses(encode_courses(courses))
+    assert [course.source for course in decoded] == [course.source for course in courses]
+    assert 'source' not in decoded[0].to_dict()
@@ -0,0 +1,27 @@
+"""Image URLs come from scraped pages and must never reach internal hosts."""
+import pytest
+
+from image_cache import ImageCache
+
+
+@pytest.mark.parametrize('url', [
+    'http://127.0.0.1/image.png',
+    'http://localhost:8080/image.png',
+    'http://169.254.169.254/latest/meta-data/',
+    'http://10.0.0.8/image.png',
+    'http://192.168.1.1/image.png',
+    'http://[::1]/image.png',
+    'http://[::ffff:127.0.0.1]/image.png',
+    'file:///etc/passwd',
+])
+def test_refuses_non_public_targets(tmp_path, url):
+    cache = ImageCache(str(tmp_path))
+    with pytest.raises(ValueError):
+        cache._check_target(url)
+    assert cache.get(url) is None
+
+
+def test_lock_table_is_bounded(tmp_path):
+    cache = ImageCache(str(tmp_path))
+    locks = {id(cache._lock(f'https://images.example.org/{i}.png')) for i in range(1000)}
+    assert len(locks) <= len(cache._locks)
@@ -0,0 +1,24 @@
+"""Metrics exported by worker processes merge into the web app's /metrics."""
+import json
+
+import metrics
+
+
+def test_render_merges_exported_states():
+    counter = metrics.Counter('test_merge_requests', 'Requests', ('host',))
+    gauge = metrics.Gauge('test_merge_courses', 'Courses')
+    histogram = metrics.Histogram('test_merge_seconds', 'Seconds', buckets=(1.0,))
+    counter.inc(host='example.org')
+    gauge.set(3)
+    histogram.observe(0.5)
+    # Two other processes, through the JSON they are stored as
+    older = json.loads(json.dumps(metrics.export_state()))
+    gauge.set(7)
+    newer = json.loads(json.dumps(metrics.export_state()))
+    gauge.set(1)
+
+    lines = metrics.render([older, newer]).splitlines()
+    assert 'test_merge_requests_total{host="example.org"} 3' in lines
+    assert 'test_merge_courses 7' in lines
+    assert 'test_merge_seconds_bucket{le="1.0"} 3' in lines
+    assert 'test_merge_seconds_count 3' in lines
@@ -0,0 +1,54 @@
+"""Every parser backend must extract the same courses from saved provider pages."""
+import os
+
+import pytest
+
+from parser_backends import BACKENDS, get_backend
+from providers import get_provider
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+REFERENCE = 'html.parser'
+
+# Saved listing page -> provider whose extractor reads it
+PAGES = {
+    'coursera.html': 'coursera',
+    'coursera_next_page.html': 'coursera',
+    'harvard.html': 'harvard',
+    'life.html': 'life',
+    'who.html': 'who',
+    'udemy.html': 'udemy',
+}
+
+
+def read_fixture(name: str) -> str:
+    with open(os.path.join(FIXTURES_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def extract(page: str, backend: str) -> list:
+    content = read_fixture(page)
+    return [course.to_dict() for course in get_provider(PAGES[page]).extract(content, backend)]
+
+
+@pytest.fixture(params=list(BACKENDS))
+def backend(request):
+    try:
+        get_backend(request.param)
+    except ImportError as e:
+        pytest.skip(f"{request.param} is not installed: {e}")
+    return request.param
+
+
+@pytest.mark.parametrize('page', PAGES)
+def test_reference_extracts_courses(page):
+    courses = extract(page, REFERENCE)
+    assert courses
+    assert all(course['title'] not in ('', 'N/A') for course in courses)
+    assert len({course['id'] for course in courses}) == len(courses)
+
+
+@pytest.mark.parametrize('page', PAGES)
+def test_backend_matches_reference(page, backend):
+    # Ids are derived from the course content, so they must match as well
+    assert extract(page, backend) == extract(page, REFERENCE)
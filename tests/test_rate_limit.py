@@ -0,0 +1,45 @@
+"""Token buckets shared through Redis hold the host rate across processes."""
+import time
+
+import pytest
+
+from rate_limit import RateLimiter, SharedBuckets
+
+fakeredis = pytest.importorskip('fakeredis')
+pytest.importorskip('lupa')
+
+
+def test_shared_bucket_limits_every_limiter():
+    server = fakeredis.FakeServer()
+    # Two worker processes, each with its own limiters and redis connection
+    limiters = [RateLimiter(rate=10, burst=2, buckets=SharedBuckets(fakeredis.FakeRedis(server=server)))
+                for _ in range(2)]
+    start = time.monotonic()
+    for _ in range(6):
+        for limiter in limiters:
+            host = limiter.host('https://www.example.org/page')
+            host.acquire()
+            host.release(0.01, 200)
+    # 12 requests at 10/s after a burst of 2 take about a second, not half of it
+    assert time.monotonic() - start >= 0.9
+
+
+def test_pause_is_shared():
+    server = fakeredis.FakeServer()
+    first, second = (RateLimiter(rate=100, burst=10, buckets=SharedBuckets(fakeredis.FakeRedis(server=server)))
+                     for _ in range(2))
+    first.host('https://www.example.org/').pause(0.5)
+    start = time.monotonic()
+    host = second.host('https://www.example.org/other')
+    host.acquire()
+    host.release(0.01, 200)
+    assert time.monotonic() - start >= 0.4
+
+
+def test_unreachable_redis_paces_locally():
+    server = fakeredis.FakeServer()
+    server.connected = False
+    buckets = SharedBuckets(fakeredis.FakeRedis(server=server))
+    host = RateLimiter(rate=100, burst=5, buckets=buckets).host('https://www.example.org/')
+    host.acquire()
+    host.release(0.01, 200)
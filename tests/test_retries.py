@@ -0,0 +1,76 @@
+"""Both scraping engines retry what a provider asks them to, and nothing else."""
+import asyncio
+import time
+from email.utils import formatdate
+
+import aiohttp
+import pytest
+
+from async_scraper import AsyncScraper
+from course_scaper import Scraper
+from http_session import build_session
+from rate_limit import RateLimiter, RetryPolicy
+from stand_in_server import StandInServer
+
+# With this seed and an error rate of 0.5 the stand-in fails the first request and serves the second
+FAIL_ONCE = {'error_rate': 0.5, 'seed': 1}
+
+
+def fetch(engine: str, url: str, rate_limiter: RateLimiter):
+    retry_policy = RetryPolicy(max_attempts=3, base_delay=0.01)
+    if engine == 'threads':
+        scraper = Scraper(session=build_session(), response_cache=False, page_store=False,
+                          rate_limiter=rate_limiter, retry_policy=retry_policy)
+        return scraper._make_request(url)
+
+    async def fetch_async():
+        scraper = AsyncScraper(response_cache=False, page_store=False, rate_limiter=rate_limiter,
+                               retry_policy=retry_policy)
+        scraper._semaphore = asyncio.Semaphore(1)
+        async with aiohttp.ClientSession() as session:
+            scraper.session = session
+            return await scraper._make_request(url)
+    return asyncio.run(fetch_async())
+
+
+@pytest.fixture(params=['threads', 'async'])
+def engine(request):
+    return request.param
+
+
+def test_server_error_is_retried(engine):
+    with StandInServer(error_status=503, **FAIL_ONCE) as server:
+        response = fetch(engine, server.url, RateLimiter())
+    assert response is not None and response.status_code == 200
+    assert server.statuses == {503: 1, 200: 1}
+
+
+def test_retry_after_date_is_honoured(engine):
+    with StandInServer(error_status=503, error_retry_after=formatdate(time.time() + 2, usegmt=True),
+                       **FAIL_ONCE) as server:
+        start = time.monotonic()
+        response = fetch(engine, server.url, RateLimiter())
+        elapsed = time.monotonic() - start
+    assert response is not None
+    assert server.statuses == {503: 1, 200: 1}
+    # The date has whole seconds, so it asks for a wait of more than one second
+    assert 1.0 <= elapsed < 5
+
+
+def test_throttling_pauses_host(engine):
+    rate_limiter = RateLimiter()
+    with StandInServer(error_status=429, error_retry_after=1, **FAIL_ONCE) as server:
+        start = time.monotonic()
+        response = fetch(engine, server.url, rate_limiter)
+        limiter = rate_limiter.host(server.url)
+    assert response is not None
+    assert server.statuses == {429: 1, 200: 1}
+    assert limiter.paused_until >= start + 1
+    assert limiter.rate < limiter.max_rate
+
+
+def test_not_found_is_not_retried(engine):
+    with StandInServer(error_rate=1.0, error_status=404) as server:
+        response = fetch(engine, server.url, RateLimiter())
+    assert response is None
+    assert server.statuses == {404: 1}
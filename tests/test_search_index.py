@@ -0,0 +1,87 @@
+"""Every query path of the search index ranks exactly like a brute-force BM25 scan."""
+import math
+import random
+
+import pytest
+
+import search_index
+from search_index import B, K1, SearchIndex, tokenize
+
+WORDS = ('python data science machine learning health care web design finance '
+         'calculus algebra ethics energy robotics kalo kamiren torvix belcor dusef').split()
+
+
+def synthetic_courses(size: int, seed: int = 3) -> list:
+    rng = random.Random(seed)
+    return [{
+        'id': f'course-{i}',
+        'title': ' '.join(rng.choices(WORDS, k=rng.randint(2, 5))),
+        'detail': ' '.join(rng.choices(WORDS, k=rng.randint(5, 15))),
+        'category': rng.choice(WORDS),
+        'provider': 'Provider',
+    } for i in range(size)]
+
+
+def brute_force(index: SearchIndex, query: str, limit: int) -> list:
+    tokens = tokenize(query)
+    count = len(index.documents)
+    average_length = index.total_length / count
+    totals = []
+    for length, frequencies in index.documents.values():
+        total = 0.0
+        for position, token in enumerate(tokens):
+            best = 0.0
+            for term, match_weight in index._expand(token, prefix=position == len(tokens) - 1):
+                frequency = frequencies.get(term)
+                if frequency:
+                    postings = len(index.postings[term])
+                    idf = math.log(1 + (count - postings + 0.5) / (postings + 0.5))
+                    best = max(best, match_weight * idf * frequency * (K1 + 1) / (
+                        frequency + K1 * (1 - B + B * length / average_length)))
+            if not best:
+                break
+            total += best
+        else:
+            totals.append(total)
+    return sorted(totals, reverse=True)[:limit]
+
+
+@pytest.fixture(scope='module')
+def index():
+    index = SearchIndex()
+    courses = synthetic_courses(600)
+    index.update(courses)
+    # A refresh that changes and drops courses ranks every term again
+    index.update([dict(course, title=course['title'] + ' updated') if i % 7 == 0 else course
+                  for i, course in enumerate(courses) if i % 11])
+    return index
+
+
+QUERIES = ['python', 'ka', 'data science', 'machine lear', 'health care web', 'energy dus', 'ethics to', 'nope', 'data nope']
+
+
+@pytest.mark.parametrize('walk_budget, direct_scoring_matches', [
+    (search_index.WALK_BUDGET, search_index.DIRECT_SCORING_MATCHES),
+    (10 ** 9, 0),  # always walk to the end
+    (1, 0),  # give up walking at once
+    (search_index.WALK_BUDGET, 10 ** 9),  # always score directly
+])
+def test_matches_brute_force(monkeypatch, index, walk_budget, direct_scoring_matches):
+    monkeypatch.setattr(search_index, 'WALK_BUDGET', walk_budget)
+    monkeypatch.setattr(search_index, 'DIRECT_SCORING_MATCHES', direct_scoring_matches)
+    for query in QUERIES:
+        expected = brute_force(index, query, 10)
+        assert [round(score, 9) for score, _ in index.search(query, 10)] == [round(score, 9) for score in expected]
+
+
+def test_update_ranks_every_term(index):
+    assert set(index._ranked) == set(index.postings)
+    assert index._terms == sorted(index.postings)
+
+
+def test_copy_leaves_original_untouched(index):
+    before = index.search('data science', 10)
+    copy = index.copy()
+    copy.update(synthetic_courses(50, seed=9))
+    assert len(copy) == 50
+    assert index.search('data science', 10) == before